@@ -0,0 +1,68 @@
+"""
+Compare requests/sec of a request-shaped DB workload with and without a
+persistent connection pool.
+
+"dispose" reproduces the old get_db, which disposed the engine after every
+request so each one paid a fresh connect and auth handshake; "pooled" keeps
+the engine for the lifetime of the process as the app lifespan now does.
+
+Usage:
+    uv run python -m benchmarks.bench_db_pool --requests 2000 --concurrency 20
+
+Runs against DB_URL from settings and only issues read queries.
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from db import sessionmanager
+from models import User
+
+
+async def _request(dispose: bool) -> None:
+    assert sessionmanager.session_factory and sessionmanager.engine
+    async with sessionmanager.session_factory() as db:
+        await db.execute(select(User.id).limit(1))
+    if dispose:
+        await sessionmanager.engine.dispose()
+
+
+async def run(requests: int, concurrency: int, dispose: bool) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            await _request(dispose)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main(requests: int, concurrency: int) -> None:
+    for name, dispose in (("dispose", True), ("pooled", False)):
+        sessionmanager.init_db()
+        try:
+            # Warm up so the pooled run measures steady state, not first connects.
+            await run(concurrency, concurrency, dispose)
+            rate = await run(requests, concurrency, dispose)
+            stats = sessionmanager.pool_stats()
+        finally:
+            await sessionmanager.close()
+        print(  # noqa: T201
+            f"{name:>8}: {rate:>8.0f} req/sec  "
+            f"connects={stats['connects']} "
+            f"connect_ms_avg={stats['connect_ms_avg']} "
+            f"checkout_wait_ms_max={stats['checkout_wait_ms_max']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
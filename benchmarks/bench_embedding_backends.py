@@ -0,0 +1,84 @@
+"""
+Compare embedding throughput and output agreement across inference backends.
+
+Every backend encodes the same fixed, seeded corpus of chunk-sized texts.
+For each one the script reports chunks/sec and the cosine similarity of its
+vectors against the torch baseline (mean and worst case).
+
+Usage:
+    uv run --extra onnx python -m benchmarks.bench_embedding_backends --chunks 2000
+
+The ONNX files are exported under models/ on first use, outside the timing.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from services.chunker import chunk_text
+from services.embeding_service import load_embedding_model
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+_WORDS = (
+    "cell membrane protein energy enzyme reaction gradient transport signal "
+    "theorem proof integral matrix vector limit series function derivative "
+    "market supply demand price policy inflation growth capital labour trade "
+    "empire treaty revolution council dynasty reform colony parliament war "
+    "algorithm memory cache thread process network packet latency compiler"
+).split()
+
+
+def build_corpus(chunks: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    corpus: list[str] = []
+    while len(corpus) < chunks:
+        sentences = [
+            " ".join(rng.choices(_WORDS, k=rng.randint(8, 20))).capitalize() + "."
+            for _ in range(40)
+        ]
+        corpus.extend(chunk_text(" ".join(sentences)))
+    return corpus[:chunks]
+
+
+def encode(
+    backend: str, corpus: list[str], batch_size: int
+) -> tuple[np.ndarray, float]:
+    model = load_embedding_model(backend)
+    model.encode(corpus[:batch_size], batch_size=batch_size)  # warm up
+    start = time.perf_counter()
+    vectors = model.encode(
+        corpus, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True
+    )
+    return vectors, len(corpus) / (time.perf_counter() - start)
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def main(chunks: int, batch_size: int, seed: int) -> None:
+    corpus = build_corpus(chunks, seed)
+    baseline = None
+    for backend in BACKENDS:
+        vectors, rate = encode(backend, corpus, batch_size)
+        if baseline is None:
+            baseline = vectors
+        agreement = cosine_rows(baseline, vectors)
+        print(  # noqa: T201
+            f"{backend:>10}: {rate:>8.1f} chunks/sec  dims={vectors.shape[1]}  "
+            f"cosine_mean={agreement.mean():.5f} cosine_min={agreement.min():.5f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.chunks, args.batch_size, args.seed)
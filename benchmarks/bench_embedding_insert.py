@@ -0,0 +1,110 @@
+"""
+Compare rows/sec of per-row ORM inserts against the binary COPY path.
+
+Usage:
+    uv run python -m benchmarks.bench_embedding_insert --rows 5000
+
+Runs against DB_URL from settings; rows are written under a throwaway
+document that is deleted afterwards.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import time
+import uuid
+
+import numpy as np
+from sqlalchemy import delete
+
+from db import sessionmanager
+from models import Document, DocumentStatus, Embedding
+from services.chunker import Chunk
+from services.embedding_store import bulk_insert_embeddings
+
+DIMENSIONS = 384
+
+
+async def _create_document() -> uuid.UUID:
+    document_id = uuid.uuid4()
+    assert sessionmanager.session_factory
+    async with sessionmanager.session_factory() as db:
+        db.add(
+            Document(
+                id=document_id,
+                sha256=hashlib.sha256(document_id.bytes).hexdigest(),
+                size_bytes=0,
+                refcount=1,
+                status=DocumentStatus.Ready,
+            )
+        )
+        await db.commit()
+    return document_id
+
+
+async def _drop_document(document_id: uuid.UUID) -> None:
+    assert sessionmanager.session_factory
+    async with sessionmanager.session_factory() as db:
+        await db.execute(delete(Document).where(Document.id == document_id))
+        await db.commit()
+
+
+async def orm_insert(
+    document_id: uuid.UUID, chunks: list[Chunk], vectors: np.ndarray
+) -> None:
+    assert sessionmanager.session_factory
+    async with sessionmanager.session_factory() as db:
+        for chunk, embedding in zip(chunks, vectors.tolist()):
+            db.add(
+                Embedding(
+                    document_id=document_id,
+                    chunks=chunk.text,
+                    page_number=chunk.page_number,
+                    char_start=chunk.char_start,
+                    char_end=chunk.char_end,
+                    embedding=embedding,
+                )
+            )
+        await db.commit()
+
+
+async def copy_insert(
+    document_id: uuid.UUID, chunks: list[Chunk], vectors: np.ndarray
+) -> None:
+    assert sessionmanager.session_factory
+    async with sessionmanager.session_factory() as db:
+        await bulk_insert_embeddings(db, document_id, chunks, vectors)
+        await db.commit()
+
+
+async def main(rows: int, repeat: int) -> None:
+    sessionmanager.init_db()
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((rows, DIMENSIONS), dtype=np.float32)
+    text = "lorem ipsum " * 30
+    chunks = [
+        Chunk(f"chunk {i} {text}", i // 4 + 1, i * 400, i * 400 + 370)
+        for i in range(rows)
+    ]
+
+    try:
+        for name, insert in (("orm", orm_insert), ("copy", copy_insert)):
+            timings = []
+            for _ in range(repeat):
+                document_id = await _create_document()
+                start = time.perf_counter()
+                await insert(document_id, chunks, vectors)
+                timings.append(time.perf_counter() - start)
+                await _drop_document(document_id)
+            best = min(timings)
+            print(f"{name:>5}: {rows / best:>10.0f} rows/sec (best of {repeat})")  # noqa: T201
+    finally:
+        await sessionmanager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
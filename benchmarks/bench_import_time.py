@@ -0,0 +1,98 @@
+"""
+Measure the import cost of the app with `python -X importtime` and fail when
+it regresses.
+
+Imports `main` in a fresh interpreter, reports the cumulative import time and
+the slowest top-level packages, and exits non-zero if the best of --runs is
+over --budget-ms or if any module that should load lazily (torch, document
+parsers, LLM and Supabase SDKs) was imported.
+
+Usage:
+    uv run python -m benchmarks.bench_import_time --budget-ms 1500
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Only needed once a model is loaded, a document is parsed or an OAuth flow
+# runs; importing any of them at startup is a regression.
+HEAVY_MODULES = (
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "langchain_community",
+    "langchain_text_splitters",
+    "llama_index",
+    "docx",
+    "pptx",
+    "pymupdf",
+    "fitz",
+    "supabase",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(module: str = "main") -> tuple[float, dict[str, float]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        tuple[float, dict[str, float]]: Cumulative import time of the module
+        in ms, and the cumulative time of each top-level package it pulled in.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    packages: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        name = match.group(4)
+        if name == module:
+            total = cumulative_ms
+        top_level = name.split(".")[0]
+        packages[top_level] = max(packages.get(top_level, 0.0), cumulative_ms)
+    return total, packages
+
+
+def main(runs: int, budget_ms: float, top: int) -> int:
+    results = [measure() for _ in range(runs)]
+    total, packages = min(results, key=lambda result: result[0])
+
+    print(  # noqa: T201
+        f"import main: {total:.1f} ms (best of {runs}, budget {budget_ms:.0f} ms)"
+    )
+    for name, cumulative in sorted(packages.items(), key=lambda x: -x[1])[:top]:
+        print(f"  {name:<28} {cumulative:>8.1f} ms")  # noqa: T201
+
+    heavy = sorted(name for name in packages if name in HEAVY_MODULES)
+    failed = False
+    if heavy:
+        print(f"FAIL: imported eagerly: {', '.join(heavy)}")  # noqa: T201
+        failed = True
+    if total > budget_ms:
+        print(f"FAIL: over budget by {total - budget_ms:.1f} ms")  # noqa: T201
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.budget_ms, args.top))
@@ -0,0 +1,58 @@
+"""
+Measure per-request JWT verification cost for each backend and for a hit in
+the verified-token cache.
+
+Usage:
+    uv run python -m benchmarks.bench_jwt --iterations 20000
+"""
+
+import argparse
+import time
+import uuid
+
+from jose import jwt
+
+from core.security import JWT_BACKENDS, token_cache, validate_jwt_token
+from core.settings import settings
+
+
+def _token() -> str:
+    now = int(time.time())
+    return jwt.encode(
+        {
+            "sub": str(uuid.uuid4()),
+            "aud": "authenticated",
+            "iat": now,
+            "exp": now + 3600,
+        },
+        settings.SUPABASE_JWT_SECRET,
+        algorithm="HS256",
+    )
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main(iterations: int) -> None:
+    settings.SUPABASE_JWT_SECRET = settings.SUPABASE_JWT_SECRET or "bench-secret"
+    token = _token()
+
+    for name, decode in JWT_BACKENDS.items():
+        cost = _per_call_us(lambda: decode(token), iterations)
+        print(f"{name:>12}: {cost:>8.2f} us/request")  # noqa: T201
+
+    token_cache.clear()
+    validate_jwt_token(token)
+    cost = _per_call_us(lambda: validate_jwt_token(token), iterations)
+    print(f"{'cache hit':>12}: {cost:>8.2f} us/request")  # noqa: T201
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.iterations)
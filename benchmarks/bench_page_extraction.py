@@ -0,0 +1,85 @@
+"""
+Report where PDF extraction time goes, page by page.
+
+Extracts a PDF in-process twice: with the adaptive extractor, which runs
+table detection only on pages with ruled lines, and with table detection
+forced on every page with text (the previous behaviour). Prints pages and
+time per page kind for both, the slowest pages of the adaptive run, and the
+overall speedup.
+
+Usage:
+    uv run python -m benchmarks.bench_page_extraction lecture.pdf --top 10
+    uv run python -m benchmarks.bench_page_extraction --pages 200
+
+Without a path, a PDF is generated as in bench_pdf_extraction.
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.bench_pdf_extraction import build_pdf
+from core.settings import settings
+from utils.extractor import DocumentPage, ExtractionReport, PageKind, extract_pages
+
+
+def run(path: Path, min_rules: int) -> tuple[list[DocumentPage], ExtractionReport]:
+    settings.EXTRACTION_TABLE_MIN_RULES = min_rules
+    pages = extract_pages(str(path))
+    report = ExtractionReport()
+    report.add(pages)
+    return pages, report
+
+
+def print_report(label: str, report: ExtractionReport) -> None:
+    total_ms = sum(report.ms.values())
+    total_pages = sum(report.pages.values())
+    print(f"{label}: {total_ms:.1f} ms over {total_pages} pages")  # noqa: T201
+    for kind, count in report.pages.most_common():
+        ms = report.ms[kind]
+        print(  # noqa: T201
+            f"  {kind.value:<11} {count:>5} pages {ms:>9.1f} ms "
+            f"{ms / count:>7.2f} ms/page"
+        )
+
+
+def main(path: Optional[Path], pages: int, top: int, seed: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        if path is None:
+            path = Path(tmp) / "generated.pdf"
+            build_pdf(path, pages, seed)
+
+        default_rules = settings.EXTRACTION_TABLE_MIN_RULES
+        adaptive_pages, adaptive = run(path, default_rules)
+        forced_pages, forced = run(path, 0)
+
+    print_report("adaptive", adaptive)
+    print_report("tables on every page", forced)
+
+    print(f"slowest {top} pages (adaptive):")  # noqa: T201
+    slowest = sorted(adaptive_pages, key=lambda page: -page.extract_ms)[:top]
+    for page in slowest:
+        print(  # noqa: T201
+            f"  page {page.number:>5}  {page.kind.value:<11} {page.extract_ms:>8.2f} ms"
+        )
+
+    missed = sum(
+        1
+        for adaptive_page, forced_page in zip(adaptive_pages, forced_pages)
+        if forced_page.kind == PageKind.Table and adaptive_page.kind != PageKind.Table
+    )
+    speedup = sum(forced.ms.values()) / max(sum(adaptive.ms.values()), 1e-9)
+    print(  # noqa: T201
+        f"speedup={speedup:.2f}x  tables missed by the fast path={missed}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", type=Path, nargs="?")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.path, args.pages, args.top, args.seed)
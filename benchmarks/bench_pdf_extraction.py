@@ -0,0 +1,111 @@
+"""
+Measure how PDF extraction scales when page ranges are sharded across the
+extraction pool.
+
+Generates PDFs of 10, 100 and 1000 pages (body text on most pages, a ruled
+table on every third one so table detection has real work to do, and some
+image-only and blank pages) and drains
+the ingestion page stream over each with 1, 2, 4 and 8 workers. One worker is
+the sequential baseline; the speedup column is relative to it.
+
+Usage:
+    uv run python -m benchmarks.bench_pdf_extraction --pages 10 100 1000
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from core.executor import executors
+from core.settings import settings
+from services.ingestion_service import stream_pages
+from utils.extractor import count_pdf_pages
+
+_WORDS = (
+    "cell membrane protein energy enzyme reaction gradient transport signal "
+    "theorem proof integral matrix vector limit series function derivative "
+    "market supply demand price policy inflation growth capital labour trade"
+).split()
+
+
+def build_pdf(path: Path, pages: int, seed: int) -> None:
+    import pymupdf
+
+    rng = random.Random(seed)
+    doc = pymupdf.open()
+    for number in range(pages):
+        page = doc.new_page()
+        if number % 10 == 9:
+            continue  # blank
+        if number % 10 == 8:
+            image = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 64, 64), False)
+            image.clear_with(rng.randint(0, 255))
+            page.insert_image(pymupdf.Rect(50, 50, 545, 545), pixmap=image)
+            continue
+        body = "\n".join(
+            " ".join(rng.choices(_WORDS, k=rng.randint(8, 14))).capitalize() + "."
+            for _ in range(20)
+        )
+        page.insert_textbox(pymupdf.Rect(50, 50, 545, 400), body, fontsize=10)
+        if number % 3 == 0:
+            for row in range(5):
+                for col in range(4):
+                    cell = pymupdf.Rect(
+                        50 + col * 120, 420 + row * 30, 170 + col * 120, 450 + row * 30
+                    )
+                    page.draw_rect(cell, color=(0, 0, 0), width=0.8)
+                    page.insert_text(
+                        (cell.x0 + 4, cell.y0 + 18), rng.choice(_WORDS), fontsize=9
+                    )
+    doc.save(str(path))
+    doc.close()
+
+
+async def extract(path: Path, workers: int) -> float:
+    settings.EXTRACTION_POOL_WORKERS = workers
+    settings.EXTRACTION_POOL_MAX_PENDING = max(workers, 8)
+    settings.EXTRACTION_SHARD_WORKERS = workers
+    settings.EXTRACTION_SHARD_MIN_PAGES = 0
+    executors.init_executors()
+    try:
+        # Start every worker process before the clock runs.
+        warm_up = [
+            executors.run_extraction(count_pdf_pages, str(path)) for _ in range(workers)
+        ]
+        await asyncio.gather(*warm_up)
+        start = time.perf_counter()
+        async for _ in stream_pages(str(path), "pdf"):
+            pass
+        return time.perf_counter() - start
+    finally:
+        executors.close()
+
+
+def main(page_counts: list[int], workers: list[int], window: int, seed: int) -> None:
+    settings.INGEST_PAGE_WINDOW = window
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in page_counts:
+            path = Path(tmp) / f"{pages}.pdf"
+            build_pdf(path, pages, seed)
+            baseline = None
+            for count in workers:
+                elapsed = asyncio.run(extract(path, count))
+                baseline = baseline or elapsed
+                print(  # noqa: T201
+                    f"{pages:>5} pages  {count} workers: {elapsed:>7.2f}s  "
+                    f"{pages / elapsed:>7.1f} pages/sec  "
+                    f"speedup={baseline / elapsed:.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--window", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.pages, args.workers, args.window, args.seed)
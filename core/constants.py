@@ -15,3 +15,37 @@ class Supabase:
 
     REQUIRED_SECRETS = ["SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_JWT_SECRET"]
     FULL_NAME_FIELD = "full_name"
+
+
+class Ingestion:
+    """Redis keys used by the background ingestion queue"""
+
+    STREAM_KEY = "ingest:jobs"
+    CONSUMER_GROUP = "ingest-workers"
+    JOB_KEY_PREFIX = "ingest:job:"
+
+
+class LLMCache:
+    """Redis keys and prompt versions for cached LLM generations"""
+
+    KEY_PREFIX = "llm:"
+    FLASHCARD_PROMPT_VERSION = "flashcards-v1"
+    QUIZ_PROMPT_VERSION = "quiz-v1"
+
+
+class UserCache:
+    """Redis keys for cached JWT subject to user id lookups"""
+
+    KEY_PREFIX = "user:sub:"
+
+
+class SignedURLCache:
+    """Redis keys for cached signed storage URLs"""
+
+    KEY_PREFIX = "signedurl:"
+
+
+class Storage:
+    """Redis keys used by the storage reconciliation job"""
+
+    RECONCILE_LOCK_KEY = "storage:reconcile:lock"
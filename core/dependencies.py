@@ -0,0 +1,60 @@
+import secrets
+import uuid
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from fastapi import Depends, Header, HTTPException, Request, status
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.security import get_current_user
+from core.settings import settings
+from db import get_db
+from services.ingestion_service import IngestionQueue
+from services.user_service import user_resolver
+
+if TYPE_CHECKING:
+    from llama_index.llms.gemini import Gemini
+
+
+@lru_cache
+def get_llm() -> "Gemini":
+    """Return the shared Gemini LLM client."""
+    from llama_index.llms.gemini import Gemini
+
+    return Gemini(api_key=settings.GEMINI_API_KEY)
+
+
+def get_redis(request: Request) -> Redis:
+    """Dependency returning the Redis client created in the app lifespan."""
+    return request.app.state.redis
+
+
+def get_ingestion_queue(request: Request) -> IngestionQueue:
+    """Dependency factory for IngestionQueue."""
+    return IngestionQueue(get_redis(request))
+
+
+async def get_current_user_id(
+    auth_user: str = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> uuid.UUID:
+    """Dependency resolving the JWT subject to the internal users.id."""
+    try:
+        return await user_resolver.resolve(db, auth_user)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token payload missing or invalid 'sub' field",
+        )
+
+
+def verify_internal_token(x_internal_token: str = Header("")) -> None:
+    """Dependency guarding internal endpoints with INTERNAL_API_TOKEN."""
+    if not settings.INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not secrets.compare_digest(x_internal_token, settings.INTERNAL_API_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal token",
+        )
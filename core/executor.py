@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from core.settings import settings
+from schemas.exception import ServerBusyError
+from utils.logger import get_logger
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """Run blocking callables on an executor with a cap on pending work"""
+
+    def __init__(self, name: str, executor: Executor, max_pending: int) -> None:
+        self.name = name
+        self.executor = executor
+        self.max_pending = max_pending
+        self.pending = 0
+
+    async def submit(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.pending >= self.max_pending:
+            logger.warning(
+                "Executor saturated",
+                extra={"executor": self.name, "pending": self.pending},
+            )
+            raise ServerBusyError(f"{self.name} executor is saturated")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, partial(fn, *args))
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ExecutorManager:
+    """Manage the executors that keep CPU-bound work off the event loop.
+
+    Document parsing runs in a process pool; the embedding model runs on a
+    single dedicated thread so only one forward pass uses the cores at a time.
+    """
+
+    def __init__(self) -> None:
+        self.extraction: Optional[BoundedExecutor] = None
+        self.embedding: Optional[BoundedExecutor] = None
+
+    def init_executors(self) -> None:
+        self.extraction = BoundedExecutor(
+            "extraction",
+            ProcessPoolExecutor(
+                max_workers=settings.EXTRACTION_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            ),
+            settings.EXTRACTION_POOL_MAX_PENDING,
+        )
+        self.embedding = BoundedExecutor(
+            "embedding",
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-model"),
+            settings.EMBEDDING_POOL_MAX_PENDING,
+        )
+
+    def close(self) -> None:
+        for executor in (self.extraction, self.embedding):
+            if executor:
+                executor.shutdown()
+        self.extraction = None
+        self.embedding = None
+
+    async def run_extraction(self, fn: Callable[..., T], *args: Any) -> T:
+        if not self.extraction:
+            raise RuntimeError("Extraction executor isnt initialized")
+        return await self.extraction.submit(fn, *args)
+
+    async def run_embedding(self, fn: Callable[..., T], *args: Any) -> T:
+        if not self.embedding:
+            raise RuntimeError("Embedding executor isnt initialized")
+        return await self.embedding.submit(fn, *args)
+
+
+executors = ExecutorManager()
@@ -1,4 +1,10 @@
-from typing import Any
+import base64
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -12,6 +18,114 @@ logger = get_logger()
 security_scheme = HTTPBearer()
 
 
+class VerifiedTokenCache:
+    """Bounded LRU of already-verified tokens, keyed by their SHA-256 digest.
+
+    Only the subject and expiry are kept; an entry is dropped as soon as the
+    token it belongs to expires.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.entries: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[str]:
+        key = self._digest(token)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        sub, exp = entry
+        if exp <= time.time():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return sub
+
+    def put(self, token: str, sub: str, exp: float) -> None:
+        key = self._digest(token)
+        self.entries[key] = (sub, exp)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+token_cache = VerifiedTokenCache(settings.JWT_CACHE_MAX_ENTRIES)
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _decode_jose(token: str) -> dict[str, Any]:
+    return jwt.decode(
+        token,
+        settings.SUPABASE_JWT_SECRET,
+        algorithms=["HS256"],
+        options={
+            "verify_signature": True,
+            "verify_exp": True,
+            "verify_aud": False,
+        },
+        audience="authenticated",
+    )
+
+
+def _decode_hs256(token: str) -> dict[str, Any]:
+    """Verify an HS256 token with the standard library only.
+
+    Checks the same things the jose backend is configured to check: the
+    signature, `exp` and `nbf`. Raises JWTError so callers handle both
+    backends the same way.
+    """
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64url_decode(header_b64))
+        signature = _b64url_decode(signature_b64)
+        payload = json.loads(_b64url_decode(payload_b64))
+    except (ValueError, TypeError) as e:
+        raise JWTError("Malformed token") from e
+
+    if not isinstance(header, dict) or header.get("alg") != "HS256":
+        raise JWTError("The specified alg value is not allowed")
+    expected = hmac.new(
+        settings.SUPABASE_JWT_SECRET.encode(),
+        f"{header_b64}.{payload_b64}".encode(),
+        hashlib.sha256,
+    ).digest()
+    if not hmac.compare_digest(expected, signature):
+        raise JWTError("Signature verification failed.")
+    if not isinstance(payload, dict):
+        raise JWTError("Invalid payload")
+
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)):
+            raise JWTError("Expiration Time claim (exp) must be an integer.")
+        if exp <= now:
+            raise JWTError("Signature has expired.")
+    nbf = payload.get("nbf")
+    if nbf is not None:
+        if not isinstance(nbf, (int, float)):
+            raise JWTError("Not Before claim (nbf) must be an integer.")
+        if nbf > now:
+            raise JWTError("The token is not yet valid (nbf)")
+    return payload
+
+
+JWT_BACKENDS: dict[str, Callable[[str], dict[str, Any]]] = {
+    "jose": _decode_jose,
+    "hs256": _decode_hs256,
+}
+
+
 def validate_jwt_token(token: str) -> str:
     """
     Extracts and validates the JWT token, returns user_id.
@@ -25,18 +139,12 @@ def validate_jwt_token(token: str) -> str:
     Raises:
         HTTPException: If the token is invalid, expired, or missing 'sub'.
     """
+    cached_sub = token_cache.get(token)
+    if cached_sub is not None:
+        return cached_sub
+
     try:
-        payload: dict[str, Any] = jwt.decode(
-            token,
-            settings.SUPABASE_JWT_SECRET,
-            algorithms=["HS256"],
-            options={
-                "verify_signature": True,
-                "verify_exp": True,
-                "verify_aud": False,
-            },
-            audience="authenticated",
-        )
+        payload = JWT_BACKENDS[settings.JWT_BACKEND](token)
 
         sub = payload.get("sub")
         if sub is None or not isinstance(sub, str):
@@ -49,6 +157,10 @@ def validate_jwt_token(token: str) -> str:
                 detail="Token payload missing or invalid 'sub' field",
             )
 
+        # Tokens without an expiry are not cached; nothing would evict them.
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            token_cache.put(token, sub, float(exp))
         return sub
 
     except JWTError as e:
@@ -1,12 +1,17 @@
-from typing import AsyncGenerator, Optional
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Optional, cast
 
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
 
 from core.settings import settings
 from utils.logger import get_logger
@@ -14,31 +19,162 @@ from utils.logger import get_logger
 logger = get_logger()
 
 
+class PoolMetrics:
+    """Running counters for connection checkouts and new connections"""
+
+    def __init__(self) -> None:
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.checkouts = 0
+        self.checkins = 0
+        self.hold_seconds_total = 0.0
+        self.hold_seconds_max = 0.0
+        self.connects = 0
+        self.connect_seconds_total = 0.0
+        self.connect_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.waits += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_checkout(self) -> None:
+        self.checkouts += 1
+
+    def record_checkin(self, held_seconds: float) -> None:
+        self.checkins += 1
+        self.hold_seconds_total += held_seconds
+        self.hold_seconds_max = max(self.hold_seconds_max, held_seconds)
+
+    def record_connect(self, seconds: float) -> None:
+        self.connects += 1
+        self.connect_seconds_total += seconds
+        self.connect_seconds_max = max(self.connect_seconds_max, seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "checkout_wait_ms_avg": _avg_ms(self.wait_seconds_total, self.waits),
+            "checkout_wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            "hold_ms_avg": _avg_ms(self.hold_seconds_total, self.checkins),
+            "hold_ms_max": round(self.hold_seconds_max * 1000, 3),
+            "connects": self.connects,
+            "connect_ms_avg": _avg_ms(self.connect_seconds_total, self.connects),
+            "connect_ms_max": round(self.connect_seconds_max * 1000, 3),
+        }
+
+
+def _avg_ms(total_seconds: float, count: int) -> float:
+    return round(total_seconds * 1000 / count, 3) if count else 0.0
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a connection,
+    including any time spent opening a new one.
+    """
+
+    # SessionManager swaps in its own counters once the engine is created.
+    metrics = PoolMetrics()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start)
+
+    def recreate(self) -> "TimedQueuePool":
+        # Disposing the engine swaps in a recreated pool; keep its counters.
+        pool = cast(TimedQueuePool, super().recreate())
+        pool.metrics = self.metrics
+        return pool
+
+
 class SessionManager:
     """Manage async DB session"""
 
     def __init__(self) -> None:
         self.engine: Optional[AsyncEngine] = None
         self.session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+        self.metrics = PoolMetrics()
 
     def init_db(self) -> None:
+        # The asyncpg dialect reads its prepared statement cache size from the URL.
+        url = make_url(settings.DB_URL)
+        if url.get_driver_name() == "asyncpg":
+            cache_size = str(settings.DB_STATEMENT_CACHE_SIZE)
+            url = url.update_query_dict({"prepared_statement_cache_size": cache_size})
+
+        self.metrics = PoolMetrics()
         self.engine = create_async_engine(
-            settings.DB_URL,
-            poolclass=AsyncAdaptedQueuePool,
+            url,
+            poolclass=TimedQueuePool,
             pool_size=settings.DB_POOL_SIZE,
             max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
             pool_pre_ping=True,
             echo=False,
         )
+        self._instrument(self.engine)
         self.session_factory = async_sessionmaker(
             self.engine, expire_on_commit=False, autoflush=False, class_=AsyncSession
         )
 
+    def _instrument(self, engine: AsyncEngine) -> None:
+        pool = engine.sync_engine.pool
+        metrics = self.metrics
+        if isinstance(pool, TimedQueuePool):
+            pool.metrics = metrics
+
+        # How long requests hold connections is what exhausts the pool, so
+        # time each checkout until its checkin.
+        @event.listens_for(pool, "checkout")
+        def _on_checkout(dbapi_connection, conn_rec, conn_proxy):
+            conn_rec.info["checked_out_at"] = time.perf_counter()
+            metrics.record_checkout()
+
+        @event.listens_for(pool, "checkin")
+        def _on_checkin(dbapi_connection, conn_rec):
+            started = conn_rec.info.pop("checked_out_at", None)
+            if started is not None:
+                metrics.record_checkin(time.perf_counter() - started)
+
+        @event.listens_for(engine.sync_engine, "do_connect")
+        def _before_connect(dialect, conn_rec, cargs, cparams):
+            conn_rec.info["connect_started"] = time.perf_counter()
+
+        @event.listens_for(pool, "connect")
+        def _after_connect(dbapi_connection, conn_rec):
+            started = conn_rec.info.pop("connect_started", None)
+            if started is not None:
+                metrics.record_connect(time.perf_counter() - started)
+
+    def pool_stats(self) -> dict[str, Any]:
+        """Return the current pool occupancy and cumulative checkout timings."""
+        if not self.engine:
+            return {"initialized": False}
+        pool = self.engine.sync_engine.pool
+        assert isinstance(pool, AsyncAdaptedQueuePool)
+        return {
+            "initialized": True,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            **self.metrics.snapshot(),
+        }
+
     async def close(self) -> None:
         if self.engine:
             await self.engine.dispose()
+        self.engine = None
+        self.session_factory = None
 
-    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
+    @asynccontextmanager
+    async def get_session(self) -> AsyncIterator[AsyncSession]:
         """yield a db session with correct schema"""
         if not self.session_factory:
             raise RuntimeError("Datasbase session factory isnt initialized")
@@ -46,19 +182,21 @@ class SessionManager:
             try:
                 yield session
             except Exception as e:
-                logger.error("Error in database", extra={"error": e})
+                # Roll back whatever went wrong, but re-raise the original so
+                # HTTP and busy errors keep their status codes.
+                if isinstance(e, SQLAlchemyError):
+                    logger.error("Error in database", extra={"error": e})
                 await session.rollback()
-                raise RuntimeError(f"Database session error: {e!r}") from e
+                raise
 
 
 sessionmanager = SessionManager()
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    if not sessionmanager.session_factory:
-        sessionmanager.init_db()
-
-    async for session in sessionmanager.get_session():
+    # The engine and its pool belong to the app lifespan; closing the session
+    # here only returns its connection to the pool.
+    # Entering the context manager here lets errors raised by the endpoint
+    # reach its rollback.
+    async with sessionmanager.get_session() as session:
         yield session
-
-    await sessionmanager.close()
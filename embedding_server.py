@@ -0,0 +1,69 @@
+"""
+Embedding sidecar: one model process per node, serving the API and ingestion
+workers over a Unix domain socket.
+
+Start it before the workers and point them at the same path with
+EMBEDDING_SIDECAR_SOCKET; the workers then load no model of their own.
+"""
+
+import asyncio
+import os
+import signal
+from functools import partial
+
+from core.executor import executors
+from core.settings import settings
+from services.embedding_engine import embedding_engine
+from services.embedding_sidecar import handle_connection
+from services.embeding_service import load_embedding_model
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def _pin_torch_threads(threads: int) -> None:
+    if threads <= 0:
+        return
+    import torch
+
+    torch.set_num_threads(threads)
+    logger.info("Pinned torch threads", extra={"threads": threads})
+
+
+async def main() -> None:
+    socket_path = settings.EMBEDDING_SIDECAR_SOCKET
+    if not socket_path:
+        raise SystemExit("EMBEDDING_SIDECAR_SOCKET must be set")
+
+    _pin_torch_threads(settings.EMBEDDING_SIDECAR_TORCH_THREADS)
+    executors.init_executors()
+    # Only bind the socket once the model is warm, so workers waiting on it
+    # never see a cold model.
+    await embedding_engine.start(load_embedding_model)
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = await asyncio.start_unix_server(
+        partial(handle_connection, encode=embedding_engine.encode), path=socket_path
+    )
+    os.chmod(socket_path, 0o660)
+    logger.info("Embedding sidecar listening", extra={"socket": socket_path})
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    try:
+        await stop_event.wait()
+    finally:
+        # Workers keep their connections open, so don't wait for them to drain.
+        server.close()
+        await embedding_engine.close()
+        executors.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
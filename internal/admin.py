@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+from core.dependencies import verify_internal_token
+from db import sessionmanager
+from services.embedding_engine import embedding_engine
+
+router = APIRouter(dependencies=[Depends(verify_internal_token)])
+
+
+@router.get("/db")
+async def db_pool_stats() -> dict:
+    return sessionmanager.pool_stats()
+
+
+@router.get("/embedding")
+async def embedding_engine_stats() -> dict:
+    return embedding_engine.stats()
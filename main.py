@@ -1,5 +1,5 @@
+import asyncio
 from contextlib import asynccontextmanager
-from pathlib import Path
 from typing import Awaitable, Callable
 from uuid import uuid4
 
@@ -7,66 +7,70 @@ import redis.asyncio as aioredis
 from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from sentence_transformers import SentenceTransformer
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
+from core.executor import executors
 from core.settings import settings
 from db import sessionmanager
+from internal.admin import router as internal_router
 from routers.auth import router as auth_router
 from routers.file_upload import router as file_upload_router
+from routers.flashcards import router as flashcards_router
+from routers.quizzes import router as quizzes_router
+from routers.search import router as search_router
 from schemas.common import ErrorResponseSchema
-from schemas.exception import EmbedingModelError
+from schemas.exception import ServerBusyError
+from services.document_text import document_texts
+from services.embedding_engine import embedding_engine
+from services.embeding_service import load_embedding_model
+from services.llm_cache import llm_cache
+from services.signed_url_cache import signed_urls
+from services.user_service import user_resolver
 from utils.limiter import limiter
 from utils.logger import RequestContextVar, get_logger, request_ctx_var
+from utils.supabase_client import supabase_http
 
 logger = get_logger()
 
 
-_MODEL_NAME = "all-MiniLM-L6-v2"
-_MODEL_PATH = Path("models") / _MODEL_NAME
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     if not sessionmanager.session_factory:
         sessionmanager.init_db()
+    executors.init_executors()
+    supabase_http.init_client()
+
+    # The model loads and warms up in the background (or the sidecar is awaited)
+    # so the app starts serving immediately; /health/ready only reports ready
+    # once embeddings can be served.
+    if settings.EMBEDDING_SIDECAR_SOCKET:
+        warm_up = embedding_engine.connect(settings.EMBEDDING_SIDECAR_SOCKET)
+    else:
+        warm_up = embedding_engine.start(load_embedding_model)
+    model_loader = asyncio.create_task(warm_up)
 
-    model = None
     try:
-        if _MODEL_PATH.exists():
-            logger.info(
-                "Loading embedding model from disk",
-                extra={"model_name": _MODEL_NAME, "model_path": _MODEL_PATH},
-            )
-            model = SentenceTransformer(str(_MODEL_PATH))
-        else:
-            logger.info(
-                "Downloading embedding model from HuggingFace",
-                extra={"model_name": _MODEL_NAME},
-            )
-            model = SentenceTransformer(_MODEL_NAME)
-            model.save(str(_MODEL_PATH))
-            logger.info(
-                "Embedding model saved to disk",
-                extra={"model_name": _MODEL_NAME, "model_path": _MODEL_PATH},
-            )
-
-        app.state.embedding_model = model
         app.state.redis = await aioredis.from_url(settings.REDIS_URL)
+        llm_cache.init_cache(app.state.redis)
+        user_resolver.init_cache(app.state.redis)
+        signed_urls.init_cache(app.state.redis)
 
         yield
 
-    except Exception as e:
-        logger.exception("Failed to load embedding model")
-        raise EmbedingModelError(f"Error loading embedding model: {e}")
-
     finally:
-        if hasattr(app.state, "embedding_model"):
-            del app.state.embedding_model
+        model_loader.cancel()
+        await asyncio.gather(model_loader, return_exceptions=True)
+        await embedding_engine.close()
+        llm_cache.close()
+        document_texts.close()
+        user_resolver.close()
+        await signed_urls.close()
         if hasattr(app.state, "redis"):
             await app.state.redis.close()
+        await supabase_http.close()
         await sessionmanager.close()
+        executors.close()
 
 
 app = FastAPI(
@@ -76,7 +80,11 @@ app = FastAPI(
         status.HTTP_429_TOO_MANY_REQUESTS: {
             "model": ErrorResponseSchema,
             "description": "Rate Limit Response",
-        }
+        },
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "model": ErrorResponseSchema,
+            "description": "Server Busy Response",
+        },
     },
 )
 
@@ -103,6 +111,15 @@ async def rate_limit_exceed_handler(request: Request, exc: RateLimitExceeded):
     return response
 
 
+@app.exception_handler(ServerBusyError)
+async def server_busy_handler(request: Request, exc: ServerBusyError):
+    return JSONResponse(
+        {"detail": "Server is busy, please retry shortly"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "5"},
+    )
+
+
 app.add_middleware(SlowAPIMiddleware)
 
 
@@ -123,8 +140,23 @@ async def logging_middleware(
 
 app.include_router(file_upload_router, prefix="/api/file", tags=["File Upload"])
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
+app.include_router(search_router, prefix="/api/search", tags=["Search"])
+app.include_router(flashcards_router, prefix="/api/flashcards", tags=["Flashcards"])
+app.include_router(quizzes_router, prefix="/api/quizzes", tags=["Quizzes"])
+app.include_router(
+    internal_router, prefix="/internal", tags=["Internal"], include_in_schema=False
+)
 
 
 @app.get("/", tags=["Health"])
 async def healthz(request: Request) -> str:
     return "ok"
+
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness() -> JSONResponse:
+    if not embedding_engine.ready:
+        return JSONResponse(
+            {"status": "starting"}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    return JSONResponse({"status": "ready"})
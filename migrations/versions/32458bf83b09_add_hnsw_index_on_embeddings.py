@@ -0,0 +1,35 @@
+"""add hnsw index on embeddings
+
+Revision ID: 32458bf83b09
+Revises: 3d149adbc517
+Create Date: 2026-10-16 10:03:17.518092
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "32458bf83b09"
+down_revision: Union[str, Sequence[str], None] = "3d149adbc517"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_embeddings_embedding_hnsw",
+        "embeddings",
+        ["embedding"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_embeddings_embedding_hnsw", table_name="embeddings")
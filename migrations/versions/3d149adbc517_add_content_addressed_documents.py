@@ -0,0 +1,109 @@
+"""add content-addressed documents
+
+Revision ID: 3d149adbc517
+Revises: 705c16f7c915
+Create Date: 2026-10-16 09:12:41.204117
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3d149adbc517"
+down_revision: Union[str, Sequence[str], None] = "705c16f7c915"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("refcount", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("Pending", "Processing", "Ready", "Failed", name="documentstatus"),
+            nullable=False,
+        ),
+        sa.Column("ingest_job_id", sa.String(length=36), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("sha256"),
+    )
+
+    # Existing files have no known content hash: give each one its own
+    # document, keyed by a placeholder that can never match a real digest.
+    op.execute(
+        """
+        INSERT INTO documents (id, sha256, size_bytes, refcount, status, created_at)
+        SELECT id, 'legacy-' || id::text, 0, 1, 'Ready', uploaded_at FROM files
+        """
+    )
+
+    op.add_column("files", sa.Column("document_id", sa.Uuid(), nullable=True))
+    op.execute("UPDATE files SET document_id = id")
+    op.alter_column("files", "document_id", nullable=False)
+    op.create_foreign_key(
+        "files_document_id_fkey", "files", "documents", ["document_id"], ["id"]
+    )
+    op.create_index(
+        op.f("ix_files_document_id"), "files", ["document_id"], unique=False
+    )
+
+    op.add_column("embeddings", sa.Column("document_id", sa.Uuid(), nullable=True))
+    op.execute("UPDATE embeddings SET document_id = file_id")
+    op.alter_column("embeddings", "document_id", nullable=False)
+    op.drop_constraint("embeddings_file_id_fkey", "embeddings", type_="foreignkey")
+    op.drop_column("embeddings", "file_id")
+    op.create_foreign_key(
+        "embeddings_document_id_fkey",
+        "embeddings",
+        "documents",
+        ["document_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index(
+        op.f("ix_embeddings_document_id"),
+        "embeddings",
+        ["document_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column("embeddings", sa.Column("file_id", sa.Uuid(), nullable=True))
+    # Shared documents collapse back onto one of the files that referenced them.
+    op.execute(
+        """
+        UPDATE embeddings e SET file_id = (
+            SELECT f.id FROM files f WHERE f.document_id = e.document_id LIMIT 1
+        )
+        """
+    )
+    op.execute("DELETE FROM embeddings WHERE file_id IS NULL")
+    op.alter_column("embeddings", "file_id", nullable=False)
+    op.drop_index(op.f("ix_embeddings_document_id"), table_name="embeddings")
+    op.drop_constraint("embeddings_document_id_fkey", "embeddings", type_="foreignkey")
+    op.drop_column("embeddings", "document_id")
+    op.create_foreign_key(
+        "embeddings_file_id_fkey",
+        "embeddings",
+        "files",
+        ["file_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+    op.drop_index(op.f("ix_files_document_id"), table_name="files")
+    op.drop_constraint("files_document_id_fkey", "files", type_="foreignkey")
+    op.drop_column("files", "document_id")
+    op.drop_table("documents")
+    sa.Enum(name="documentstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,122 @@
+"""link flashcards and quizzes to files
+
+Revision ID: 8e9a4cef190f
+Revises: 32458bf83b09
+Create Date: 2026-10-16 13:41:09.382514
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e9a4cef190f"
+down_revision: Union[str, Sequence[str], None] = "32458bf83b09"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+question_type = sa.Enum(
+    "SingleCorrect", "MultipleCorrect", "YesNo", name="questiontype"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nothing has written these tables yet, and any stray row could not be
+    # linked back to the file it came from.
+    op.execute("DELETE FROM flashcards")
+    op.execute("DELETE FROM quizzes")
+
+    op.add_column("flashcards", sa.Column("file_id", sa.Uuid(), nullable=False))
+    op.create_foreign_key(
+        "flashcards_file_id_fkey",
+        "flashcards",
+        "files",
+        ["file_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.alter_column("flashcards", "explanation", nullable=True)
+    op.drop_index(op.f("ix_flashcards_user_id"), table_name="flashcards")
+    op.create_index(
+        "ix_flashcards_user_id_created_at_id",
+        "flashcards",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_flashcards_file_id_created_at_id",
+        "flashcards",
+        ["file_id", "created_at", "id"],
+        unique=False,
+    )
+
+    question_type.create(op.get_bind(), checkfirst=True)
+    op.add_column("quizzes", sa.Column("file_id", sa.Uuid(), nullable=False))
+    op.create_foreign_key(
+        "quizzes_file_id_fkey",
+        "quizzes",
+        "files",
+        ["file_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.add_column("quizzes", sa.Column("question_type", question_type, nullable=False))
+    op.add_column(
+        "quizzes",
+        sa.Column("correct_options", sa.ARRAY(sa.Integer()), nullable=False),
+    )
+    op.drop_column("quizzes", "correct_option")
+    op.alter_column("quizzes", "Option_3", nullable=True)
+    op.alter_column("quizzes", "Option_4", nullable=True)
+    op.alter_column("quizzes", "explanation", nullable=True)
+    op.drop_index(op.f("ix_quizzes_user_id"), table_name="quizzes")
+    op.create_index(
+        "ix_quizzes_user_id_created_at_id",
+        "quizzes",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_quizzes_file_id_created_at_id",
+        "quizzes",
+        ["file_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_quizzes_file_id_created_at_id", table_name="quizzes")
+    op.drop_index("ix_quizzes_user_id_created_at_id", table_name="quizzes")
+    op.create_index(op.f("ix_quizzes_user_id"), "quizzes", ["user_id"], unique=False)
+    # Rows without four options or an explanation do not fit the old shape.
+    op.execute(
+        """
+        DELETE FROM quizzes
+        WHERE "Option_3" IS NULL OR "Option_4" IS NULL OR explanation IS NULL
+        """
+    )
+    op.alter_column("quizzes", "explanation", nullable=False)
+    op.alter_column("quizzes", "Option_4", nullable=False)
+    op.alter_column("quizzes", "Option_3", nullable=False)
+    op.add_column("quizzes", sa.Column("correct_option", sa.Integer(), nullable=True))
+    op.execute("UPDATE quizzes SET correct_option = correct_options[1]")
+    op.alter_column("quizzes", "correct_option", nullable=False)
+    op.drop_column("quizzes", "correct_options")
+    op.drop_column("quizzes", "question_type")
+    op.drop_constraint("quizzes_file_id_fkey", "quizzes", type_="foreignkey")
+    op.drop_column("quizzes", "file_id")
+    question_type.drop(op.get_bind(), checkfirst=True)
+
+    op.drop_index("ix_flashcards_file_id_created_at_id", table_name="flashcards")
+    op.drop_index("ix_flashcards_user_id_created_at_id", table_name="flashcards")
+    op.create_index(
+        op.f("ix_flashcards_user_id"), "flashcards", ["user_id"], unique=False
+    )
+    op.execute("DELETE FROM flashcards WHERE explanation IS NULL")
+    op.alter_column("flashcards", "explanation", nullable=False)
+    op.drop_constraint("flashcards_file_id_fkey", "flashcards", type_="foreignkey")
+    op.drop_column("flashcards", "file_id")
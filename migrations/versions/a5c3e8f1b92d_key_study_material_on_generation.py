@@ -0,0 +1,40 @@
+"""key study material on generation
+
+Revision ID: a5c3e8f1b92d
+Revises: e2f81b6c0d47
+Create Date: 2026-10-17 09:21:47.305118
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a5c3e8f1b92d"
+down_revision: Union[str, Sequence[str], None] = "e2f81b6c0d47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("flashcards", "quizzes"):
+        op.add_column(table, sa.Column("generation", sa.String(64), nullable=True))
+        op.add_column(table, sa.Column("position", sa.Integer(), nullable=True))
+        op.create_unique_constraint(
+            f"uq_{table}_file_id_generation_position",
+            table,
+            ["file_id", "generation", "position"],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("flashcards", "quizzes"):
+        op.drop_constraint(
+            f"uq_{table}_file_id_generation_position", table, type_="unique"
+        )
+        op.drop_column(table, "position")
+        op.drop_column(table, "generation")
@@ -0,0 +1,51 @@
+"""add file size and content type
+
+Revision ID: b7d41e2a9c13
+Revises: 8e9a4cef190f
+Create Date: 2026-10-16 15:02:47.118305
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d41e2a9c13"
+down_revision: Union[str, Sequence[str], None] = "8e9a4cef190f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("files", sa.Column("size_bytes", sa.BigInteger(), nullable=True))
+    op.add_column(
+        "files", sa.Column("content_type", sa.String(length=255), nullable=True)
+    )
+    # Every file references the content-addressed document of its bytes, so
+    # existing rows can take their size from it. Content types are filled in
+    # from storage metadata by the reconciliation job.
+    op.execute(
+        """
+        UPDATE files SET size_bytes = documents.size_bytes
+        FROM documents WHERE documents.id = files.document_id
+        """
+    )
+    op.alter_column("files", "size_bytes", nullable=False)
+    op.drop_index(op.f("ix_files_user_id"), table_name="files")
+    op.create_index(
+        "ix_files_user_id_uploaded_at_id",
+        "files",
+        ["user_id", "uploaded_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_files_user_id_uploaded_at_id", table_name="files")
+    op.create_index(op.f("ix_files_user_id"), "files", ["user_id"], unique=False)
+    op.drop_column("files", "content_type")
+    op.drop_column("files", "size_bytes")
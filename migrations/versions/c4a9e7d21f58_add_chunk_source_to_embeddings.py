@@ -0,0 +1,33 @@
+"""add chunk source to embeddings
+
+Revision ID: c4a9e7d21f58
+Revises: b7d41e2a9c13
+Create Date: 2026-10-16 18:41:09.530217
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a9e7d21f58"
+down_revision: Union[str, Sequence[str], None] = "b7d41e2a9c13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows keep nulls until their documents are ingested again.
+    op.add_column("embeddings", sa.Column("page_number", sa.Integer(), nullable=True))
+    op.add_column("embeddings", sa.Column("char_start", sa.Integer(), nullable=True))
+    op.add_column("embeddings", sa.Column("char_end", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("embeddings", "char_end")
+    op.drop_column("embeddings", "char_start")
+    op.drop_column("embeddings", "page_number")
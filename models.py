@@ -5,9 +5,13 @@ from enum import Enum
 from pgvector.sqlalchemy import Vector
 from pydantic import EmailStr
 from sqlalchemy import (
+    ARRAY,
+    BigInteger,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
@@ -29,6 +33,19 @@ class FileType(str, Enum):
     Pptx = "pptx"
 
 
+class DocumentStatus(str, Enum):
+    Pending = "pending"
+    Processing = "processing"
+    Ready = "ready"
+    Failed = "failed"
+
+
+class QuestionType(str, Enum):
+    SingleCorrect = "single_correct"
+    MultipleCorrect = "multiple_correct"
+    YesNo = "yes_no"
+
+
 class ProviderType(str, Enum):
     Google = "google"
     Email = "email"
@@ -65,20 +82,94 @@ class User(Base):
         return f"<User id={self.id} name='{self.name}'>"
 
 
+class Document(Base):
+    """Content-addressed upload body shared by every File with the same bytes"""
+
+    __tablename__ = "documents"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False
+    )
+    sha256: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    refcount: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    status: Mapped[DocumentStatus] = mapped_column(
+        SqlEnum(DocumentStatus), default=DocumentStatus.Pending, nullable=False
+    )
+    ingest_job_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=func.now(), nullable=False
+    )
+
+    files: Mapped[list["File"]] = relationship(back_populates="document")
+    embeddings: Mapped[list["Embedding"]] = relationship(
+        back_populates="document", cascade="all, delete-orphan", passive_deletes=True
+    )
+    sections: Mapped[list["DocumentSection"]] = relationship(
+        back_populates="document", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<Document id={self.id} sha256='{self.sha256}'>"
+
+
+class DocumentSection(Base):
+    """A zstd-compressed slice of a document's extracted text.
+
+    Sections cover the text contiguously and in order; offsets are the same
+    ones chunks record on embeddings.
+    """
+
+    __tablename__ = "document_sections"
+
+    document_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid(as_uuid=True),
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    position: Mapped[int] = mapped_column(Integer, primary_key=True)
+    page_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    char_start: Mapped[int] = mapped_column(Integer, nullable=False)
+    char_end: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    document: Mapped["Document"] = relationship(back_populates="sections")
+
+
 class Embedding(Base):
     __tablename__ = "embeddings"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    file_id: Mapped[uuid.UUID] = mapped_column(
-        Uuid(as_uuid=True), ForeignKey("files.id", ondelete="CASCADE")
+    document_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid(as_uuid=True),
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     chunks: Mapped[str] = mapped_column(Text)
+    # Where the chunk came from; offsets index the document's extracted text.
+    # Null for rows ingested before they were recorded.
+    page_number: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    char_start: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    char_end: Mapped[int | None] = mapped_column(Integer, nullable=True)
     embedding: Mapped[list[float]] = mapped_column(Vector(384), nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=func.now(), nullable=False
     )
 
+    document: Mapped["Document"] = relationship(back_populates="embeddings")
+
+    __table_args__ = (
+        Index(
+            "ix_embeddings_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
     def __repr__(self):
-        return f"<Embedding: {self.file_id}>"
+        return f"<Embedding: {self.document_id}>"
 
 
 class AuthProvider(Base):
@@ -113,7 +204,6 @@ class File(Base):
         Uuid(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     filename: Mapped[str] = mapped_column(String(256), nullable=False)
     filepath: Mapped[str] = mapped_column(String(512), nullable=False)
@@ -121,10 +211,28 @@ class File(Base):
         DateTime(timezone=True), default=func.now(), nullable=False
     )
     file_type: Mapped[FileType] = mapped_column(SqlEnum(FileType), nullable=False)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    content_type: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    document_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid(as_uuid=True),
+        ForeignKey("documents.id"),
+        nullable=False,
+        index=True,
+    )
 
     user: Mapped["User"] = relationship(back_populates="files")
+    document: Mapped["Document"] = relationship(back_populates="files")
+    flashcards: Mapped[list["FlashCard"]] = relationship(
+        back_populates="file", cascade="all, delete-orphan", passive_deletes=True
+    )
+    quizzes: Mapped[list["Quiz"]] = relationship(
+        back_populates="file", cascade="all, delete-orphan", passive_deletes=True
+    )
 
-    __table_args__ = (UniqueConstraint("filename", "user_id", name="unique_user_file"),)
+    __table_args__ = (
+        UniqueConstraint("filename", "user_id", name="unique_user_file"),
+        Index("ix_files_user_id_uploaded_at_id", "user_id", "uploaded_at", "id"),
+    )
 
     def __repr__(self) -> str:
         return f"<File id={self.id} filename='{self.filename}'>"
@@ -140,16 +248,37 @@ class FlashCard(Base):
         Uuid(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
+    )
+    file_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid(as_uuid=True),
+        ForeignKey("files.id", ondelete="CASCADE"),
+        nullable=False,
     )
     question: Mapped[str] = mapped_column(String, nullable=False)
     answer: Mapped[str] = mapped_column(String, nullable=False)
-    explanation: Mapped[str] = mapped_column(String, nullable=False)
+    explanation: Mapped[str | None] = mapped_column(String, nullable=True)
+    # The generation a card came from and its place in it; saving the same
+    # generation again updates these rows. Null for rows saved before.
+    generation: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    position: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=func.now(), nullable=False
     )
 
     user: Mapped["User"] = relationship(back_populates="flashcards")
+    file: Mapped["File"] = relationship(back_populates="flashcards")
+
+    # Keyset pagination walks (created_at, id) within a user or a file.
+    __table_args__ = (
+        Index("ix_flashcards_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_flashcards_file_id_created_at_id", "file_id", "created_at", "id"),
+        UniqueConstraint(
+            "file_id",
+            "generation",
+            "position",
+            name="uq_flashcards_file_id_generation_position",
+        ),
+    )
 
     def __repr__(self) -> str:
         return f"<FlashCard id={self.id} question='{self.question[:50]}...'>"
@@ -165,20 +294,42 @@ class Quiz(Base):
         Uuid(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
+    )
+    file_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid(as_uuid=True),
+        ForeignKey("files.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    question_type: Mapped[QuestionType] = mapped_column(
+        SqlEnum(QuestionType), nullable=False
     )
     question: Mapped[str] = mapped_column(String, nullable=False)
     option_1: Mapped[str] = mapped_column(String, nullable=False, name="Option_1")
     option_2: Mapped[str] = mapped_column(String, nullable=False, name="Option_2")
-    option_3: Mapped[str] = mapped_column(String, nullable=False, name="Option_3")
-    option_4: Mapped[str] = mapped_column(String, nullable=False, name="Option_4")
-    correct_option: Mapped[int] = mapped_column(nullable=False)
-    explanation: Mapped[str] = mapped_column(String, nullable=False)
+    option_3: Mapped[str | None] = mapped_column(String, nullable=True, name="Option_3")
+    option_4: Mapped[str | None] = mapped_column(String, nullable=True, name="Option_4")
+    # 1-based option numbers; multiple_correct questions have several.
+    correct_options: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    explanation: Mapped[str | None] = mapped_column(String, nullable=True)
+    generation: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    position: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=func.now(), nullable=False
     )
 
     user: Mapped["User"] = relationship(back_populates="quizzes")
+    file: Mapped["File"] = relationship(back_populates="quizzes")
+
+    __table_args__ = (
+        Index("ix_quizzes_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_quizzes_file_id_created_at_id", "file_id", "created_at", "id"),
+        UniqueConstraint(
+            "file_id",
+            "generation",
+            "position",
+            name="uq_quizzes_file_id_generation_position",
+        ),
+    )
 
     def __repr__(self) -> str:
         return f"<Quiz id={self.id} question='{self.question[:50]}...'>"
@@ -128,11 +128,11 @@ async def login(
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
 async def logout(
-    token: str = Depends(TokenResponse),
+    token: TokenResponse = Depends(TokenResponse),
     auth_service: AuthService = Depends(get_auth_service),
 ) -> None:
     try:
-        await auth_service.logout(token)
+        await auth_service.logout(token.access_token)
     except Exception as e:
         raise handle_auth_error(e) from e
 
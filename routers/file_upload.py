@@ -1,30 +1,34 @@
 import uuid
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, status
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.dependencies import get_current_user_id, get_ingestion_queue
 from core.security import get_current_user
 from core.settings import settings
 from db import get_db
-from models import Embedding, File, User
+from models import DocumentStatus, File
 from schemas.common import ErrorResponseSchema
+from schemas.exception import FileTooLargeError
 from schemas.file import (
     FileDeleteResponse,
     FileListItem,
     FileListResponse,
     FileUploadResponse,
 )
-from services.embeding_service import chunk_text, create_embedding
+from schemas.ingestion import IngestionJobResponse
+from services.document_service import acquire_document, release_document
 from services.file_service import (
     delete_file_from_supabase,
-    list_files_in_supabase,
+    list_user_files,
     upload_file_to_supabase,
 )
-from utils.extractor import DocumentExtractor
-from utils.helper import validate_file_extension, with_temp_file
+from services.ingestion_service import IngestionQueue, to_job_response
+from services.signed_url_cache import signed_urls
+from utils.helper import spool_upload, temporary_path, validate_file_extension
 from utils.logger import get_logger
-from utils.supabase_client import get_signed_url
 
 router = APIRouter(
     responses={
@@ -37,9 +41,10 @@ logger = get_logger()
 @router.post("/upload", response_model=FileUploadResponse)
 async def upload_file(
     file: UploadFile,
-    request: Request,
     auth_user=Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
+    queue: IngestionQueue = Depends(get_ingestion_queue),
 ) -> FileUploadResponse:
     if not file.filename:
         raise HTTPException(
@@ -49,33 +54,15 @@ async def upload_file(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No file uploaded."
         )
-    contents = await file.read()
-    if not contents:
-        raise HTTPException(
-            status.HTTP_400_BAD_REQUEST, detail="Uploaded file is empty"
-        )
     try:
         ext = validate_file_extension(file.filename)
     except ValueError as e:
         logger.error("File Upload Error- Invalid file extension", extra={"error": e})
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    result = await db.execute(select(User).where(User.supabase_id == auth_user))
-    db_user = result.scalar_one_or_none()
-
-    if not db_user:
-        db_user = User(
-            supabase_id=auth_user,
-            email=str(auth_user),
-            name=f"user_{str(auth_user)[:6]}",
-        )
-        db.add(db_user)
-        await db.commit()
-        await db.refresh(db_user)
-
     file_id = uuid.uuid4()
     result = await db.execute(
-        select(File).where(File.filename == file.filename, File.user_id == db_user.id)
+        select(File).where(File.filename == file.filename, File.user_id == user_id)
     )
     existing_file = result.scalar_one_or_none()
     if existing_file:
@@ -83,25 +70,47 @@ async def upload_file(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File with the same name already exists.",
         )
+
+    with temporary_path("." + ext) as spool_path:
+        try:
+            upload = await spool_upload(file, spool_path, settings.MAX_FILE_SIZE_MB)
+        except FileTooLargeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+            )
+        if upload.size == 0:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST, detail="Uploaded file is empty"
+            )
+
+        try:
+            storage_path = await upload_file_to_supabase(
+                file_path=upload.path,
+                filename=file.filename,
+                content_type=file.content_type,
+                bucket_name=settings.SUPABASE_BUCKET,
+                user_id=auth_user,
+                file_id=file_id,
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Upload failed: {str(e)}",
+            )
+
     try:
-        storage_path = await upload_file_to_supabase(
-            bucket_name=settings.SUPABASE_BUCKET,
-            user_id=db_user.supabase_id,
-            file_id=file_id,
-            file=file,
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Upload failed: {str(e)}",
+        document_id, document_status = await acquire_document(
+            db, sha256=upload.sha256, size_bytes=upload.size
         )
-    try:
         db_file = File(
             id=file_id,
             filename=file.filename,
             filepath=storage_path,
-            user_id=db_user.id,
+            user_id=user_id,
             file_type=ext,
+            document_id=document_id,
+            size_bytes=upload.size,
+            content_type=file.content_type,
         )
 
         db.add(db_file)
@@ -120,99 +129,90 @@ async def upload_file(
             detail=f"Database error: {str(e)}",
         )
 
-    signed_url = await get_signed_url(storage_path)
-    try:
-        suffix = "." + ext
-
-        async def process_file(tmp_path: str):
-            extractor = DocumentExtractor(tmp_path)
-            text = extractor.extract()
-
-            chunks = chunk_text(text)
-
-            embeddings = create_embedding(
-                request.app.state.embedding_model,
-                chunks,
-            )
-
-            for chunk, embedding in zip(chunks, embeddings):
-                emb = Embedding(
-                    file_id=file_id,
-                    chunks=chunk,
-                    embedding=embedding,
-                )
-                db.add(emb)
-
-            await db.commit()
-
-        await with_temp_file(contents, suffix, process_file)
+    if document_status == DocumentStatus.Ready:
+        job_id = await queue.record_deduplicated(
+            file_id=file_id,
+            document_id=document_id,
+            user_id=auth_user,
+            storage_path=storage_path,
+            file_type=ext.value,
+        )
+    else:
+        job_id = await queue.enqueue(
+            file_id=file_id,
+            document_id=document_id,
+            user_id=auth_user,
+            storage_path=storage_path,
+            file_type=ext.value,
+        )
 
-    except Exception as e:
-        logger.error("Embedding Pipeline failed", extra={"error": str(e)})
-        await db.rollback()
+    # Signing comes after the job is queued and may fail without failing the
+    # upload; the client can fetch a link from the file listing later.
+    signed_url = (await signed_urls.get_many([storage_path])).get(storage_path)
 
     return FileUploadResponse(
         file_id=str(file_id),
         filename=file.filename,
         file_type=ext,
         download_url=signed_url,
+        job_id=job_id,
     )
 
 
-@router.get("/list", response_model=FileListResponse)
-async def list_files(
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_ingestion_job(
+    job_id: str,
     auth_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-) -> FileListResponse:
-    result = await db.execute(select(User).where(User.supabase_id == auth_user))
-    db_user = result.scalar_one_or_none()
-
-    if not db_user:
+    queue: IngestionQueue = Depends(get_ingestion_queue),
+) -> IngestionJobResponse:
+    job = await queue.get_job(job_id)
+    if not job or job["user_id"] != str(auth_user):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
         )
 
-    try:
-        files = list_files_in_supabase(
-            bucket_name=settings.SUPABASE_BUCKET,
-            user_id=auth_user,
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to list files: {str(e)}",
-        )
+    return to_job_response(job)
 
-    file_responses = []
-    for file in files:
-        file_response = FileListItem(
-            name=file["name"],
-            id=file["id"],
-            size=file["size"],
-            content_type=file["content_type"],
-            updated_at=file["updated_at"],
-            created_at=file["created_at"],
-        )
-        file_responses.append(file_response)
 
-    return FileListResponse(files=file_responses)
+@router.get("/list", response_model=FileListResponse)
+async def list_files(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> FileListResponse:
+    try:
+        files, next_cursor = await list_user_files(db, user_id, limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    download_urls = await signed_urls.get_many([file.filepath for file in files])
+    return FileListResponse(
+        files=[
+            FileListItem(
+                name=file.filename,
+                id=str(file.id),
+                file_type=file.file_type.value,
+                size=file.size_bytes,
+                content_type=file.content_type,
+                updated_at=file.uploaded_at,
+                created_at=file.uploaded_at,
+                download_url=download_urls.get(file.filepath),
+            )
+            for file in files
+        ],
+        next_cursor=next_cursor,
+    )
 
 
 @router.delete("/delete/{file_name}", status_code=status.HTTP_200_OK)
 async def delete_file(
     file_name: str,
-    auth_user=Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
 ) -> FileDeleteResponse:
-    user = await db.execute(select(User).where(User.supabase_id == auth_user))
-    db_user = user.scalar_one_or_none()
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
     file = await db.execute(
-        select(File).where(File.filename == file_name, File.user_id == db_user.id)
+        select(File).where(File.filename == file_name, File.user_id == user_id)
     )
     db_file = file.scalar_one_or_none()
     if not db_file:
@@ -221,6 +221,8 @@ async def delete_file(
         )
     try:
         await db.delete(db_file)
+        await db.flush()
+        await release_document(db, db_file.document_id)
         await db.commit()
     except Exception as e:
         await db.rollback()
@@ -229,8 +231,9 @@ async def delete_file(
             detail=f"Database error: {str(e)}",
         )
 
+    await signed_urls.invalidate(db_file.filepath)
     try:
-        delete_file_from_supabase(
+        await delete_file_from_supabase(
             file_name=[db_file.filepath],
             bucket_name=settings.SUPABASE_BUCKET,
         )
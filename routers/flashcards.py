@@ -0,0 +1,116 @@
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.dependencies import get_current_user_id
+from db import get_db
+from models import Document, DocumentStatus, File
+from schemas.common import ErrorResponseSchema
+from schemas.flashcards import (
+    FlashcardBase,
+    FlashcardGenerationResponse,
+    FlashcardListItem,
+    FlashcardListResponse,
+    FlashcardRequest,
+)
+from services.embedding_engine import embedding_engine
+from services.study_material_service import list_flashcards, save_flashcards
+from utils.flashcards import generate_flashcards_from_document
+
+router = APIRouter(
+    responses={
+        403: {"model": ErrorResponseSchema, "description": "Forbidden Response"}
+    },
+)
+
+
+@router.post("/generate", response_model=FlashcardGenerationResponse)
+async def generate(
+    flashcard_request: FlashcardRequest,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> FlashcardGenerationResponse:
+    try:
+        file_id = uuid.UUID(flashcard_request.file_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+        )
+
+    result = await db.execute(
+        select(File.document_id, Document.status)
+        .join(Document, Document.id == File.document_id)
+        .where(File.id == file_id, File.user_id == user_id)
+    )
+    row = result.one_or_none()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+        )
+    if row.status != DocumentStatus.Ready:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="File is still being processed",
+        )
+
+    query_vector = None
+    if flashcard_request.topic:
+        embeddings = await embedding_engine.encode([flashcard_request.topic])
+        query_vector = embeddings[0]
+
+    generated = await generate_flashcards_from_document(
+        db,
+        row.document_id,
+        num_cards=flashcard_request.total_flashcards,
+        language=flashcard_request.language,
+        query_vector=query_vector,
+    )
+    if "error" in generated:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=generated["error"],
+        )
+
+    await save_flashcards(
+        db, user_id, file_id, generated["flashcards"], generated["generation"]
+    )
+    await db.commit()
+
+    return FlashcardGenerationResponse(
+        file_id=str(file_id),
+        flashcards=[FlashcardBase(**card) for card in generated["flashcards"]],
+    )
+
+
+@router.get("", response_model=FlashcardListResponse)
+async def list_user_flashcards(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    file_id: Optional[uuid.UUID] = None,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> FlashcardListResponse:
+    try:
+        flashcards, next_cursor = await list_flashcards(
+            db, user_id, limit, cursor=cursor, file_id=file_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return FlashcardListResponse(
+        items=[
+            FlashcardListItem(
+                id=str(card.id),
+                file_id=str(card.file_id),
+                question=card.question,
+                answer=card.answer,
+                context=card.explanation,
+                created_at=card.created_at,
+            )
+            for card in flashcards
+        ],
+        next_cursor=next_cursor,
+    )
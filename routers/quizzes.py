@@ -0,0 +1,105 @@
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.dependencies import get_current_user_id
+from db import get_db
+from models import Document, DocumentStatus, File
+from schemas.common import ErrorResponseSchema
+from schemas.quiz import QuizListItem, QuizListResponse, QuizRequest, QuizResponse
+from services.study_material_service import list_quizzes, quiz_question, save_quiz
+from utils.quizzes import generate_quiz_parallel
+
+router = APIRouter(
+    responses={
+        403: {"model": ErrorResponseSchema, "description": "Forbidden Response"}
+    },
+)
+
+
+@router.post("/generate", response_model=QuizResponse)
+async def generate(
+    quiz_request: QuizRequest,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> QuizResponse:
+    try:
+        file_id = uuid.UUID(quiz_request.file_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+        )
+
+    result = await db.execute(
+        select(Document.status)
+        .join(File, File.document_id == Document.id)
+        .where(File.id == file_id, File.user_id == user_id)
+    )
+    document_status = result.scalar_one_or_none()
+    if document_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+        )
+    if document_status != DocumentStatus.Ready:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="File is still being processed",
+        )
+
+    generated = await generate_quiz_parallel(
+        db,
+        str(file_id),
+        total_questions=quiz_request.total_questions,
+        num_single_correct=_auto_if_unset(quiz_request.num_single_correct),
+        num_multiple_correct=_auto_if_unset(quiz_request.num_multiple_correct),
+        num_yes_no=_auto_if_unset(quiz_request.num_yes_no),
+        language=quiz_request.language,
+    )
+    if "error" in generated:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=generated["error"],
+        )
+
+    await save_quiz(
+        db, user_id, file_id, generated["questions"], generated["generation"]
+    )
+    await db.commit()
+
+    return QuizResponse(questions=generated["questions"])
+
+
+@router.get("", response_model=QuizListResponse)
+async def list_user_quizzes(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    file_id: Optional[uuid.UUID] = None,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> QuizListResponse:
+    try:
+        quizzes, next_cursor = await list_quizzes(
+            db, user_id, limit, cursor=cursor, file_id=file_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return QuizListResponse(
+        items=[
+            QuizListItem(
+                id=str(quiz.id),
+                file_id=str(quiz.file_id),
+                created_at=quiz.created_at,
+                **quiz_question(quiz),
+            )
+            for quiz in quizzes
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+def _auto_if_unset(count: int | None) -> int:
+    return -1 if count is None else count
@@ -0,0 +1,35 @@
+import uuid
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.dependencies import get_current_user_id
+from db import get_db
+from schemas.common import ErrorResponseSchema
+from schemas.search import SearchRequest, SearchResponse
+from services.embedding_engine import embedding_engine
+from services.search_service import search_chunks
+
+router = APIRouter(
+    responses={
+        403: {"model": ErrorResponseSchema, "description": "Forbidden Response"}
+    },
+)
+
+
+@router.post("", response_model=SearchResponse)
+async def search(
+    search_request: SearchRequest,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> SearchResponse:
+    embeddings = await embedding_engine.encode([search_request.query])
+    results = await search_chunks(
+        db,
+        user_id=user_id,
+        query_vector=embeddings[0],
+        top_k=search_request.top_k,
+        file_ids=search_request.file_ids,
+        ef_search=search_request.ef_search,
+    )
+    return SearchResponse(results=results)
@@ -6,3 +6,33 @@ class DocumentExtractionError(Exception):
 
 class EmbedingModelError(Exception):
     pass
+
+
+class ServerBusyError(Exception):
+    """Raised when a bounded executor or queue is saturated."""
+
+    pass
+
+
+class FileTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit."""
+
+    pass
+
+
+class DocumentBusyError(Exception):
+    """Raised when another ingestion job is already processing a document."""
+
+    pass
+
+
+class SupabaseAPIError(Exception):
+    """Raised when the Supabase REST API answers with a non-2xx status."""
+
+    def __init__(
+        self, status_code: int, message: str, error_code: str | None = None
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.error_code = error_code
@@ -1,20 +1,26 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
 
 
 class FileUploadResponse(BaseModel):
     file_id: str
     filename: str
     file_type: str
-    download_url: str
+    download_url: Optional[str] = None
+    job_id: str
 
 
 class FileListItem(BaseModel):
     name: str
     id: str
-    updated_at: str
-    created_at: str
+    file_type: str
+    updated_at: datetime
+    created_at: datetime
     size: int
-    content_type: str
+    content_type: Optional[str] = None
+    download_url: Optional[str] = None
 
 
 class FileDeleteResponse(BaseModel):
@@ -23,3 +29,6 @@ class FileDeleteResponse(BaseModel):
 
 class FileListResponse(BaseModel):
     files: list[FileListItem]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as cursor to fetch the next page"
+    )
@@ -48,6 +48,35 @@ class FlashcardRequest(BaseModel):
     language: str = Field(
         "English", description="Language for the generated flashcards"
     )
+    topic: Optional[str] = Field(
+        None,
+        max_length=1000,
+        description="Focus retrieval on chunks related to this topic",
+    )
+
+
+class FlashcardGenerationResponse(BaseModel):
+    """Schema for the flashcards generated from a file"""
+
+    file_id: str
+    flashcards: List[FlashcardBase]
+
+
+class FlashcardListItem(FlashcardBase):
+    """Schema for a stored flashcard in a list response"""
+
+    id: str
+    file_id: str
+    created_at: datetime
+
+
+class FlashcardListResponse(BaseModel):
+    """Schema for one keyset-paginated page of flashcards"""
+
+    items: List[FlashcardListItem]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as cursor to fetch the next page"
+    )
 
 
 class FlashcardBatch(BaseModel):
@@ -0,0 +1,36 @@
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class IngestionStatus(str, Enum):
+    Queued = "queued"
+    Running = "running"
+    Completed = "completed"
+    Failed = "failed"
+
+
+class IngestionStage(str, Enum):
+    Extracted = "extracted"
+    Chunked = "chunked"
+    Embedded = "embedded"
+    Persisted = "persisted"
+
+
+class IngestionStageProgress(BaseModel):
+    stage: IngestionStage
+    completed: bool
+    completed_at: datetime | None = None
+
+
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    file_id: str
+    status: IngestionStatus
+    attempts: int
+    deduplicated: bool = False
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+    stages: list[IngestionStageProgress]
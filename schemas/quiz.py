@@ -1,6 +1,7 @@
+from datetime import datetime
 from typing import List, Literal, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
 
 QuizQuestionType = Literal["single_correct", "multiple_correct", "yes_no"]
 
@@ -13,8 +14,8 @@ class QuizQuestion(BaseModel):
 
     @field_validator("correct_answers")
     @classmethod
-    def must_be_in_options(cls, v, values):
-        options = values.get("options", [])
+    def must_be_in_options(cls, v, info: ValidationInfo):
+        options = info.data.get("options", [])
         if not all(ans in options for ans in v):
             raise ValueError("All correct_answers must be in options")
         return v
@@ -25,6 +26,19 @@ class QuizResponse(BaseModel):
     error: Optional[str] = None
 
 
+class QuizListItem(QuizQuestion):
+    id: str
+    file_id: str
+    created_at: datetime
+
+
+class QuizListResponse(BaseModel):
+    items: List[QuizListItem]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as cursor to fetch the next page"
+    )
+
+
 class QuizRequest(BaseModel):
     file_id: str = Field(...)
     total_questions: int = Field(5, gt=0)
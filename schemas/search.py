@@ -0,0 +1,35 @@
+import uuid
+
+from pydantic import BaseModel, Field
+
+
+class SearchRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=1000)
+    top_k: int = Field(5, ge=1, le=50)
+    file_ids: list[uuid.UUID] | None = Field(
+        None, description="Restrict the search to these files"
+    )
+    ef_search: int | None = Field(
+        None,
+        ge=1,
+        le=1000,
+        description="HNSW candidate list size; higher trades latency for recall",
+    )
+
+
+class SearchResult(BaseModel):
+    file_id: str
+    filename: str
+    chunk: str
+    score: float
+    page_number: int | None = Field(
+        None, description="Page or slide the chunk starts on"
+    )
+    char_start: int | None = Field(
+        None, description="Offset of the chunk in the document's extracted text"
+    )
+    char_end: int | None = None
+
+
+class SearchResponse(BaseModel):
+    results: list[SearchResult]
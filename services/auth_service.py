@@ -3,32 +3,45 @@ from typing import Any
 from core.constants import OAuth, Supabase
 from schemas.auth import UserCreate, UserLogin
 from utils.logger import get_logger
-from utils.supabase_client import get_supabase_client
+from utils.supabase_client import get_supabase_client, supabase_http
 
 logger = get_logger()
 
 
 class AuthService:
-    """Services for authentication operations"""
+    """Services for authentication operations.
+
+    Email/password flows call the Supabase Auth REST API through the shared
+    async client; user-scoped calls send the user's own access token, so no
+    session state is ever stored on a shared client.
+    """
 
     def __init__(self) -> None:
-        self.client = get_supabase_client()
+        self.http = supabase_http
+
+    @property
+    def client(self) -> Any:
+        """Sync supabase-py client, only needed for the OAuth PKCE flow."""
+        return get_supabase_client()
 
     async def signup(self, user_data: UserCreate) -> dict[str, Any]:
         try:
-            auth_response = self.client.auth.sign_up(
-                {
+            auth_response = await self.http.request(
+                "POST",
+                "/auth/v1/signup",
+                json={
                     "email": user_data.email,
                     "password": user_data.password,
-                    "options": {
-                        "data": {
-                            "full_name": f"{user_data.first_name} {user_data.last_name}",
-                        }
+                    "data": {
+                        "full_name": f"{user_data.first_name} {user_data.last_name}",
                     },
-                }
+                },
             )
 
-            if auth_response.user:
+            # Without auto-confirm Supabase returns the bare user, not a session.
+            if auth_response and "user" not in auth_response:
+                auth_response = {"user": auth_response}
+            if auth_response and auth_response.get("user"):
                 logger.info("User Created", extra={"email": user_data.email})
                 return self._build_auth_dict(auth_response)
 
@@ -45,21 +58,24 @@ class AuthService:
     async def login(self, user_data: UserLogin) -> dict[str, Any]:
         """Authenticate a user with email and password"""
         try:
-            auth_response = self.client.auth.sign_in_with_password(
-                {
+            auth_response = await self.http.request(
+                "POST",
+                "/auth/v1/token",
+                params={"grant_type": "password"},
+                json={
                     "email": user_data.email,
                     "password": user_data.password,
-                }
+                },
             )
             if (
-                not hasattr(auth_response, "user")
-                or not auth_response.user
-                or not auth_response.session
+                not auth_response
+                or not auth_response.get("user")
+                or not auth_response.get("access_token")
             ):
                 raise ValueError("Error Authentication failed")
 
             logger.info(
-                "User login successful", extra={"user_id": auth_response.user.id}
+                "User login successful", extra={"user_id": auth_response["user"]["id"]}
             )
             return self._build_auth_dict(auth_response)
         except Exception as e:
@@ -68,7 +84,7 @@ class AuthService:
 
     async def logout(self, token: str) -> bool:
         try:
-            self.client.auth.sign_out()
+            await self.http.request("POST", "/auth/v1/logout", bearer=token)
             logger.info("user logged out")
             return True
         except Exception as e:
@@ -78,8 +94,11 @@ class AuthService:
     async def request_password_reset(self, email: str, redirect_url: str) -> bool:
         """Send password reset email with redirect URL"""
         try:
-            self.client.auth.reset_password_email(
-                email, options={"redirect_to": redirect_url}
+            await self.http.request(
+                "POST",
+                "/auth/v1/recover",
+                params={"redirect_to": redirect_url},
+                json={"email": email},
             )
             logger.info("Password reset email sent", extra={"email": email})
             return True
@@ -90,16 +109,17 @@ class AuthService:
     async def update_password(self, access_token: str, new_password: str) -> bool:
         """Update user password using the access token from reset link"""
         try:
-            self.client.auth.set_session(access_token, "")
-
-            response = self.client.auth.update_user({"password": new_password})
+            user = await self.http.request(
+                "PUT",
+                "/auth/v1/user",
+                bearer=access_token,
+                json={"password": new_password},
+            )
 
-            if not response.user:
+            if not user or not user.get("id"):
                 raise ValueError("Failed to update password")
 
-            logger.info(
-                "Password updated successfully", extra={"user_id": response.user.id}
-            )
+            logger.info("Password updated successfully", extra={"user_id": user["id"]})
             return True
 
         except Exception as e:
@@ -110,8 +130,11 @@ class AuthService:
         """Initiate OAuth login flow"""
         if provider != OAuth.GOOGLE:
             raise ValueError(f"Unsupported provider: {provider}")
-        auth_response = self.client.auth.sign_in_with_oauth(
-            {"provider": "google", "options": {"redirect_to": redirect_url}}
+        # The PKCE verifier lives in the sync client's storage, so the OAuth
+        # flow stays on it and only runs off the event loop.
+        auth_response = await self.http.run_sync(
+            self.client.auth.sign_in_with_oauth,
+            {"provider": "google", "options": {"redirect_to": redirect_url}},
         )
 
         return {"auth_url": auth_response.url}
@@ -126,8 +149,9 @@ class AuthService:
         try:
             code_exchange_params = {"auth_code": code, "redirect_to": redirect_url}
 
-            auth_response = self.client.auth.exchange_code_for_session(
-                code_exchange_params  # type: ignore
+            auth_response = await self.http.run_sync(
+                self.client.auth.exchange_code_for_session,
+                code_exchange_params,
             )
 
             if not auth_response.user or not auth_response.session:
@@ -136,15 +160,22 @@ class AuthService:
             logger.info(
                 "OAuth login successful", extra={"user_id": auth_response.user.id}
             )
-            return self._build_auth_dict(auth_response)
+            return self._build_auth_dict(
+                {
+                    "user": auth_response.user.model_dump(mode="json"),
+                    "access_token": auth_response.session.access_token,
+                    "refresh_token": auth_response.session.refresh_token,
+                }
+            )
 
         except Exception as e:
             logger.error("OAuth authentication error", extra={"error": e})
             raise ValueError(f"OAuth authentication failed: {e!s}") from e
 
-    def _build_auth_dict(self, auth_response: Any) -> dict[str, Any]:
+    def _build_auth_dict(self, auth_response: dict[str, Any]) -> dict[str, Any]:
         """Build auth dict in format expected by format_auth_response helper"""
-        user_metadata = auth_response.user.user_metadata
+        user = auth_response["user"]
+        user_metadata = user.get("user_metadata")
         if isinstance(user_metadata, str):
             logger.warning(
                 "User metadata is string instead of dict",
@@ -159,24 +190,20 @@ class AuthService:
             full_name = user_metadata.get(Supabase.FULL_NAME_FIELD, "")
 
         user_dict = {
-            "id": auth_response.user.id,
-            "email": auth_response.user.email,
+            "id": user["id"],
+            "email": user.get("email"),
             "user_metadata": user_metadata,
             "full_name": full_name,
-            "created_at": auth_response.user.created_at,
+            "created_at": user.get("created_at"),
         }
 
         session_dict = {}
-        if auth_response.session:
-            session_obj = auth_response.session
-            access_token = getattr(session_obj, "access_token", None)
-            refresh_token = getattr(session_obj, "refresh_token", None)
-
-            if access_token:
-                session_dict = {
-                    "access_token": access_token,
-                    "refresh_token": refresh_token or "",
-                }
+        access_token = auth_response.get("access_token")
+        if access_token:
+            session_dict = {
+                "access_token": access_token,
+                "refresh_token": auth_response.get("refresh_token") or "",
+            }
 
         return {
             "user": user_dict,
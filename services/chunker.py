@@ -0,0 +1,219 @@
+import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import pairwise
+from typing import Any, NamedTuple, Sequence
+
+from core.settings import settings
+from services.embeding_service import load_tokenizer
+from utils.extractor import DocumentPage
+
+# Chunk boundaries are tried in this order: slide markers from the PPTX
+# extractor, markdown headings, paragraphs (pages are joined as paragraphs),
+# lines, sentences and finally words. Each pattern matches where a new piece
+# starts, so the separator stays with the text that follows it.
+_SEPARATORS = [
+    re.compile(r"\n(?=--- Slide \d+ ---)"),
+    re.compile(r"\n(?=#{1,6} )"),
+    re.compile(r"\n\s*\n"),
+    re.compile(r"\n"),
+    re.compile(r"(?<=[.!?。．])\s+"),
+    re.compile(r"\s+"),
+]
+
+PAGE_SEPARATOR = "\n\n"
+
+
+class Chunk(NamedTuple):
+    text: str
+    page_number: int  # page the chunk starts on
+    # Offsets into the document text: its non-empty pages joined by
+    # PAGE_SEPARATOR.
+    char_start: int
+    char_end: int
+
+
+class ChunkState(NamedTuple):
+    """Where chunking of a document stopped, passed from one window to the next.
+
+    The tail is the document text from the start of the last chunk on. That
+    chunk could still merge with the next page, so it is chunked again with
+    it instead of being emitted.
+    """
+
+    tail: str = ""
+    tail_start: int = 0
+    # (document offset, page number) of the pages the tail overlaps
+    tail_pages: tuple[tuple[int, int], ...] = ()
+    next_offset: int = 0  # document offset of the next non-empty page
+
+
+class DocumentChunker:
+    """Split documents into chunks sized in the embedding model's tokens.
+
+    Text is cut recursively at the most structural separator that brings each
+    piece under max_tokens, then neighbouring pieces are merged back up to
+    max_tokens, repeating up to overlap_tokens of trailing pieces at the start
+    of the next chunk. Token counts come from one pass of the model's fast
+    tokenizer over the text, so no piece is tokenized twice.
+    """
+
+    def __init__(
+        self, tokenizer: Any, max_tokens: int, overlap_tokens: int = 0
+    ) -> None:
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def chunk_pages(
+        self, pages: Sequence[DocumentPage], state: ChunkState = ChunkState()
+    ) -> tuple[list[Chunk], ChunkState]:
+        """
+        Chunk the next pages of a document that is read window by window.
+
+        The last chunk is held back in the returned state, since it could
+        still grow with the following pages; once the document ends,
+        finish() returns it.
+
+        Returns:
+            tuple[list[Chunk], ChunkState]: Finished chunks and the new state.
+        """
+        tail, tail_start, tail_pages, offset = state
+        parts = [tail] if tail else []
+        page_marks = list(tail_pages)
+        for page in pages:
+            if not page.text:
+                continue
+            page_marks.append((offset, page.number))
+            parts.append(page.text)
+            offset += len(page.text) + len(PAGE_SEPARATOR)
+        if len(page_marks) == len(tail_pages):
+            return [], state
+
+        text = PAGE_SEPARATOR.join(parts)
+        base = tail_start if tail else page_marks[0][0]
+        page_starts = [page_start for page_start, _ in page_marks]
+
+        def page_at(position: int) -> int:
+            return bisect_right(page_starts, base + position) - 1
+
+        spans = self.split(text)
+        if not spans:
+            return [], ChunkState(next_offset=offset)
+        chunks = [
+            Chunk(
+                text[start:end],
+                page_marks[page_at(start)][1],
+                base + start,
+                base + end,
+            )
+            for start, end in spans[:-1]
+        ]
+        last_start = spans[-1][0]
+        return chunks, ChunkState(
+            text[last_start:],
+            base + last_start,
+            tuple(page_marks[page_at(last_start) :]),
+            offset,
+        )
+
+    @staticmethod
+    def finish(state: ChunkState) -> list[Chunk]:
+        if not state.tail:
+            return []
+        text = state.tail.rstrip()
+        start = state.tail_start
+        return [Chunk(text, state.tail_pages[0][1], start, start + len(text))]
+
+    def split(self, text: str) -> list[tuple[int, int]]:
+        """Return the (start, end) spans of the chunks of text."""
+        encoding = self.tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True
+        )
+        token_starts = [start for start, end in encoding["offset_mapping"] if end]
+        splitter = _Split(text, token_starts, self.max_tokens)
+        return splitter.merge(splitter.pieces(0, len(text), 0), self.overlap_tokens)
+
+
+class _Split:
+    def __init__(self, text: str, token_starts: list[int], max_tokens: int) -> None:
+        self.text = text
+        self.token_starts = token_starts
+        self.max_tokens = max_tokens
+
+    def tokens(self, start: int, end: int) -> int:
+        return bisect_left(self.token_starts, end) - bisect_left(
+            self.token_starts, start
+        )
+
+    def pieces(self, start: int, end: int, level: int) -> list[tuple[int, int]]:
+        if self.tokens(start, end) <= self.max_tokens:
+            return [(start, end)]
+        if level == len(_SEPARATORS):
+            # A single word longer than a chunk; cut it between tokens.
+            first = bisect_left(self.token_starts, start)
+            last = bisect_left(self.token_starts, end)
+            cuts = self.token_starts[first + self.max_tokens : last : self.max_tokens]
+            return list(pairwise([start, *cuts, end]))
+
+        cuts = [
+            match.start()
+            for match in _SEPARATORS[level].finditer(self.text, start, end)
+            if match.start() > start
+        ]
+        result: list[tuple[int, int]] = []
+        for piece_start, piece_end in pairwise([start, *cuts, end]):
+            result.extend(self.pieces(piece_start, piece_end, level + 1))
+        return result
+
+    def merge(
+        self, pieces: list[tuple[int, int]], overlap_tokens: int
+    ) -> list[tuple[int, int]]:
+        spans: list[tuple[int, int]] = []
+        current: list[tuple[int, int]] = []
+        for piece in pieces:
+            if current and self.tokens(current[0][0], piece[1]) > self.max_tokens:
+                spans.append((current[0][0], current[-1][1]))
+                kept: list[tuple[int, int]] = []
+                for previous in reversed(current):
+                    if (
+                        self.tokens(previous[0], piece[0]) > overlap_tokens
+                        or self.tokens(previous[0], piece[1]) > self.max_tokens
+                    ):
+                        break
+                    kept.insert(0, previous)
+                current = kept
+            current.append(piece)
+        if current:
+            spans.append((current[0][0], current[-1][1]))
+        return [span for span in map(self.strip, spans) if span[0] < span[1]]
+
+    def strip(self, span: tuple[int, int]) -> tuple[int, int]:
+        start, end = span
+        while start < end and self.text[start].isspace():
+            start += 1
+        while end > start and self.text[end - 1].isspace():
+            end -= 1
+        return start, end
+
+
+@lru_cache
+def default_chunker() -> DocumentChunker:
+    # The model adds [CLS] and [SEP] to every input.
+    return DocumentChunker(
+        load_tokenizer(),
+        max_tokens=settings.CHUNK_MAX_TOKENS - 2,
+        overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+    )
+
+
+def chunk_pages(
+    pages: Sequence[DocumentPage], state: ChunkState = ChunkState()
+) -> tuple[list[Chunk], ChunkState]:
+    """Chunk pages with the default chunker; picklable entry point for process pools."""
+    return default_chunker().chunk_pages(pages, state)
+
+
+def chunk_text(text: str) -> list[str]:
+    chunks, state = chunk_pages([DocumentPage(1, text)])
+    return [chunk.text for chunk in chunks + DocumentChunker.finish(state)]
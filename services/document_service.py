@@ -0,0 +1,100 @@
+import uuid
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Document, DocumentStatus
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+async def acquire_document(
+    db: AsyncSession, sha256: str, size_bytes: int
+) -> tuple[uuid.UUID, DocumentStatus]:
+    """
+    Return the document for the given content hash, creating it if needed.
+
+    Each call takes one reference on the document; the caller must commit.
+
+    Args:
+        db (AsyncSession): Database session.
+        sha256 (str): Hex digest of the uploaded bytes.
+        size_bytes (int): Size of the uploaded bytes.
+
+    Returns:
+        tuple[uuid.UUID, DocumentStatus]: Document id and its ingestion status.
+    """
+    stmt = (
+        insert(Document)
+        .values(
+            id=uuid.uuid4(),
+            sha256=sha256,
+            size_bytes=size_bytes,
+            refcount=1,
+            status=DocumentStatus.Pending,
+        )
+        .on_conflict_do_update(
+            index_elements=[Document.sha256],
+            set_={"refcount": Document.refcount + 1},
+        )
+        .returning(Document.id, Document.status)
+    )
+    document_id, document_status = (await db.execute(stmt)).one()
+    return document_id, document_status
+
+
+async def release_document(db: AsyncSession, document_id: uuid.UUID) -> None:
+    """Drop one reference, deleting the document and its chunks at zero."""
+    result = await db.execute(
+        update(Document)
+        .where(Document.id == document_id)
+        .values(refcount=Document.refcount - 1)
+        .returning(Document.refcount)
+    )
+    refcount = result.scalar_one_or_none()
+    if refcount is not None and refcount <= 0:
+        await db.execute(
+            delete(Document).where(Document.id == document_id, Document.refcount <= 0)
+        )
+        logger.info("Document released", extra={"document_id": str(document_id)})
+
+
+async def claim_document(db: AsyncSession, document_id: uuid.UUID, job_id: str) -> bool:
+    """
+    Mark a document as being ingested by the given job.
+
+    Only one job may ingest a document at a time; the owning job can reclaim
+    it after a crash.
+    """
+    result = await db.execute(
+        update(Document)
+        .where(
+            Document.id == document_id,
+            or_(
+                Document.status.in_([DocumentStatus.Pending, DocumentStatus.Failed]),
+                (Document.status == DocumentStatus.Processing)
+                & (Document.ingest_job_id == job_id),
+            ),
+        )
+        .values(status=DocumentStatus.Processing, ingest_job_id=job_id)
+        .returning(Document.id)
+    )
+    await db.commit()
+    return result.scalar_one_or_none() is not None
+
+
+async def get_document_status(
+    db: AsyncSession, document_id: uuid.UUID
+) -> DocumentStatus | None:
+    result = await db.execute(select(Document.status).where(Document.id == document_id))
+    return result.scalar_one_or_none()
+
+
+async def set_document_status(
+    db: AsyncSession, document_id: uuid.UUID, status: DocumentStatus
+) -> None:
+    await db.execute(
+        update(Document).where(Document.id == document_id).values(status=status)
+    )
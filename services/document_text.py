@@ -0,0 +1,208 @@
+import uuid
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional
+
+import zstandard
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.settings import settings
+from models import Document, DocumentSection, DocumentStatus, File
+from services.chunker import PAGE_SEPARATOR
+from utils.extractor import DocumentPage
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class TextSection(NamedTuple):
+    position: int
+    page_number: int  # first page in the section
+    char_start: int
+    char_end: int
+    data: bytes  # zstd-compressed UTF-8
+
+
+class SectionWriter:
+    """Cut a document's text into compressed sections as its pages stream in.
+
+    The document text is the non-empty pages joined by PAGE_SEPARATOR, the
+    same text chunk offsets point into. Sections end on page boundaries once
+    they hold DOCUMENT_SECTION_CHARS characters and concatenate back to the
+    full text, so any character range maps to a few whole sections.
+    """
+
+    def __init__(self) -> None:
+        self.compressor = zstandard.ZstdCompressor(
+            level=settings.DOCUMENT_TEXT_ZSTD_LEVEL
+        )
+        self.parts: list[str] = []
+        self.size = 0
+        self.position = 0
+        self.page_number = 0
+        self.start = 0
+        self.offset = 0
+
+    def add(self, pages: Iterable[DocumentPage]) -> list[TextSection]:
+        """Add the next pages; return the sections they completed."""
+        completed = []
+        for page in pages:
+            if not page.text:
+                continue
+            part = PAGE_SEPARATOR + page.text if self.offset else page.text
+            if not self.parts:
+                self.page_number = page.number
+                self.start = self.offset
+            self.parts.append(part)
+            self.size += len(part)
+            self.offset += len(part)
+            if self.size >= settings.DOCUMENT_SECTION_CHARS:
+                completed.append(self._flush())
+        return completed
+
+    def finish(self) -> list[TextSection]:
+        return [self._flush()] if self.parts else []
+
+    def _flush(self) -> TextSection:
+        text = "".join(self.parts)
+        section = TextSection(
+            self.position,
+            self.page_number,
+            self.start,
+            self.offset,
+            self.compressor.compress(text.encode("utf-8")),
+        )
+        self.parts = []
+        self.size = 0
+        self.position += 1
+        return section
+
+
+async def store_sections(
+    db: AsyncSession, document_id: uuid.UUID, sections: list[TextSection]
+) -> None:
+    """Insert sections in the session's transaction; the caller commits."""
+    if not sections:
+        return
+    await db.execute(
+        insert(DocumentSection),
+        [{"document_id": document_id, **section._asdict()} for section in sections],
+    )
+
+
+class DocumentTextStore:
+    """Read stored document text, decompressing only the sections a range needs.
+
+    Decompressed sections are kept in an in-process LRU bounded by
+    DOCUMENT_TEXT_CACHE_MAX_CHARS, so hot documents are served without
+    touching the database. Sections never change once written, so entries
+    need no invalidation; a re-ingested document writes the same text.
+    """
+
+    def __init__(self) -> None:
+        self.local: OrderedDict[tuple[uuid.UUID, int], str] = OrderedDict()
+        self.local_chars = 0
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        self.local.clear()
+        self.local_chars = 0
+
+    async def read(
+        self,
+        db: AsyncSession,
+        document_id: uuid.UUID,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        Return the document text in [start, end), or None if none is stored.
+
+        Args:
+            db (AsyncSession): Database session.
+            document_id (uuid.UUID): Document whose text is read.
+            start (int): First character, as recorded on chunks.
+            end (Optional[int]): End character; the end of the text if None.
+        """
+        query = select(
+            DocumentSection.position,
+            DocumentSection.char_start,
+            DocumentSection.char_end,
+        ).where(DocumentSection.document_id == document_id)
+        index = (await db.execute(query.order_by(DocumentSection.position))).all()
+        if not index:
+            return None
+
+        ends = [row.char_end for row in index]
+        first = bisect_right(ends, start)
+        last = len(index) if end is None else bisect_right(ends, end - 1) + 1
+        wanted = index[first:last]
+        if not wanted:
+            return ""
+
+        texts = await self._sections(db, document_id, [row.position for row in wanted])
+        text = "".join(texts)
+        offset = wanted[0].char_start
+        return text[start - offset : None if end is None else end - offset]
+
+    async def read_file(self, db: AsyncSession, file_id: uuid.UUID) -> Optional[str]:
+        """
+        Return the full text of a file's document, or None until it is ready.
+
+        Ingestion commits sections as it goes, so the text of a document that
+        is not Ready yet may be only a prefix of it.
+        """
+        document_id = (
+            await db.execute(
+                select(File.document_id)
+                .join(Document, Document.id == File.document_id)
+                .where(File.id == file_id, Document.status == DocumentStatus.Ready)
+            )
+        ).scalar_one_or_none()
+        if document_id is None:
+            return None
+        return await self.read(db, document_id)
+
+    async def _sections(
+        self, db: AsyncSession, document_id: uuid.UUID, positions: list[int]
+    ) -> list[str]:
+        found = {}
+        for position in positions:
+            text = self.local.get((document_id, position))
+            if text is not None:
+                self.local.move_to_end((document_id, position))
+                found[position] = text
+        self.hits += len(found)
+
+        missing = [position for position in positions if position not in found]
+        if missing:
+            self.misses += len(missing)
+            rows = await db.execute(
+                select(DocumentSection.position, DocumentSection.data).where(
+                    DocumentSection.document_id == document_id,
+                    DocumentSection.position.in_(missing),
+                )
+            )
+            decompressor = zstandard.ZstdDecompressor()
+            for position, data in rows.all():
+                text = decompressor.decompress(data).decode("utf-8")
+                found[position] = text
+                self._store_local((document_id, position), text)
+        return [found[position] for position in positions]
+
+    def _store_local(self, key: tuple[uuid.UUID, int], text: str) -> None:
+        if len(text) > settings.DOCUMENT_TEXT_CACHE_MAX_CHARS:
+            return
+        previous = self.local.pop(key, None)
+        if previous is not None:
+            self.local_chars -= len(previous)
+        self.local[key] = text
+        self.local_chars += len(text)
+        while self.local_chars > settings.DOCUMENT_TEXT_CACHE_MAX_CHARS:
+            _, evicted = self.local.popitem(last=False)
+            self.local_chars -= len(evicted)
+
+
+document_texts = DocumentTextStore()
@@ -0,0 +1,244 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+import numpy as np
+
+from core.executor import executors
+from core.settings import settings
+from schemas.exception import ServerBusyError
+from services.embedding_sidecar import SidecarClient
+from services.embeding_service import create_embedding
+from utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = get_logger()
+
+
+@dataclass
+class _EncodeRequest:
+    texts: list[str]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class BatchMetrics:
+    """Running counters for batch sizes, queue latency and encode throughput"""
+
+    def __init__(self) -> None:
+        self.batches = 0
+        self.texts = 0
+        self.requests = 0
+        self.encode_seconds_total = 0.0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+
+    def record_batch(self, texts: int, encode_seconds: float) -> None:
+        self.batches += 1
+        self.texts += texts
+        self.encode_seconds_total += encode_seconds
+
+    def record_queue_wait(self, seconds: float) -> None:
+        self.requests += 1
+        self.queue_seconds_total += seconds
+        self.queue_seconds_max = max(self.queue_seconds_max, seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": (
+                round(self.texts / self.batches, 2) if self.batches else 0.0
+            ),
+            "texts_per_sec": (
+                round(self.texts / self.encode_seconds_total, 1)
+                if self.encode_seconds_total
+                else 0.0
+            ),
+            "queue_ms_avg": (
+                round(self.queue_seconds_total * 1000 / self.requests, 3)
+                if self.requests
+                else 0.0
+            ),
+            "queue_ms_max": round(self.queue_seconds_max * 1000, 3),
+        }
+
+
+class EmbeddingEngine:
+    """Coalesce encode calls from concurrent callers into shared batches.
+
+    Callers enqueue their texts and await a future. A single collector task
+    waits up to EMBEDDING_BATCH_MAX_WAIT_MS after the oldest queued request
+    for the batch to reach EMBEDDING_BATCH_MAX_SIZE texts, runs one forward
+    pass on the dedicated embedding thread and hands each caller its rows.
+    Large inputs are split into batch-sized slices so a bulk ingestion does
+    not hold up a search query for its whole duration.
+
+    In sidecar mode the engine holds no model and forwards every call to the
+    node's embedding server, which runs this same batching over the requests
+    of all workers.
+    """
+
+    def __init__(self) -> None:
+        self.model: Optional["SentenceTransformer"] = None
+        self.pending: deque[_EncodeRequest] = deque()
+        self.pending_texts = 0
+        self.wakeup: Optional[asyncio.Event] = None
+        self.collector: Optional[asyncio.Task] = None
+        self.remote: Optional[SidecarClient] = None
+        self.metrics = BatchMetrics()
+
+    @property
+    def ready(self) -> bool:
+        return self.collector is not None or self.remote is not None
+
+    async def start(self, load: Callable[[], "SentenceTransformer"]) -> None:
+        """
+        Load the model off the event loop, run a warm-up encode and only then
+        start accepting requests, so the first real caller hits a hot model.
+        """
+        started = time.perf_counter()
+        try:
+            model = await asyncio.to_thread(load)
+            await executors.run_embedding(create_embedding, model, ["warm-up"])
+        except Exception:
+            logger.exception("Failed to load embedding model")
+            raise
+        self.init_engine(model)
+        logger.info(
+            "Embedding engine ready",
+            extra={"startup_ms": round((time.perf_counter() - started) * 1000)},
+        )
+
+    async def connect(self, socket_path: str) -> None:
+        """Use the embedding sidecar at socket_path once it is serving."""
+        client = SidecarClient(socket_path, settings.EMBEDDING_SIDECAR_CONNECTIONS)
+        await client.wait_ready()
+        self.remote = client
+        logger.info("Embedding sidecar connected", extra={"socket": socket_path})
+
+    def init_engine(self, model: "SentenceTransformer") -> None:
+        self.model = model
+        self.metrics = BatchMetrics()
+        self.wakeup = asyncio.Event()
+        self.collector = asyncio.create_task(self._collect())
+
+    async def close(self) -> None:
+        if self.remote:
+            await self.remote.close()
+            self.remote = None
+        if self.collector:
+            self.collector.cancel()
+            await asyncio.gather(self.collector, return_exceptions=True)
+        while self.pending:
+            request = self.pending.popleft()
+            if not request.future.done():
+                request.future.set_exception(RuntimeError("Embedding engine closed"))
+        self.pending_texts = 0
+        self.collector = None
+        self.wakeup = None
+        self.model = None
+
+    async def encode(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed texts as part of whichever batch they land in.
+
+        Raises:
+            ServerBusyError: If the model is still loading or the queue already
+                holds too many texts.
+        """
+        if self.remote:
+            return await self.remote.encode(texts)
+        if not self.collector or not self.wakeup:
+            raise ServerBusyError("embedding model is still loading")
+        if self.pending_texts + len(texts) > settings.EMBEDDING_QUEUE_MAX_TEXTS:
+            logger.warning(
+                "Embedding queue saturated", extra={"pending": self.pending_texts}
+            )
+            raise ServerBusyError("embedding queue is saturated")
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        loop = asyncio.get_running_loop()
+        size = settings.EMBEDDING_BATCH_MAX_SIZE
+        futures = []
+        for start in range(0, len(texts), size):
+            request = _EncodeRequest(texts[start : start + size], loop.create_future())
+            self.pending.append(request)
+            self.pending_texts += len(request.texts)
+            futures.append(request.future)
+        self.wakeup.set()
+
+        parts = await asyncio.gather(*futures)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "mode": "sidecar" if self.remote else "local",
+            "pending_texts": self.pending_texts,
+            **self.metrics.snapshot(),
+        }
+
+    async def _collect(self) -> None:
+        assert self.wakeup
+        max_size = settings.EMBEDDING_BATCH_MAX_SIZE
+        max_wait = settings.EMBEDDING_BATCH_MAX_WAIT_MS / 1000
+        while True:
+            while not self.pending:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+
+            # Requests that queued up behind the previous batch are already
+            # past their window and go straight out.
+            deadline = self.pending[0].enqueued_at + max_wait
+            while self.pending_texts < max_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = [self.pending.popleft()]
+            batch_size = len(batch[0].texts)
+            while self.pending and batch_size + len(self.pending[0].texts) <= max_size:
+                request = self.pending.popleft()
+                batch.append(request)
+                batch_size += len(request.texts)
+            self.pending_texts -= batch_size
+            await self._run_batch(batch)
+
+    async def _run_batch(self, batch: list[_EncodeRequest]) -> None:
+        started = time.perf_counter()
+        for request in batch:
+            self.metrics.record_queue_wait(started - request.enqueued_at)
+
+        texts = [text for request in batch for text in request.texts]
+        try:
+            embeddings = await executors.run_embedding(
+                create_embedding, self.model, texts
+            )
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        self.metrics.record_batch(len(texts), time.perf_counter() - started)
+
+        offset = 0
+        for request in batch:
+            end = offset + len(request.texts)
+            # A caller that gave up (e.g. a disconnected client) is skipped.
+            if not request.future.done():
+                request.future.set_result(embeddings[offset:end])
+            offset = end
+
+
+embedding_engine = EmbeddingEngine()
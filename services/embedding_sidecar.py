@@ -0,0 +1,172 @@
+import asyncio
+import struct
+from typing import Awaitable, Callable
+
+import numpy as np
+
+from schemas.exception import EmbedingModelError, ServerBusyError
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Wire format, all integers big-endian:
+#   request:  u32 text count, then per text a u32 byte length and UTF-8 bytes
+#   response: u8 status; on STATUS_OK a u32 row count, u32 dimensions and
+#             rows * dimensions little-endian float32 values; otherwise a
+#             u32 message length and the UTF-8 error message
+STATUS_OK = 0
+STATUS_BUSY = 1
+STATUS_ERROR = 2
+
+MAX_TEXT_BYTES = 1024 * 1024
+
+_U32 = struct.Struct(">I")
+_SHAPE = struct.Struct(">II")
+_FLOAT32 = np.dtype("<f4")
+
+Encoder = Callable[[list[str]], Awaitable[np.ndarray]]
+
+
+def encode_request(texts: list[str]) -> bytes:
+    parts = [_U32.pack(len(texts))]
+    for text in texts:
+        data = text.encode("utf-8")
+        parts.append(_U32.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+async def read_request(reader: asyncio.StreamReader) -> list[str]:
+    (count,) = _U32.unpack(await reader.readexactly(_U32.size))
+    texts = []
+    for _ in range(count):
+        (length,) = _U32.unpack(await reader.readexactly(_U32.size))
+        if length > MAX_TEXT_BYTES:
+            raise ValueError(f"Text of {length} bytes exceeds the frame limit")
+        texts.append((await reader.readexactly(length)).decode("utf-8"))
+    return texts
+
+
+def encode_response(embeddings: np.ndarray) -> bytes:
+    array = np.ascontiguousarray(embeddings, dtype=_FLOAT32)
+    rows, dims = array.shape if array.ndim == 2 else (0, 0)
+    return bytes([STATUS_OK]) + _SHAPE.pack(rows, dims) + array.tobytes()
+
+
+def encode_error(status: int, message: str) -> bytes:
+    data = message.encode("utf-8")
+    return bytes([status]) + _U32.pack(len(data)) + data
+
+
+async def read_response(reader: asyncio.StreamReader) -> np.ndarray:
+    """
+    Read one response frame.
+
+    Raises:
+        ServerBusyError: If the sidecar is loading or its queue is full.
+        EmbedingModelError: If the sidecar failed to encode the request.
+    """
+    status = (await reader.readexactly(1))[0]
+    if status == STATUS_OK:
+        rows, dims = _SHAPE.unpack(await reader.readexactly(_SHAPE.size))
+        data = await reader.readexactly(rows * dims * _FLOAT32.itemsize)
+        return np.frombuffer(data, dtype=_FLOAT32).reshape(rows, dims)
+
+    (length,) = _U32.unpack(await reader.readexactly(_U32.size))
+    message = (await reader.readexactly(length)).decode("utf-8")
+    if status == STATUS_BUSY:
+        raise ServerBusyError(message)
+    raise EmbedingModelError(message)
+
+
+async def handle_connection(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, encode: Encoder
+) -> None:
+    """Serve encode requests from one client until it disconnects."""
+    try:
+        while True:
+            try:
+                texts = await read_request(reader)
+            except asyncio.IncompleteReadError:
+                return
+            try:
+                frame = encode_response(await encode(texts))
+            except ServerBusyError as e:
+                frame = encode_error(STATUS_BUSY, str(e))
+            except Exception as e:
+                logger.exception("Sidecar encode failed")
+                frame = encode_error(STATUS_ERROR, str(e))
+            writer.write(frame)
+            await writer.drain()
+    except (ConnectionError, ValueError) as e:
+        logger.warning("Sidecar connection dropped", extra={"error": e})
+    finally:
+        writer.close()
+
+
+class SidecarClient:
+    """Send encode requests to the embedding sidecar over a Unix socket.
+
+    Connections are opened on demand and reused, up to max_connections; each
+    carries one request at a time. The sidecar batches requests from every
+    connection together, so a few connections per worker are enough.
+    """
+
+    def __init__(self, socket_path: str, max_connections: int) -> None:
+        self.socket_path = socket_path
+        self.idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.slots = asyncio.Semaphore(max_connections)
+
+    async def encode(self, texts: list[str]) -> np.ndarray:
+        """
+        Raises:
+            ServerBusyError: If the sidecar is loading or its queue is full.
+            EmbedingModelError: If the sidecar is unreachable or failed.
+        """
+        async with self.slots:
+            if self.idle:
+                try:
+                    return await self._send(self.idle.pop(), texts)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # The sidecar restarted since this connection was pooled.
+                    pass
+            try:
+                connection = await asyncio.open_unix_connection(self.socket_path)
+                return await self._send(connection, texts)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                raise EmbedingModelError(f"Embedding sidecar unavailable: {e}") from e
+
+    async def _send(
+        self,
+        connection: tuple[asyncio.StreamReader, asyncio.StreamWriter],
+        texts: list[str],
+    ) -> np.ndarray:
+        reader, writer = connection
+        try:
+            writer.write(encode_request(texts))
+            await writer.drain()
+            embeddings = await read_response(reader)
+        except (ServerBusyError, EmbedingModelError):
+            # The error frame was read in full, so the connection is reusable.
+            self.idle.append(connection)
+            raise
+        except BaseException:
+            writer.close()
+            raise
+        self.idle.append(connection)
+        return embeddings
+
+    async def wait_ready(self, poll_seconds: float = 1.0) -> None:
+        """Block until the sidecar is reachable and its model is warm."""
+        while True:
+            try:
+                await self.encode(["warm-up"])
+                return
+            except (ServerBusyError, EmbedingModelError) as e:
+                logger.info("Waiting for embedding sidecar", extra={"error": str(e)})
+                await asyncio.sleep(poll_seconds)
+
+    async def close(self) -> None:
+        while self.idle:
+            _, writer = self.idle.pop()
+            writer.close()
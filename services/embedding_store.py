@@ -0,0 +1,135 @@
+import struct
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterator, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Document, Embedding
+from services.chunker import Chunk
+from utils.logger import get_logger
+
+logger = get_logger()
+
+_PG_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_COPY_TRAILER = struct.pack("!h", -1)
+_COPY_COLUMNS = [
+    "document_id",
+    "chunks",
+    "page_number",
+    "char_start",
+    "char_end",
+    "embedding",
+    "created_at",
+]
+COPY_BATCH_ROWS = 1000
+
+
+def encode_embedding_rows(
+    document_id: uuid.UUID,
+    chunks: Sequence[Chunk],
+    vectors: np.ndarray,
+    created_at: datetime,
+) -> Iterator[bytes]:
+    """
+    Encode embedding rows in PostgreSQL's binary COPY format.
+
+    Vectors are written straight from the float32 array in pgvector's binary
+    layout (int16 dim, int16 unused, dim big-endian float4).
+
+    Args:
+        document_id (uuid.UUID): Document the chunks belong to.
+        chunks (Sequence[Chunk]): Chunks, one per vector row.
+        vectors (np.ndarray): 2-D array of embeddings, shape (len(chunks), dim).
+        created_at (datetime): Timestamp written to every row.
+
+    Yields:
+        bytes: Consecutive pieces of the COPY stream.
+    """
+    if len(chunks) != len(vectors):
+        raise ValueError("chunks and vectors must have the same length")
+
+    vectors = np.ascontiguousarray(vectors, dtype=">f4")
+    dim = vectors.shape[1] if vectors.ndim == 2 else 0
+    micros = (created_at - _PG_EPOCH) // timedelta(microseconds=1)
+
+    row_prefix = struct.pack("!hi", len(_COPY_COLUMNS), 16) + document_id.bytes
+    vector_header = struct.pack("!ihh", 4 + 4 * dim, dim, 0)
+    created_at_field = struct.pack("!iq", 8, micros)
+
+    yield _COPY_HEADER
+    buffer = bytearray()
+    for i, chunk in enumerate(chunks):
+        text = chunk.text.encode("utf-8")
+        buffer += row_prefix
+        buffer += struct.pack("!i", len(text))
+        buffer += text
+        buffer += struct.pack(
+            "!iiiiii", 4, chunk.page_number, 4, chunk.char_start, 4, chunk.char_end
+        )
+        buffer += vector_header
+        buffer += vectors[i].tobytes()
+        buffer += created_at_field
+        if (i + 1) % COPY_BATCH_ROWS == 0:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += _COPY_TRAILER
+    yield bytes(buffer)
+
+
+async def _aiter(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def bulk_insert_embeddings(
+    db: AsyncSession,
+    document_id: uuid.UUID,
+    chunks: Sequence[Chunk],
+    vectors: np.ndarray,
+) -> int:
+    """
+    Insert embedding rows with a single binary COPY in the session's transaction.
+
+    Args:
+        db (AsyncSession): Database session; the caller commits.
+        document_id (uuid.UUID): Document the chunks belong to.
+        chunks (Sequence[Chunk]): Chunks with their source positions.
+        vectors (np.ndarray): Embeddings as returned by the model.
+
+    Returns:
+        int: Number of rows written.
+    """
+    if not len(chunks):
+        return 0
+
+    # Holding a share lock keeps the document from being released mid-COPY
+    # and opens the transaction the raw COPY below runs in.
+    await db.execute(
+        select(Document.id).where(Document.id == document_id).with_for_update(read=True)
+    )
+
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+    if driver_connection is None:
+        raise RuntimeError("Database connection is not available")
+
+    await driver_connection.copy_to_table(
+        Embedding.__tablename__,
+        source=_aiter(
+            encode_embedding_rows(
+                document_id, chunks, vectors, datetime.now(timezone.utc)
+            )
+        ),
+        columns=_COPY_COLUMNS,
+        format="binary",
+    )
+    logger.info(
+        "Embeddings stored",
+        extra={"document_id": str(document_id), "rows": len(chunks)},
+    )
+    return len(chunks)
@@ -1,37 +1,139 @@
-from typing import Any
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
+from core.settings import settings
+from schemas.exception import EmbedingModelError
 from utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+    from transformers import PreTrainedTokenizerFast
+
 logger = get_logger()
 
+_MODEL_NAME = "all-MiniLM-L6-v2"
+_MODEL_PATH = Path("models") / _MODEL_NAME
+_WEIGHTS_FILE = "model.safetensors"
+
+# Must match the Vector column on the embeddings table.
+EMBEDDING_DIMENSIONS = 384
+
+
+def load_embedding_model(backend: Optional[str] = None) -> "SentenceTransformer":
+    """
+    Load the embedding model with the configured inference backend.
+
+    "torch" runs the PyTorch weights; "onnx" and "onnx-int8" run an ONNX
+    Runtime export of the same model, the latter with int8 dynamic
+    quantization. ONNX files are exported next to the saved model on first
+    use. All backends produce EMBEDDING_DIMENSIONS-dim vectors.
+
+    Args:
+        backend (Optional[str]): Overrides settings.EMBEDDING_BACKEND.
+    """
+    backend = backend or settings.EMBEDDING_BACKEND
+    if backend == "torch":
+        model = _load_torch_model()
+    elif backend == "onnx":
+        model = _load_onnx_model()
+    elif backend == "onnx-int8":
+        model = _load_quantized_onnx_model()
+    else:
+        raise EmbedingModelError(f"Unknown embedding backend: {backend}")
+
+    dimensions = model.get_sentence_embedding_dimension()
+    if dimensions != EMBEDDING_DIMENSIONS:
+        raise EmbedingModelError(
+            f"{backend} backend produces {dimensions}-dim embeddings, "
+            f"expected {EMBEDDING_DIMENSIONS}"
+        )
+    logger.info("Embedding model ready", extra={"backend": backend})
+    return model
+
+
+def _load_onnx_model() -> "SentenceTransformer":
+    from sentence_transformers import SentenceTransformer
+
+    onnx_file = _MODEL_PATH / "onnx" / "model.onnx"
+    if onnx_file.exists():
+        return SentenceTransformer(str(_MODEL_PATH), backend="onnx")
+
+    _load_torch_model()  # make sure the weights are on disk to export from
+    logger.info("Exporting embedding model to ONNX", extra={"path": onnx_file})
+    model = SentenceTransformer(str(_MODEL_PATH), backend="onnx")
+    model.save_pretrained(str(_MODEL_PATH))
+    return model
+
+
+def _load_quantized_onnx_model() -> "SentenceTransformer":
+    from sentence_transformers import (
+        SentenceTransformer,
+        export_dynamic_quantized_onnx_model,
+    )
+
+    config = settings.EMBEDDING_ONNX_QUANTIZATION_CONFIG
+    file_name = f"onnx/model_qint8_{config}.onnx"
+    if not (_MODEL_PATH / file_name).exists():
+        logger.info("Quantizing ONNX embedding model", extra={"quantization": config})
+        export_dynamic_quantized_onnx_model(
+            _load_onnx_model(), config, str(_MODEL_PATH)
+        )
+    return SentenceTransformer(
+        str(_MODEL_PATH), backend="onnx", model_kwargs={"file_name": file_name}
+    )
+
+
+def _load_torch_model() -> "SentenceTransformer":
+    """
+    Load the embedding model from disk, downloading it on first use.
+
+    Weights are kept as safetensors, which load memory-mapped instead of
+    being unpickled into freshly allocated tensors.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if (_MODEL_PATH / _WEIGHTS_FILE).exists():
+        logger.info(
+            "Loading embedding model from disk",
+            extra={"model_name": _MODEL_NAME, "model_path": _MODEL_PATH},
+        )
+        return SentenceTransformer(
+            str(_MODEL_PATH), model_kwargs={"use_safetensors": True}
+        )
+
+    if _MODEL_PATH.exists():
+        # Saved before weights were kept as safetensors; convert it once.
+        model = SentenceTransformer(str(_MODEL_PATH))
+    else:
+        logger.info(
+            "Downloading embedding model from HuggingFace",
+            extra={"model_name": _MODEL_NAME},
+        )
+        model = SentenceTransformer(_MODEL_NAME)
+    model.save(str(_MODEL_PATH), safe_serialization=True)
+    logger.info(
+        "Embedding model saved to disk",
+        extra={"model_name": _MODEL_NAME, "model_path": _MODEL_PATH},
+    )
+    return model
+
+
+def load_tokenizer() -> "PreTrainedTokenizerFast":
+    """Load the embedding model's fast tokenizer without its weights."""
+    from transformers import AutoTokenizer
 
-def chunk_text(text: str) -> list[str]:
-    text_splitter = RecursiveCharacterTextSplitter(
-        separators=[
-            "\n\n",
-            "\n",
-            " ",
-            ".",
-            ",",
-            "\u200b",  # Zero-width space
-            "\uff0c",  # Fullwidth comma
-            "\u3001",  # Ideographic comma
-            "\uff0e",  # Fullwidth full stop
-            "\u3002",  # Ideographic full stop
-            "",
-        ],
-        chunk_size=400,
-        chunk_overlap=50,
+    if _MODEL_PATH.exists():
+        return AutoTokenizer.from_pretrained(str(_MODEL_PATH), use_fast=True)
+    return AutoTokenizer.from_pretrained(
+        f"sentence-transformers/{_MODEL_NAME}", use_fast=True
     )
-    return text_splitter.split_text(text)
 
 
-def create_embedding(model: SentenceTransformer, texts: list[str]) -> list[list[float]]:
+def create_embedding(model: "SentenceTransformer", texts: list[str]) -> np.ndarray:
     try:
-        embeddings = model.encode(texts, show_progress_bar=False).tolist()
+        embeddings = model.encode(texts, show_progress_bar=False, convert_to_numpy=True)
         extra: dict[str, Any] = {"total_exits": len(texts)}
         logger.info("Embeding Created", extra=extra)
         return embeddings
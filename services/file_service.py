@@ -1,24 +1,60 @@
+import asyncio
 import uuid
+from typing import AsyncIterator, Optional
+from urllib.parse import quote
 
-from fastapi import UploadFile
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.settings import settings
+from models import File
+from schemas.exception import SupabaseAPIError
+from services.study_material_service import decode_cursor, encode_cursor
+from utils.helper import STREAM_CHUNK_SIZE
 from utils.logger import get_logger
-from utils.supabase_client import get_supabase_client
+from utils.supabase_client import storage_object_path, supabase_http
 
 logger = get_logger()
 
+STORAGE_LIST_PAGE_SIZE = 1000
+
+
+async def _read_chunks(file_path: str) -> AsyncIterator[bytes]:
+    with open(file_path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, STREAM_CHUNK_SIZE):
+            yield chunk
+
 
 async def upload_file_to_supabase(
-    file: UploadFile, bucket_name: str, file_id: uuid.UUID, user_id: uuid.UUID
+    file_path: str,
+    filename: str,
+    content_type: str | None,
+    bucket_name: str,
+    file_id: uuid.UUID,
+    user_id: uuid.UUID,
 ) -> str:
-    supabase = get_supabase_client()
-    storage_path = f"{user_id}/{file_id}/{file.filename}"
-    file_data = await file.read()
+    """
+    Uploads a spooled file to Supabase storage, streaming it from disk.
+    Args:
+        file_path (str): Local path of the spooled upload.
+        filename (str): Original name of the uploaded file.
+        content_type (str | None): MIME type reported by the client.
+        bucket_name (str): The name of the Supabase storage bucket.
+        file_id (uuid.UUID): ID of the file row.
+        user_id (uuid.UUID): Supabase ID of the owning user.
+    """
+    storage_path = f"{user_id}/{file_id}/{filename}"
     try:
-        supabase.storage.from_(bucket_name).upload(
-            storage_path,
-            file_data,
-            file_options={"content-type": file.content_type, "cacheControl": "3600"},
+        await supabase_http.request(
+            "POST",
+            storage_object_path(bucket_name, storage_path),
+            headers={
+                "content-type": content_type or "application/octet-stream",
+                "cache-control": "max-age=3600",
+                "x-upsert": "false",
+            },
+            content=_read_chunks(file_path),
+            timeout=settings.SUPABASE_TRANSFER_TIMEOUT_SECONDS,
         )
         return storage_path
 
@@ -27,48 +63,135 @@ async def upload_file_to_supabase(
         raise Exception(f"Failed to upload file: {str(e)}")
 
 
-def delete_file_from_supabase(file_name: list[str], bucket_name: str) -> None:
+async def download_file_from_supabase(
+    storage_path: str, bucket_name: str, destination: str
+) -> int:
     """
-    Deletes a file from the specified Supabase storage bucket.
+    Streams a file from Supabase storage to a local path in fixed-size chunks.
     Args:
-        file_name (str): The name of the file to be deleted.
+        storage_path (str): The path of the file inside the bucket.
         bucket_name (str): The name of the Supabase storage bucket.
+        destination (str): Local path to write the file to.
+    Returns:
+        int: Number of bytes written.
     """
+    size = 0
     try:
-        supabase = get_supabase_client()
-        supabase.storage.from_(bucket_name).remove(file_name)
+        async with supabase_http.stream(
+            "GET",
+            storage_object_path(bucket_name, storage_path),
+            timeout=settings.SUPABASE_TRANSFER_TIMEOUT_SECONDS,
+        ) as response:
+            with open(destination, "wb") as f:
+                async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                    size += len(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+        return size
 
     except Exception as e:
-        raise Exception(f"Failed to delete file: {str(e)}")
+        raise Exception(f"Failed to download file: {str(e)}")
 
 
-def list_files_in_supabase(bucket_name: str, user_id: str) -> list[dict]:
+async def delete_file_from_supabase(file_name: list[str], bucket_name: str) -> None:
     """
-    Lists all files in the specified Supabase storage bucket.
+    Deletes files from the specified Supabase storage bucket.
     Args:
+        file_name (list[str]): Storage paths of the files to be deleted.
         bucket_name (str): The name of the Supabase storage bucket.
-        user_id (str): The user ID to list files for.
     """
-    all_files = []
     try:
-        supabase = get_supabase_client()
-        folders = supabase.storage.from_(bucket_name).list(user_id)
-        for folder in folders:
-            folder_name = folder["name"]
-            folder_path = f"{user_id}/{folder_name}/"
-            files = supabase.storage.from_(bucket_name).list(folder_path)
-            for file in files:
-                all_files.append(
-                    {
-                        "name": file["name"],
-                        "id": file["id"],
-                        "updated_at": file["updated_at"],
-                        "created_at": file["created_at"],
-                        "size": file["metadata"]["size"],
-                        "content_type": file["metadata"]["mimetype"],
-                    }
-                )
-        return all_files
+        await supabase_http.request(
+            "DELETE",
+            f"/storage/v1/object/{bucket_name}",
+            json={"prefixes": file_name},
+        )
 
     except Exception as e:
-        raise Exception(f"Failed to list files: {str(e)}")
+        raise Exception(f"Failed to delete file: {str(e)}")
+
+
+async def list_storage_folder(bucket_name: str, prefix: str) -> list[dict]:
+    """
+    Lists every entry directly under a storage prefix, following pagination.
+    Args:
+        bucket_name (str): The name of the Supabase storage bucket.
+        prefix (str): Folder to list; "" lists the bucket root.
+    Returns:
+        list[dict]: Storage entries; folders have no id or metadata.
+    """
+    entries: list[dict] = []
+    while True:
+        page = await supabase_http.request(
+            "POST",
+            f"/storage/v1/object/list/{bucket_name}",
+            json={
+                "prefix": prefix,
+                "limit": STORAGE_LIST_PAGE_SIZE,
+                "offset": len(entries),
+                "sortBy": {"column": "name", "order": "asc"},
+            },
+        )
+        entries.extend(page or [])
+        if not page or len(page) < STORAGE_LIST_PAGE_SIZE:
+            return entries
+
+
+async def storage_object_exists(bucket_name: str, path: str) -> bool:
+    """
+    Checks whether a single object exists in storage.
+    Args:
+        bucket_name (str): The name of the Supabase storage bucket.
+        path (str): The path of the file inside the bucket.
+    Returns:
+        bool: False only when storage reports the object as not found; any
+        other failure raises, so it is never mistaken for a missing object.
+    """
+    try:
+        await supabase_http.request(
+            "GET", f"/storage/v1/object/info/{bucket_name}/{quote(path)}"
+        )
+    except SupabaseAPIError as e:
+        # Older storage versions answer 400 and put the 404 in the body.
+        if e.status_code == 404 or e.message == "Object not found":
+            return False
+        raise
+    return True
+
+
+async def list_user_files(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> tuple[list[File], Optional[str]]:
+    """
+    Return one page of a user's files, newest first.
+
+    Served by the (user_id, uploaded_at, id) index, so the cost of a page
+    does not depend on how many files the user has.
+
+    Args:
+        db (AsyncSession): Database session.
+        user_id (uuid.UUID): Internal ID of the owning user.
+        limit (int): Page size.
+        cursor (Optional[str]): Cursor returned with the previous page.
+
+    Returns:
+        tuple[list[File], Optional[str]]: The page and the next cursor, or
+        None when there are no more rows.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    stmt = select(File).where(File.user_id == user_id)
+    if cursor:
+        uploaded_at, file_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(File.uploaded_at, File.id) < (uploaded_at, file_id))
+    stmt = stmt.order_by(File.uploaded_at.desc(), File.id.desc()).limit(limit + 1)
+
+    result = await db.execute(stmt)
+    files = list(result.scalars().all())
+    if len(files) <= limit:
+        return files, None
+    files = files[:limit]
+    return files, encode_cursor(files[-1].uploaded_at, files[-1].id)
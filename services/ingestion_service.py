@@ -0,0 +1,534 @@
+import asyncio
+import uuid
+from collections import deque
+from contextlib import aclosing, suppress
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator, Optional, cast
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+from redis.typing import EncodableT, FieldT
+from sqlalchemy import delete
+
+from core.constants import Ingestion
+from core.executor import executors
+from core.settings import settings
+from db import sessionmanager
+from models import DocumentSection, DocumentStatus, Embedding, FileType
+from schemas.exception import DocumentBusyError, ServerBusyError
+from schemas.ingestion import (
+    IngestionJobResponse,
+    IngestionStage,
+    IngestionStageProgress,
+    IngestionStatus,
+)
+from services.chunker import Chunk, ChunkState, DocumentChunker, chunk_pages
+from services.document_service import (
+    claim_document,
+    get_document_status,
+    set_document_status,
+)
+from services.document_text import SectionWriter, TextSection, store_sections
+from services.embedding_engine import embedding_engine
+from services.embedding_store import bulk_insert_embeddings
+from services.file_service import download_file_from_supabase
+from utils.extractor import (
+    DocumentPage,
+    ExtractionReport,
+    count_pdf_pages,
+    extract_pages,
+)
+from utils.helper import temporary_path
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _fields(mapping: dict[str, str]) -> dict[FieldT, EncodableT]:
+    # redis-py types hash fields as a union of key types, which dict[str, str]
+    # does not match since dict keys are invariant.
+    return cast(dict[FieldT, EncodableT], mapping)
+
+
+class IngestionQueue:
+    """Durable ingestion job queue backed by a Redis stream and consumer group.
+
+    Job state lives in a Redis hash per job so the API can report progress,
+    while the stream only carries job ids to the workers.
+    """
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    @staticmethod
+    def _job_key(job_id: str) -> str:
+        return f"{Ingestion.JOB_KEY_PREFIX}{job_id}"
+
+    def _new_job(
+        self,
+        file_id: uuid.UUID,
+        document_id: uuid.UUID,
+        user_id: uuid.UUID,
+        storage_path: str,
+        file_type: str,
+    ) -> dict[str, str]:
+        now = _now()
+        return {
+            "job_id": str(uuid.uuid4()),
+            "file_id": str(file_id),
+            "document_id": str(document_id),
+            "user_id": str(user_id),
+            "storage_path": storage_path,
+            "file_type": file_type,
+            "status": IngestionStatus.Queued.value,
+            "attempts": "0",
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    async def enqueue(
+        self,
+        file_id: uuid.UUID,
+        document_id: uuid.UUID,
+        user_id: uuid.UUID,
+        storage_path: str,
+        file_type: str,
+    ) -> str:
+        depth = await self.redis.xlen(Ingestion.STREAM_KEY)
+        if depth >= settings.INGEST_MAX_QUEUE_DEPTH:
+            logger.warning("Ingestion queue is full", extra={"depth": depth})
+            raise ServerBusyError("Ingestion queue is full")
+
+        job = self._new_job(file_id, document_id, user_id, storage_path, file_type)
+        key = self._job_key(job["job_id"])
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=_fields(job))
+            pipe.expire(key, settings.INGEST_JOB_TTL_SECONDS)
+            pipe.xadd(Ingestion.STREAM_KEY, {"job_id": job["job_id"]})
+            await pipe.execute()
+
+        logger.info("Ingestion job queued", extra={"job_id": job["job_id"]})
+        return job["job_id"]
+
+    async def record_deduplicated(
+        self,
+        file_id: uuid.UUID,
+        document_id: uuid.UUID,
+        user_id: uuid.UUID,
+        storage_path: str,
+        file_type: str,
+    ) -> str:
+        """Record a completed job for an upload whose content is already ingested."""
+        job = self._new_job(file_id, document_id, user_id, storage_path, file_type)
+        job.update(self._completed_fields())
+        key = self._job_key(job["job_id"])
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=_fields(job))
+            pipe.expire(key, settings.INGEST_JOB_TTL_SECONDS)
+            await pipe.execute()
+
+        logger.info(
+            "Ingestion skipped for known content", extra={"job_id": job["job_id"]}
+        )
+        return job["job_id"]
+
+    async def mark_deduplicated(self, job_id: str) -> None:
+        await self.update_job(job_id, **self._completed_fields())
+
+    @staticmethod
+    def _completed_fields() -> dict[str, str]:
+        now = _now()
+        fields = {
+            "status": IngestionStatus.Completed.value,
+            "deduplicated": "1",
+        }
+        for stage in IngestionStage:
+            fields[f"{stage.value}_at"] = now
+        return fields
+
+    async def get_job(self, job_id: str) -> dict[str, str] | None:
+        raw = await self.redis.hgetall(self._job_key(job_id))  # type: ignore[misc]
+        if not raw:
+            return None
+        return {_decode(k): _decode(v) for k, v in raw.items()}
+
+    async def update_job(self, job_id: str, **fields: str) -> None:
+        fields["updated_at"] = _now()
+        key = self._job_key(job_id)
+        await self.redis.hset(key, mapping=_fields(fields))  # type: ignore[misc]
+
+    async def start_attempt(self, job_id: str) -> int:
+        key = self._job_key(job_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(key, "attempts", 1)
+            pipe.hset(
+                key,
+                mapping={
+                    "status": IngestionStatus.Running.value,
+                    "updated_at": _now(),
+                },
+            )
+            attempts, _ = await pipe.execute()
+        return int(attempts)
+
+    async def undo_attempt(self, job_id: str) -> None:
+        await self.redis.hincrby(self._job_key(job_id), "attempts", -1)  # type: ignore[misc]
+
+    async def mark_stage(self, job_id: str, stage: IngestionStage) -> None:
+        await self.update_job(job_id, **{f"{stage.value}_at": _now()})
+
+    async def ensure_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(
+                Ingestion.STREAM_KEY, Ingestion.CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read(
+        self, consumer: str, count: int, block_ms: int
+    ) -> list[tuple[str, str]]:
+        """Return up to `count` (message_id, job_id) pairs.
+
+        Messages left unacknowledged by a crashed worker for longer than the
+        visibility timeout are reclaimed before new messages are read.
+        """
+        _, claimed, *_ = await self.redis.xautoclaim(
+            Ingestion.STREAM_KEY,
+            Ingestion.CONSUMER_GROUP,
+            consumer,
+            min_idle_time=settings.INGEST_VISIBILITY_TIMEOUT_SECONDS * 1000,
+            count=count,
+        )
+        messages = list(claimed)
+        if not messages:
+            # [[stream, [(message_id, fields), ...]], ...], or None on timeout
+            response = cast(
+                Optional[list[list[Any]]],
+                await self.redis.xreadgroup(
+                    Ingestion.CONSUMER_GROUP,
+                    consumer,
+                    streams={Ingestion.STREAM_KEY: ">"},
+                    count=count,
+                    block=block_ms,
+                ),
+            )
+            for _, stream_messages in response or []:
+                messages.extend(stream_messages)
+
+        result = []
+        for message_id, fields in messages:
+            job_id = fields.get(b"job_id", fields.get("job_id"))
+            result.append((_decode(message_id), _decode(job_id)))
+        return result
+
+    async def keep_claimed(self, consumer: str, message_id: str) -> None:
+        """Reset a message's idle time so that read() does not reclaim it.
+
+        JUSTID leaves the delivery count alone, so a heartbeat is not counted
+        as another delivery.
+        """
+        await self.redis.xclaim(
+            Ingestion.STREAM_KEY,
+            Ingestion.CONSUMER_GROUP,
+            consumer,
+            min_idle_time=0,
+            message_ids=[message_id],
+            justid=True,
+        )
+
+    async def ack(self, message_id: str) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(Ingestion.STREAM_KEY, Ingestion.CONSUMER_GROUP, message_id)
+            pipe.xdel(Ingestion.STREAM_KEY, message_id)
+            await pipe.execute()
+
+    async def retry(self, message_id: str, job_id: str, error: str) -> None:
+        await self.update_job(job_id, status=IngestionStatus.Queued.value, error=error)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(Ingestion.STREAM_KEY, {"job_id": job_id})
+            pipe.xack(Ingestion.STREAM_KEY, Ingestion.CONSUMER_GROUP, message_id)
+            pipe.xdel(Ingestion.STREAM_KEY, message_id)
+            await pipe.execute()
+
+
+def to_job_response(job: dict[str, str]) -> IngestionJobResponse:
+    stages = [
+        IngestionStageProgress(
+            stage=stage,
+            completed=f"{stage.value}_at" in job,
+            completed_at=job.get(f"{stage.value}_at"),
+        )
+        for stage in IngestionStage
+    ]
+    return IngestionJobResponse(
+        job_id=job["job_id"],
+        file_id=job["file_id"],
+        status=IngestionStatus(job["status"]),
+        attempts=int(job.get("attempts", 0)),
+        deduplicated=job.get("deduplicated") == "1",
+        error=job.get("error") or None,
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        stages=stages,
+    )
+
+
+def _page_ranges(page_count: int, size: int) -> list[tuple[int, int]]:
+    return [
+        (start, min(start + size, page_count)) for start in range(0, page_count, size)
+    ]
+
+
+async def stream_pages(
+    path: str, file_type: str
+) -> AsyncGenerator[list[DocumentPage], None]:
+    """Yield a document's pages in order, window by window.
+
+    PDFs are split into INGEST_PAGE_WINDOW-page ranges that the extraction
+    pool opens independently. Upcoming ranges are extracted while the caller
+    works on the current one: one ahead for short PDFs, and
+    EXTRACTION_SHARD_WORKERS in parallel once a PDF has at least
+    EXTRACTION_SHARD_MIN_PAGES pages. DOCX and PPTX files are parsed whole by
+    their libraries anyway and come back as a single window.
+    """
+    ranges: deque[tuple[int, Optional[int]]]
+    if file_type == FileType.Pdf.value:
+        page_count = await executors.run_extraction(count_pdf_pages, path)
+        ranges = deque(_page_ranges(page_count, settings.INGEST_PAGE_WINDOW))
+        parallel = page_count >= settings.EXTRACTION_SHARD_MIN_PAGES
+        ahead = settings.EXTRACTION_SHARD_WORKERS if parallel else 1
+    else:
+        ranges = deque([(0, None)])
+        ahead = 1
+
+    pending: deque[asyncio.Future[list[DocumentPage]]] = deque()
+
+    def fill() -> None:
+        while ranges and len(pending) < ahead:
+            start, stop = ranges.popleft()
+            pending.append(
+                asyncio.ensure_future(
+                    executors.run_extraction(extract_pages, path, start, stop)
+                )
+            )
+
+    try:
+        fill()
+        while pending:
+            pages = await pending.popleft()
+            fill()
+            yield pages
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def _store_chunks(document_id: uuid.UUID, chunks: list[Chunk]) -> int:
+    """Embed a batch of chunks and commit it, making it searchable right away."""
+    if not sessionmanager.session_factory:
+        raise RuntimeError("Datasbase session factory isnt initialized")
+    embeddings = await embedding_engine.encode([chunk.text for chunk in chunks])
+    async with sessionmanager.session_factory() as db:
+        rows = await bulk_insert_embeddings(db, document_id, chunks, embeddings)
+        await db.commit()
+    return rows
+
+
+async def _store_sections(document_id: uuid.UUID, sections: list[TextSection]) -> None:
+    """Commit completed sections; readers wait until the document is Ready."""
+    if not sessionmanager.session_factory:
+        raise RuntimeError("Datasbase session factory isnt initialized")
+    async with sessionmanager.session_factory() as db:
+        await store_sections(db, document_id, sections)
+        await db.commit()
+
+
+async def run_ingestion_job(queue: IngestionQueue, job: dict[str, str]) -> None:
+    """Extract, chunk, embed and persist a single uploaded file.
+
+    The document is streamed: pages are extracted a window at a time, chunked
+    as they arrive, and chunks are embedded and committed in fixed-size
+    batches, so memory stays flat in document length and the first chunks
+    are searchable before the last page is parsed. The extracted text is
+    stored alongside in compressed sections for the study material
+    generators.
+
+    The work is done once per document: jobs for content that another job
+    already ingested finish without touching the extractor or the model.
+    """
+    job_id = job["job_id"]
+    document_id = uuid.UUID(job["document_id"])
+
+    if not sessionmanager.session_factory:
+        raise RuntimeError("Datasbase session factory isnt initialized")
+    async with sessionmanager.session_factory() as db:
+        if not await claim_document(db, document_id, job_id):
+            document_status = await get_document_status(db, document_id)
+            if document_status in (DocumentStatus.Ready, None):
+                await queue.mark_deduplicated(job_id)
+                return
+            raise DocumentBusyError(f"Document {document_id} is being ingested")
+
+        # A retried job may follow an attempt that already persisted rows.
+        await db.execute(delete(Embedding).where(Embedding.document_id == document_id))
+        await db.execute(
+            delete(DocumentSection).where(DocumentSection.document_id == document_id)
+        )
+        await db.commit()
+
+    batch_size = settings.INGEST_EMBED_BATCH_CHUNKS
+    with temporary_path("." + job["file_type"]) as tmp_path:
+        await download_file_from_supabase(
+            job["storage_path"], settings.SUPABASE_BUCKET, tmp_path
+        )
+
+        state = ChunkState()
+        batch: list[Chunk] = []
+        stored = 0
+        report = ExtractionReport()
+        sections = SectionWriter()
+        async with aclosing(stream_pages(tmp_path, job["file_type"])) as windows:
+            async for pages in windows:
+                report.add(pages)
+                completed = sections.add(pages)
+                if completed:
+                    await _store_sections(document_id, completed)
+                chunks, state = await executors.run_extraction(
+                    chunk_pages, pages, state
+                )
+                batch.extend(chunks)
+                while len(batch) >= batch_size:
+                    stored += await _store_chunks(document_id, batch[:batch_size])
+                    del batch[:batch_size]
+        await _store_sections(document_id, sections.finish())
+        logger.info(
+            "Document extracted",
+            extra={"document_id": str(document_id), **report.as_dict()},
+        )
+        await queue.mark_stage(job_id, IngestionStage.Extracted)
+
+        batch.extend(DocumentChunker.finish(state))
+        await queue.mark_stage(job_id, IngestionStage.Chunked)
+
+        if batch:
+            stored += await _store_chunks(document_id, batch)
+        await queue.mark_stage(job_id, IngestionStage.Embedded)
+
+    async with sessionmanager.session_factory() as db:
+        await set_document_status(db, document_id, DocumentStatus.Ready)
+        await db.commit()
+    await queue.mark_stage(job_id, IngestionStage.Persisted)
+    logger.info(
+        "Document ingested", extra={"document_id": str(document_id), "chunks": stored}
+    )
+
+
+async def _fail_document(document_id: str) -> None:
+    if not sessionmanager.session_factory:
+        return
+    async with sessionmanager.session_factory() as db:
+        await set_document_status(db, uuid.UUID(document_id), DocumentStatus.Failed)
+        await db.commit()
+
+
+class IngestionWorker:
+    """Consume ingestion jobs from the queue with bounded concurrency"""
+
+    def __init__(self, queue: IngestionQueue, consumer: str) -> None:
+        self.queue = queue
+        self.consumer = consumer
+        self.concurrency = settings.INGEST_WORKER_CONCURRENCY
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        await self.queue.ensure_group()
+        logger.info(
+            "Ingestion worker started",
+            extra={"consumer": self.consumer, "concurrency": self.concurrency},
+        )
+
+        tasks: set[asyncio.Task] = set()
+        while not stop_event.is_set():
+            free_slots = self.concurrency - len(tasks)
+            if free_slots <= 0:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            messages = await self.queue.read(self.consumer, free_slots, block_ms=5000)
+            for message_id, job_id in messages:
+                task = asyncio.create_task(self.handle(message_id, job_id))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info("Ingestion worker stopped", extra={"consumer": self.consumer})
+
+    async def handle(self, message_id: str, job_id: str) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(message_id))
+        try:
+            await self._handle(message_id, job_id)
+        finally:
+            heartbeat.cancel()
+            with suppress(asyncio.CancelledError):
+                await heartbeat
+
+    async def _heartbeat(self, message_id: str) -> None:
+        # Jobs can outlive the visibility timeout (large PDFs); keep claiming
+        # the message so no other consumer picks it up while it runs.
+        interval = settings.INGEST_VISIBILITY_TIMEOUT_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.queue.keep_claimed(self.consumer, message_id)
+            except Exception as e:
+                logger.warning(
+                    "Ingestion heartbeat failed",
+                    extra={"message_id": message_id, "error": str(e)},
+                )
+
+    async def _handle(self, message_id: str, job_id: str) -> None:
+        job = await self.queue.get_job(job_id)
+        if job is None:
+            logger.warning("Ingestion job expired", extra={"job_id": job_id})
+            await self.queue.ack(message_id)
+            return
+
+        attempts = await self.queue.start_attempt(job_id)
+        try:
+            await run_ingestion_job(self.queue, job)
+        except DocumentBusyError as e:
+            # Another job owns this content; wait for it instead of failing.
+            await self.queue.undo_attempt(job_id)
+            await asyncio.sleep(settings.INGEST_BUSY_RETRY_SECONDS)
+            await self.queue.retry(message_id, job_id, str(e))
+            return
+        except Exception as e:
+            logger.error(
+                "Ingestion job failed",
+                extra={"job_id": job_id, "attempts": attempts, "error": str(e)},
+            )
+            if attempts >= settings.INGEST_MAX_ATTEMPTS:
+                await self.queue.update_job(
+                    job_id, status=IngestionStatus.Failed.value, error=str(e)
+                )
+                await _fail_document(job["document_id"])
+                await self.queue.ack(message_id)
+            else:
+                await self.queue.retry(message_id, job_id, str(e))
+            return
+
+        await self.queue.update_job(
+            job_id, status=IngestionStatus.Completed.value, error=""
+        )
+        await self.queue.ack(message_id)
+        logger.info("Ingestion job completed", extra={"job_id": job_id})
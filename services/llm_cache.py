@@ -0,0 +1,119 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.constants import LLMCache
+from core.settings import settings
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier cache for generated LLM output: an in-process LRU over Redis.
+
+    Values are stored as JSON so both tiers hold the same bytes and callers
+    never share a mutable object. The local tier is bounded by total bytes;
+    both tiers expire entries after LLM_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self) -> None:
+        self.redis: Optional[Redis] = None
+        self.local: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.local_bytes = 0
+        self.hits = {"local": 0, "redis": 0}
+        self.misses = 0
+
+    def init_cache(self, redis: Optional[Redis]) -> None:
+        self.redis = redis
+
+    def close(self) -> None:
+        self.redis = None
+        self.local.clear()
+        self.local_bytes = 0
+
+    @staticmethod
+    def make_key(kind: str, prompt_version: str, content: str, **params: Any) -> str:
+        """
+        Build a cache key from the content hash, generation parameters and the
+        prompt template version, so changing any of them is a miss.
+        """
+        params_digest = hashlib.sha256(
+            json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:16]
+        return (
+            f"{LLMCache.KEY_PREFIX}{kind}:{prompt_version}:"
+            f"{content_hash(content)}:{params_digest}"
+        )
+
+    def get_local(self, key: str) -> Optional[Any]:
+        entry = self.local.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.monotonic():
+            self._evict(key)
+            return None
+        self.local.move_to_end(key)
+        self.hits["local"] += 1
+        return json.loads(payload)
+
+    def set_local(self, key: str, value: Any) -> None:
+        self._store_local(key, json.dumps(value))
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.get_local(key)
+        if value is not None:
+            return value
+
+        if self.redis is not None:
+            try:
+                payload = await self.redis.get(key)
+            except RedisError:
+                logger.warning("LLM cache read failed", extra={"key": key})
+                payload = None
+            if payload is not None:
+                payload = payload.decode() if isinstance(payload, bytes) else payload
+                self._store_local(key, payload)
+                self.hits["redis"] += 1
+                return json.loads(payload)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        payload = json.dumps(value)
+        self._store_local(key, payload)
+        if self.redis is None or len(payload) > settings.LLM_CACHE_MAX_ENTRY_BYTES:
+            return
+        try:
+            await self.redis.set(key, payload, ex=settings.LLM_CACHE_TTL_SECONDS)
+        except RedisError:
+            logger.warning("LLM cache write failed", extra={"key": key})
+
+    def _store_local(self, key: str, payload: str) -> None:
+        if len(payload) > settings.LLM_CACHE_MAX_ENTRY_BYTES:
+            return
+        self._evict(key)
+        self.local[key] = (time.monotonic() + settings.LLM_CACHE_TTL_SECONDS, payload)
+        self.local_bytes += len(payload)
+        while self.local_bytes > settings.LLM_CACHE_LOCAL_MAX_BYTES:
+            oldest = next(iter(self.local))
+            self._evict(oldest)
+
+    def _evict(self, key: str) -> None:
+        entry = self.local.pop(key, None)
+        if entry is not None:
+            self.local_bytes -= len(entry[1])
+
+
+llm_cache = LLMResponseCache()
@@ -0,0 +1,135 @@
+import uuid
+
+import numpy as np
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.settings import settings
+from models import Embedding
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count; ~4 characters per token for English prose."""
+    return len(text) // 4 + 1
+
+
+def mmr_select(
+    query: np.ndarray, vectors: np.ndarray, k: int, lambda_mult: float
+) -> list[int]:
+    """
+    Pick up to k rows by maximal marginal relevance.
+
+    Args:
+        query (np.ndarray): Query vector, shape (dim,).
+        vectors (np.ndarray): Candidate vectors, shape (n, dim).
+        k (int): Maximum number of rows to select.
+        lambda_mult (float): 1.0 ranks purely by relevance, 0.0 purely by diversity.
+
+    Returns:
+        list[int]: Indices into vectors, in selection order.
+    """
+    if not len(vectors) or k <= 0:
+        return []
+
+    normed = vectors / np.clip(
+        np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None
+    )
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+    relevance = normed @ query
+
+    selected = [int(np.argmax(relevance))]
+    max_similarity = normed @ normed[selected[0]]
+    while len(selected) < min(k, len(vectors)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        max_similarity = np.maximum(max_similarity, normed @ normed[best])
+    return selected
+
+
+def pack_to_budget(chunks: list[str], order: list[int], token_budget: int) -> list[int]:
+    """Take chunks in the given order until the token budget is spent."""
+    packed: list[int] = []
+    used = 0
+    for index in order:
+        cost = estimate_tokens(chunks[index])
+        if used + cost > token_budget:
+            continue
+        packed.append(index)
+        used += cost
+    return packed
+
+
+async def select_context(
+    db: AsyncSession,
+    document_id: uuid.UUID,
+    token_budget: int,
+    query_vector: np.ndarray | None = None,
+) -> str:
+    """
+    Build a bounded LLM context from a document's stored chunks.
+
+    Candidates closest to the query (or to the document centroid when no query
+    is given) are diversified with MMR and packed into the token budget, so the
+    prompt size does not grow with the document.
+
+    Args:
+        db (AsyncSession): Database session.
+        document_id (uuid.UUID): Document whose chunks are used.
+        token_budget (int): Approximate token limit for the returned context.
+        query_vector (np.ndarray | None): Optional topic embedding.
+
+    Returns:
+        str: Selected chunks joined in document order; empty if none exist.
+    """
+    if query_vector is None:
+        result = await db.execute(
+            select(func.avg(Embedding.embedding, type_=Vector(384))).where(
+                Embedding.document_id == document_id
+            )
+        )
+        centroid = result.scalar_one_or_none()
+        if centroid is None:
+            return ""
+        query_vector = np.asarray(centroid, dtype=np.float32)
+
+    # Materialising the document's rows first makes Postgres rank them exactly
+    # instead of post-filtering a global HNSW scan.
+    document_rows = (
+        select(Embedding.id, Embedding.chunks, Embedding.embedding)
+        .where(Embedding.document_id == document_id)
+        .cte("document_rows")
+        .prefix_with("MATERIALIZED")
+    )
+    distance = document_rows.c.embedding.cosine_distance(query_vector)
+    result = await db.execute(
+        select(document_rows.c.id, document_rows.c.chunks, document_rows.c.embedding)
+        .order_by(distance)
+        .limit(settings.RETRIEVAL_CANDIDATE_POOL)
+    )
+    rows = result.all()
+    if not rows:
+        return ""
+
+    ids = [row.id for row in rows]
+    chunks = [row.chunks for row in rows]
+    vectors = np.asarray([row.embedding for row in rows], dtype=np.float32)
+
+    order = mmr_select(query_vector, vectors, len(rows), settings.RETRIEVAL_MMR_LAMBDA)
+    packed = pack_to_budget(chunks, order, token_budget)
+    packed.sort(key=lambda index: ids[index])
+
+    logger.info(
+        "Retrieval context selected",
+        extra={
+            "document_id": str(document_id),
+            "candidates": len(rows),
+            "selected": len(packed),
+        },
+    )
+    return "\n\n".join(chunks[index] for index in packed)
@@ -0,0 +1,144 @@
+import uuid
+
+import numpy as np
+from sqlalchemy import FromClause, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.settings import settings
+from models import Embedding, File
+from schemas.search import SearchResult
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+async def search_chunks(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    query_vector: np.ndarray,
+    top_k: int,
+    file_ids: list[uuid.UUID] | None = None,
+    ef_search: int | None = None,
+) -> list[SearchResult]:
+    """
+    Return the chunks closest to the query vector among a user's files.
+
+    The HNSW index applies the ownership filter after its candidate list, so
+    a user who owns a small share of the rows would get few or no hits from
+    it. Scopes of up to SEARCH_EXACT_MAX_ROWS chunks are ranked exactly
+    instead; larger ones use the index with iterative scans, which keep
+    walking the graph until top_k rows pass the filter.
+
+    Args:
+        db (AsyncSession): Database session.
+        user_id (uuid.UUID): Internal ID of the user whose files are searched.
+        query_vector (np.ndarray): Embedding of the query text.
+        top_k (int): Number of chunks to return.
+        file_ids (list[uuid.UUID] | None): Optional subset of the user's files.
+        ef_search (int | None): HNSW candidate list size for this query.
+
+    Returns:
+        list[SearchResult]: Matching chunks ordered by similarity.
+    """
+    user_files = select(File.document_id).where(File.user_id == user_id)
+    if file_ids:
+        user_files = user_files.where(File.id.in_(file_ids))
+    in_scope = Embedding.document_id.in_(user_files)
+
+    # Counting stops past the threshold, so large scopes cost a bounded scan.
+    scope_rows = (
+        select(Embedding.id)
+        .where(in_scope)
+        .limit(settings.SEARCH_EXACT_MAX_ROWS + 1)
+        .subquery()
+    )
+    scope_size = (
+        await db.execute(select(func.count()).select_from(scope_rows))
+    ).scalar_one()
+    if not scope_size:
+        return []
+
+    exact = scope_size <= settings.SEARCH_EXACT_MAX_ROWS
+    candidates: FromClause
+    if exact:
+        # Materialising the scope first makes Postgres rank it exactly
+        # instead of post-filtering a global HNSW scan.
+        candidates = (
+            select(
+                Embedding.id,
+                Embedding.document_id,
+                Embedding.chunks,
+                Embedding.page_number,
+                Embedding.char_start,
+                Embedding.char_end,
+                Embedding.embedding,
+            )
+            .where(in_scope)
+            .cte("candidates")
+            .prefix_with("MATERIALIZED")
+        )
+        ef = None
+    else:
+        candidates = Embedding.__table__
+        # ef_search below top_k would cap the result count, so never go under it.
+        ef = max(ef_search or settings.SEARCH_DEFAULT_EF_SEARCH, top_k)
+        await db.execute(select(func.set_config("hnsw.ef_search", str(ef), True)))
+        # Relaxed order is faster than strict; the hits are re-sorted below.
+        await db.execute(
+            select(func.set_config("hnsw.iterative_scan", "relaxed_order", True))
+        )
+
+    distance = candidates.c.embedding.cosine_distance(query_vector).label("distance")
+    nearest = select(
+        candidates.c.id,
+        candidates.c.document_id,
+        candidates.c.chunks,
+        candidates.c.page_number,
+        candidates.c.char_start,
+        candidates.c.char_end,
+        distance,
+    )
+    if not exact:
+        nearest = nearest.where(in_scope)
+    nearest_rows = nearest.order_by(distance).limit(top_k).subquery()
+
+    # A user can hold several files with the same content, which share one
+    # document; report each chunk once, under the earliest of those files.
+    hits = (
+        select(
+            File.id,
+            File.filename,
+            nearest_rows.c.chunks,
+            nearest_rows.c.page_number,
+            nearest_rows.c.char_start,
+            nearest_rows.c.char_end,
+            nearest_rows.c.distance,
+        )
+        .distinct(nearest_rows.c.id)
+        .join(File, File.document_id == nearest_rows.c.document_id)
+        .where(File.user_id == user_id)
+        .order_by(nearest_rows.c.id, File.uploaded_at, File.id)
+    )
+    if file_ids:
+        hits = hits.where(File.id.in_(file_ids))
+    hit_rows = hits.subquery()
+
+    result = await db.execute(select(hit_rows).order_by(hit_rows.c.distance))
+    rows = result.all()
+    logger.info(
+        "Semantic search",
+        extra={"results": len(rows), "exact": exact, "ef_search": ef},
+    )
+
+    return [
+        SearchResult(
+            file_id=str(row.id),
+            filename=row.filename,
+            chunk=row.chunks,
+            score=1 - float(row.distance),
+            page_number=row.page_number,
+            char_start=row.char_start,
+            char_end=row.char_end,
+        )
+        for row in rows
+    ]
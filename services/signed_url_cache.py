@@ -0,0 +1,146 @@
+import asyncio
+import json
+import time
+from typing import Optional, Sequence
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.constants import SignedURLCache as SignedURLKeys
+from core.settings import settings
+from utils.logger import get_logger
+from utils.supabase_client import create_signed_urls
+
+logger = get_logger()
+
+
+class SignedURLCache:
+    """Redis cache of signed download URLs keyed by storage path.
+
+    Each entry keeps the URL's expiry. Entries are served until fewer than
+    SIGNED_URL_MIN_REMAINING_SECONDS remain. Once an entry enters the last
+    SIGNED_URL_REFRESH_AHEAD_SECONDS it is still served, but re-signed in the
+    background so the next caller gets a fresh URL without waiting. Misses
+    are signed together in a single storage call.
+    """
+
+    def __init__(self) -> None:
+        self.redis: Optional[Redis] = None
+        self.refreshing: set[str] = set()
+        self.tasks: set[asyncio.Task] = set()
+
+    def init_cache(self, redis: Optional[Redis]) -> None:
+        self.redis = redis
+
+    async def close(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+        self.refreshing.clear()
+        self.redis = None
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return f"{SignedURLKeys.KEY_PREFIX}{path}"
+
+    async def get(self, path: str) -> str:
+        """
+        Return a signed URL for one storage path.
+
+        Raises:
+            LookupError: If the path could not be signed.
+        """
+        url = (await self.get_many([path])).get(path)
+        if url is None:
+            raise LookupError(f"Could not sign storage path {path}")
+        return url
+
+    async def get_many(self, paths: Sequence[str]) -> dict[str, str]:
+        """
+        Return signed URLs for several storage paths with at most one storage
+        call, for the paths that are not cached.
+
+        Paths that cannot be signed are left out of the result.
+        """
+        paths = list(dict.fromkeys(paths))
+        if not paths:
+            return {}
+
+        now = time.time()
+        urls: dict[str, str] = {}
+        stale: list[str] = []
+        misses: list[str] = []
+        for path, entry in zip(paths, await self._read(paths)):
+            remaining = entry["expires_at"] - now if entry else 0
+            if entry is None or remaining <= settings.SIGNED_URL_MIN_REMAINING_SECONDS:
+                misses.append(path)
+                continue
+            urls[path] = entry["url"]
+            if remaining <= settings.SIGNED_URL_REFRESH_AHEAD_SECONDS:
+                stale.append(path)
+
+        if misses:
+            try:
+                urls.update(await self._sign(misses))
+            except Exception as e:
+                logger.error("Signing storage paths failed", extra={"error": e})
+        if stale:
+            self._schedule_refresh(stale)
+        return urls
+
+    async def invalidate(self, path: str) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.delete(self._key(path))
+        except RedisError:
+            logger.warning("Signed URL cache delete failed", extra={"path": path})
+
+    async def _read(self, paths: list[str]) -> list[Optional[dict]]:
+        if self.redis is None:
+            return [None] * len(paths)
+        try:
+            payloads = await self.redis.mget([self._key(path) for path in paths])
+        except RedisError:
+            logger.warning("Signed URL cache read failed")
+            return [None] * len(paths)
+        return [json.loads(payload) if payload else None for payload in payloads]
+
+    async def _sign(self, paths: list[str]) -> dict[str, str]:
+        expires_in = settings.SIGNED_URL_EXPIRES_SECONDS
+        expires_at = time.time() + expires_in
+        urls = await create_signed_urls(paths, expires_in)
+        if urls and self.redis is not None:
+            # Keys expire once the URL is no longer worth serving.
+            ttl = max(expires_in - settings.SIGNED_URL_MIN_REMAINING_SECONDS, 1)
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for path, url in urls.items():
+                        payload = json.dumps({"url": url, "expires_at": expires_at})
+                        pipe.set(self._key(path), payload, ex=ttl)
+                    await pipe.execute()
+            except RedisError:
+                logger.warning("Signed URL cache write failed")
+        return urls
+
+    def _schedule_refresh(self, paths: list[str]) -> None:
+        paths = [path for path in paths if path not in self.refreshing]
+        if not paths:
+            return
+        self.refreshing.update(paths)
+        task = asyncio.create_task(self._refresh(paths))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _refresh(self, paths: list[str]) -> None:
+        try:
+            await self._sign(paths)
+        except Exception as e:
+            logger.warning("Signed URL refresh failed", extra={"error": e})
+        finally:
+            self.refreshing.difference_update(paths)
+
+
+signed_urls = SignedURLCache()
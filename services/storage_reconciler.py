@@ -0,0 +1,198 @@
+import asyncio
+import uuid
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from redis.asyncio import Redis
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.constants import Storage
+from core.settings import settings
+from db import sessionmanager
+from models import File, User
+from services.document_service import release_document
+from services.file_service import (
+    delete_file_from_supabase,
+    list_storage_folder,
+    storage_object_exists,
+)
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def diff_owner(
+    db_file_ids: set[str], storage_file_ids: set[str]
+) -> tuple[set[str], set[str]]:
+    """
+    Compare one owner's file rows with the file folders found in storage.
+
+    Returns:
+        tuple[set[str], set[str]]: File ids with a row but no stored object,
+        and file ids with a stored object but no row.
+    """
+    return db_file_ids - storage_file_ids, storage_file_ids - db_file_ids
+
+
+def _is_older(timestamp: Optional[str], cutoff: datetime) -> bool:
+    if not timestamp:
+        return False
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")) < cutoff
+
+
+class StorageReconciler:
+    """Periodically bring the files table and the storage bucket back in line.
+
+    Uploads write storage before the row and deletes remove the row before
+    storage, so a crash between the two leaves one side behind. Each pass
+    removes rows whose object is gone, removes objects that no row points at
+    and fills in content types for rows uploaded before they were recorded.
+    Anything younger than the grace period is left alone, since it may belong
+    to an upload that is still in flight. Rows are only deleted once their
+    object is confirmed gone on its own, never on the strength of a listing.
+    """
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+        self.bucket_name = settings.SUPABASE_BUCKET
+        self.interval = settings.STORAGE_RECONCILE_INTERVAL_SECONDS
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        while not stop_event.is_set():
+            # Only one worker reconciles per interval; the lock expires on its
+            # own so a crashed holder does not block the next pass.
+            acquired = await self.redis.set(
+                Storage.RECONCILE_LOCK_KEY, "1", nx=True, ex=self.interval
+            )
+            if acquired:
+                renewal = asyncio.create_task(self._renew_lock())
+                try:
+                    await self.reconcile()
+                except Exception:
+                    logger.exception("Storage reconciliation failed")
+                finally:
+                    renewal.cancel()
+                    with suppress(asyncio.CancelledError):
+                        await renewal
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _renew_lock(self) -> None:
+        # A pass can outlast the interval on large buckets; keep the lock a
+        # full interval ahead so the next pass never starts on top of it.
+        while True:
+            await asyncio.sleep(self.interval / 3)
+            try:
+                await self.redis.expire(Storage.RECONCILE_LOCK_KEY, self.interval)
+            except Exception as e:
+                logger.warning(
+                    "Storage reconcile lock renewal failed", extra={"error": str(e)}
+                )
+
+    async def reconcile(self) -> dict[str, int]:
+        if not sessionmanager.session_factory:
+            raise RuntimeError("Datasbase session factory isnt initialized")
+
+        totals = {"owners": 0, "stale_rows": 0, "orphans": 0, "content_types": 0}
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.STORAGE_RECONCILE_GRACE_SECONDS
+        )
+        async with sessionmanager.session_factory() as db:
+            result = await db.execute(
+                select(User.supabase_id).join(File, File.user_id == User.id).distinct()
+            )
+            owners = {str(supabase_id) for supabase_id in result.scalars()}
+        root = await list_storage_folder(self.bucket_name, "")
+        owners.update(entry["name"] for entry in root if entry.get("id") is None)
+
+        for owner in sorted(owners):
+            try:
+                uuid.UUID(owner)
+            except ValueError:
+                logger.warning("Unexpected storage folder", extra={"folder": owner})
+                continue
+            async with sessionmanager.session_factory() as db:
+                counts = await self.reconcile_owner(db, owner, cutoff)
+            totals["owners"] += 1
+            for key, count in counts.items():
+                totals[key] += count
+
+        logger.info("Storage reconciliation finished", extra=totals)
+        return totals
+
+    async def reconcile_owner(
+        self, db: AsyncSession, owner: str, cutoff: datetime
+    ) -> dict[str, int]:
+        result = await db.execute(
+            select(File)
+            .join(User, User.id == File.user_id)
+            .where(User.supabase_id == uuid.UUID(owner))
+        )
+        files = {str(file.id): file for file in result.scalars()}
+        folders = await list_storage_folder(self.bucket_name, f"{owner}/")
+        stored = {entry["name"] for entry in folders if entry.get("id") is None}
+        if files and not stored:
+            # More likely a misconfigured bucket or a changed listing API than
+            # every object gone at once; deleting would cascade to the owner's
+            # flashcards and quizzes.
+            logger.warning(
+                "Storage listing empty for owner with files, skipping",
+                extra={"owner": owner, "files": len(files)},
+            )
+            return {"stale_rows": 0, "orphans": 0, "content_types": 0}
+        missing, orphaned = diff_owner(set(files), stored)
+
+        stale_rows = 0
+        for file_id in missing:
+            file = files[file_id]
+            if file.uploaded_at >= cutoff:
+                continue
+            if await storage_object_exists(self.bucket_name, file.filepath):
+                logger.warning(
+                    "Stored object missing from listing",
+                    extra={"file_id": file_id, "path": file.filepath},
+                )
+                continue
+            await db.execute(delete(File).where(File.id == file.id))
+            await release_document(db, file.document_id)
+            stale_rows += 1
+
+        orphans = 0
+        for file_id in orphaned:
+            objects = await list_storage_folder(self.bucket_name, f"{owner}/{file_id}/")
+            paths = [
+                f"{owner}/{file_id}/{obj['name']}"
+                for obj in objects
+                if obj.get("id") is not None
+                and _is_older(obj.get("created_at"), cutoff)
+            ]
+            if paths:
+                await delete_file_from_supabase(paths, self.bucket_name)
+                orphans += len(paths)
+
+        content_types = 0
+        for file_id in stored & set(files):
+            file = files[file_id]
+            if file.content_type is not None:
+                continue
+            objects = await list_storage_folder(self.bucket_name, f"{owner}/{file_id}/")
+            for obj in objects:
+                if obj["name"] == file.filename and obj.get("metadata"):
+                    await db.execute(
+                        update(File)
+                        .where(File.id == file.id)
+                        .values(content_type=obj["metadata"].get("mimetype"))
+                    )
+                    content_types += 1
+                    break
+
+        await db.commit()
+        return {
+            "stale_rows": stale_rows,
+            "orphans": orphans,
+            "content_types": content_types,
+        }
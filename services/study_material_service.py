@@ -0,0 +1,289 @@
+import base64
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional, Sequence, TypeVar
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import FlashCard, QuestionType, Quiz
+from utils.logger import get_logger
+
+logger = get_logger()
+
+T = TypeVar("T", FlashCard, Quiz)
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_deck_cursor(row: FlashCard | Quiz) -> str:
+    """Encode a flashcard or quiz row's place in the listing order as a cursor."""
+    raw = f"{row.created_at.isoformat()}|{row.generation or ''}|"
+    raw += f"{row.position or 0}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_deck_cursor(cursor: str) -> tuple[datetime, str, int, uuid.UUID]:
+    """
+    Decode a cursor produced by encode_deck_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor).decode()
+        created_at, generation, position, row_id = raw.split("|")
+        return (
+            datetime.fromisoformat(created_at),
+            generation,
+            int(position),
+            uuid.UUID(row_id),
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def _save_generation(
+    db: AsyncSession,
+    model: type[T],
+    file_id: uuid.UUID,
+    generation: str,
+    rows: list[dict[str, Any]],
+) -> None:
+    """
+    Upsert one generation's rows in a single batched statement.
+
+    Rows are keyed on (file_id, generation, position), so saving a generation
+    again, e.g. one served from the LLM cache, updates the rows it saved
+    before instead of adding copies; positions past the new rows are dropped.
+    """
+    if rows:
+        created_at = datetime.now(timezone.utc)
+        stmt = insert(model)
+        # excluded is keyed by column name, which differs from the attribute
+        # for the quiz option columns.
+        columns = [model.__mapper__.columns[key].name for key in rows[0]]
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[model.file_id, model.generation, model.position],
+                set_={name: stmt.excluded[name] for name in columns},
+            ),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "file_id": file_id,
+                    "generation": generation,
+                    "position": position,
+                    "created_at": created_at,
+                    **row,
+                }
+                for position, row in enumerate(rows)
+            ],
+        )
+    await db.execute(
+        delete(model).where(
+            model.file_id == file_id,
+            model.generation == generation,
+            model.position >= len(rows),
+        )
+    )
+
+
+async def save_flashcards(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    file_id: uuid.UUID,
+    flashcards: Sequence[dict[str, Any]],
+    generation: str,
+) -> None:
+    """
+    Save one generation's flashcards; saving it again updates them in place.
+
+    The caller must commit.
+    """
+    await _save_generation(
+        db,
+        FlashCard,
+        file_id,
+        generation,
+        [
+            {
+                "user_id": user_id,
+                "question": card["question"],
+                "answer": card["answer"],
+                "explanation": card.get("context"),
+            }
+            for card in flashcards
+        ],
+    )
+    logger.info(
+        "Flashcards saved", extra={"file_id": str(file_id), "count": len(flashcards)}
+    )
+
+
+def quiz_row(question: dict[str, Any]) -> dict[str, Any]:
+    """
+    Map a generated quiz question onto the quizzes table columns.
+
+    Raises:
+        ValueError: If the question has more than four options or an answer
+            that is not one of them.
+    """
+    options = list(question["options"])
+    if len(options) > 4:
+        raise ValueError("Quiz questions have at most four options")
+    padded = options + [None] * (4 - len(options))
+    return {
+        "question_type": QuestionType(question["type"]),
+        "question": question["question"],
+        "option_1": padded[0],
+        "option_2": padded[1],
+        "option_3": padded[2],
+        "option_4": padded[3],
+        "correct_options": [
+            options.index(answer) + 1 for answer in question["correct_answers"]
+        ],
+        "explanation": question.get("explanation"),
+    }
+
+
+def quiz_question(quiz: Quiz) -> dict[str, Any]:
+    """Rebuild the generated question shape from a stored quiz row."""
+    options = [
+        option
+        for option in (quiz.option_1, quiz.option_2, quiz.option_3, quiz.option_4)
+        if option is not None
+    ]
+    return {
+        "type": quiz.question_type.value,
+        "question": quiz.question,
+        "options": options,
+        "correct_answers": [options[index - 1] for index in quiz.correct_options],
+    }
+
+
+async def save_quiz(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    file_id: uuid.UUID,
+    questions: Sequence[dict[str, Any]],
+    generation: str,
+) -> None:
+    """
+    Save one generation's quiz questions; saving it again updates them in place.
+
+    The caller must commit.
+    """
+    rows = []
+    for question in questions:
+        try:
+            rows.append({"user_id": user_id, **quiz_row(question)})
+        except (KeyError, TypeError, ValueError):
+            # Generation validates questions; never fail a request over one
+            # that slipped through.
+            logger.warning(
+                "Skipping malformed quiz question",
+                extra={"file_id": str(file_id), "question": question},
+            )
+    await _save_generation(db, Quiz, file_id, generation, rows)
+    logger.info("Quiz saved", extra={"file_id": str(file_id), "count": len(rows)})
+
+
+async def _list_page(
+    db: AsyncSession,
+    model: type[T],
+    user_id: uuid.UUID,
+    limit: int,
+    cursor: Optional[str],
+    file_id: Optional[uuid.UUID],
+) -> tuple[list[T], Optional[str]]:
+    # Newest first, with each generation's rows together and in position
+    # order; they share one created_at. Rows saved before generations were
+    # recorded fall back to id order.
+    key = (
+        model.created_at,
+        func.coalesce(model.generation, ""),
+        -func.coalesce(model.position, 0),
+        model.id,
+    )
+    stmt = select(model).where(model.user_id == user_id)
+    if file_id:
+        stmt = stmt.where(model.file_id == file_id)
+    if cursor:
+        created_at, generation, position, row_id = decode_deck_cursor(cursor)
+        stmt = stmt.where(tuple_(*key) < (created_at, generation, -position, row_id))
+    stmt = stmt.order_by(*(column.desc() for column in key)).limit(limit + 1)
+
+    result = await db.execute(stmt)
+    rows = list(result.scalars().all())
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_deck_cursor(rows[-1])
+
+
+async def list_flashcards(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    limit: int,
+    cursor: Optional[str] = None,
+    file_id: Optional[uuid.UUID] = None,
+) -> tuple[list[FlashCard], Optional[str]]:
+    """
+    Return one page of a user's flashcards, newest first.
+
+    Args:
+        db (AsyncSession): Database session.
+        user_id (uuid.UUID): Internal ID of the owning user.
+        limit (int): Page size.
+        cursor (Optional[str]): Cursor returned with the previous page.
+        file_id (Optional[uuid.UUID]): Restrict to flashcards from this file.
+
+    Returns:
+        tuple[list[FlashCard], Optional[str]]: The page and the next cursor,
+        or None when there are no more rows.
+    """
+    return await _list_page(db, FlashCard, user_id, limit, cursor, file_id)
+
+
+async def list_quizzes(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    limit: int,
+    cursor: Optional[str] = None,
+    file_id: Optional[uuid.UUID] = None,
+) -> tuple[list[Quiz], Optional[str]]:
+    """
+    Return one page of a user's quiz questions, newest first.
+
+    Args:
+        db (AsyncSession): Database session.
+        user_id (uuid.UUID): Internal ID of the owning user.
+        limit (int): Page size.
+        cursor (Optional[str]): Cursor returned with the previous page.
+        file_id (Optional[uuid.UUID]): Restrict to questions from this file.
+
+    Returns:
+        tuple[list[Quiz], Optional[str]]: The page and the next cursor, or
+        None when there are no more rows.
+    """
+    return await _list_page(db, Quiz, user_id, limit, cursor, file_id)
@@ -0,0 +1,139 @@
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.constants import UserCache
+from core.settings import settings
+from models import User
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+async def upsert_user(db: AsyncSession, supabase_id: uuid.UUID) -> uuid.UUID:
+    """
+    Return the internal id for a Supabase user, creating the row if needed.
+
+    The insert and the lookup run as one statement, so at most one of its two
+    branches returns a row. The fallback SELECT only runs when a concurrent
+    first request inserted the row after this statement's snapshot was taken.
+    The caller must commit.
+
+    Args:
+        db (AsyncSession): Database session.
+        supabase_id (uuid.UUID): The JWT `sub` claim.
+
+    Returns:
+        uuid.UUID: The users.id primary key.
+    """
+    inserted = (
+        insert(User)
+        .values(
+            id=uuid.uuid4(),
+            supabase_id=supabase_id,
+            email=str(supabase_id),
+            name=f"user_{str(supabase_id)[:6]}",
+        )
+        .on_conflict_do_nothing()
+        .returning(User.id)
+        .cte("inserted")
+    )
+    stmt = union_all(
+        select(inserted.c.id),
+        select(User.id).where(User.supabase_id == supabase_id),
+    )
+    result = await db.execute(stmt)
+    user_id: Optional[uuid.UUID] = result.scalars().first()
+    if user_id is None:
+        existing = await db.execute(
+            select(User.id).where(User.supabase_id == supabase_id)
+        )
+        user_id = existing.scalar_one()
+    return user_id
+
+
+class UserResolver:
+    """Map JWT subjects to internal user ids with an in-process TTL cache
+    in front of Redis, so steady-state requests never query the users table.
+    """
+
+    def __init__(self) -> None:
+        self.redis: Optional[Redis] = None
+        self.local: OrderedDict[str, tuple[float, uuid.UUID]] = OrderedDict()
+
+    def init_cache(self, redis: Optional[Redis]) -> None:
+        self.redis = redis
+
+    def close(self) -> None:
+        self.redis = None
+        self.local.clear()
+
+    @staticmethod
+    def _key(sub: str) -> str:
+        return f"{UserCache.KEY_PREFIX}{sub}"
+
+    def _get_local(self, sub: str) -> Optional[uuid.UUID]:
+        entry = self.local.get(sub)
+        if entry is None:
+            return None
+        expires_at, user_id = entry
+        if expires_at <= time.monotonic():
+            del self.local[sub]
+            return None
+        self.local.move_to_end(sub)
+        return user_id
+
+    def _set_local(self, sub: str, user_id: uuid.UUID) -> None:
+        self.local[sub] = (time.monotonic() + settings.USER_CACHE_TTL_SECONDS, user_id)
+        self.local.move_to_end(sub)
+        while len(self.local) > settings.USER_CACHE_MAX_ENTRIES:
+            self.local.popitem(last=False)
+
+    async def resolve(self, db: AsyncSession, sub: str) -> uuid.UUID:
+        """
+        Return the internal user id for a JWT subject.
+
+        Raises:
+            ValueError: If the subject is not a UUID.
+        """
+        user_id = self._get_local(sub)
+        if user_id is not None:
+            return user_id
+
+        supabase_id = uuid.UUID(sub)
+        if self.redis is not None:
+            try:
+                cached = await self.redis.get(self._key(sub))
+            except RedisError:
+                logger.warning("User cache read failed")
+                cached = None
+            if cached is not None:
+                user_id = uuid.UUID(
+                    cached.decode() if isinstance(cached, bytes) else cached
+                )
+                self._set_local(sub, user_id)
+                return user_id
+
+        user_id = await upsert_user(db, supabase_id)
+        await db.commit()
+        self._set_local(sub, user_id)
+        if self.redis is not None:
+            try:
+                await self.redis.set(
+                    self._key(sub),
+                    str(user_id),
+                    ex=settings.USER_CACHE_REDIS_TTL_SECONDS,
+                )
+            except RedisError:
+                logger.warning("User cache write failed")
+        return user_id
+
+
+user_resolver = UserResolver()
@@ -0,0 +1,112 @@
+import random
+import re
+
+from services.chunker import PAGE_SEPARATOR, ChunkState, DocumentChunker
+from utils.extractor import DocumentPage
+
+
+class WordTokenizer:
+    """One token per whitespace-separated word, with character offsets."""
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False):
+        return {"offset_mapping": [m.span() for m in re.finditer(r"\S+", text)]}
+
+
+def make_pages(count: int, seed: int = 0) -> list[DocumentPage]:
+    rng = random.Random(seed)
+    pages = []
+    for number in range(1, count + 1):
+        paragraphs = [
+            ". ".join(
+                " ".join(f"w{rng.randint(0, 99)}" for _ in range(rng.randint(3, 9)))
+                for _ in range(rng.randint(1, 4))
+            )
+            + "."
+            for _ in range(rng.randint(0, 4))
+        ]
+        pages.append(DocumentPage(number, "\n\n".join(paragraphs)))
+    return pages
+
+
+def stream(chunker: DocumentChunker, pages: list[DocumentPage], window: int):
+    chunks = []
+    state = ChunkState()
+    for start in range(0, len(pages), window):
+        finished, state = chunker.chunk_pages(pages[start : start + window], state)
+        chunks.extend(finished)
+    return chunks + chunker.finish(state)
+
+
+def test_chunks_fit_the_token_budget_and_point_back_into_the_document():
+    chunker = DocumentChunker(WordTokenizer(), max_tokens=20, overlap_tokens=5)
+    pages = make_pages(30)
+    document = PAGE_SEPARATOR.join(page.text for page in pages if page.text)
+    page_of = {}
+    offset = 0
+    for page in pages:
+        if page.text:
+            end = offset + len(page.text)
+            page_of.update({i: page.number for i in range(offset, end)})
+            offset = end + len(PAGE_SEPARATOR)
+
+    chunks = stream(chunker, pages, window=3)
+
+    assert chunks
+    for chunk in chunks:
+        assert len(chunk.text.split()) <= 20
+        assert document[chunk.char_start : chunk.char_end] == chunk.text
+        assert chunk.page_number == page_of[chunk.char_start]
+    covered = set()
+    for chunk in chunks:
+        covered.update(range(chunk.char_start, chunk.char_end))
+    assert all(i in covered for i, c in enumerate(document) if not c.isspace())
+
+
+def test_streaming_matches_chunking_the_whole_document_at_once():
+    chunker = DocumentChunker(WordTokenizer(), max_tokens=25)
+    pages = make_pages(40, seed=1)
+
+    assert stream(chunker, pages, window=4) == stream(chunker, pages, window=40)
+
+
+def test_slide_markers_and_headings_start_new_chunks():
+    chunker = DocumentChunker(WordTokenizer(), max_tokens=12)
+    slides = [
+        DocumentPage(n, f"--- Slide {n} ---\nalpha beta gamma delta\nepsilon")
+        for n in range(1, 4)
+    ]
+    chunks = stream(chunker, slides, window=2)
+
+    assert [chunk.text.splitlines()[0] for chunk in chunks] == [
+        "--- Slide 1 ---",
+        "--- Slide 2 ---",
+        "--- Slide 3 ---",
+    ]
+    assert [chunk.page_number for chunk in chunks] == [1, 2, 3]
+
+    text = "# Intro\none two three four five\n# Method\nsix seven eight nine ten"
+    spans = chunker.split(text)
+    assert [text[start:end].split("\n")[0] for start, end in spans] == [
+        "# Intro",
+        "# Method",
+    ]
+
+
+def test_small_pages_are_merged_up_to_the_budget():
+    chunker = DocumentChunker(WordTokenizer(), max_tokens=10)
+    pages = [DocumentPage(n, f"page {n} words") for n in range(1, 7)]
+
+    chunks = stream(chunker, pages, window=1)
+
+    assert [chunk.text.split().count("page") for chunk in chunks] == [3, 3]
+    assert [chunk.page_number for chunk in chunks] == [1, 4]
+
+
+def test_words_longer_than_a_chunk_are_cut_between_tokens():
+    class CharTokenizer:
+        def __call__(self, text, **kwargs):
+            return {"offset_mapping": [(i, i + 1) for i in range(len(text))]}
+
+    chunker = DocumentChunker(CharTokenizer(), max_tokens=4)
+
+    assert [(a, b) for a, b in chunker.split("abcdefghij")] == [(0, 4), (4, 8), (8, 10)]
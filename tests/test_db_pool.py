@@ -0,0 +1,82 @@
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, text
+from sqlalchemy.util import greenlet_spawn
+
+from core.dependencies import verify_internal_token
+from core.settings import settings
+from db import PoolMetrics, SessionManager, TimedQueuePool
+
+
+def test_pool_metrics_snapshot():
+    metrics = PoolMetrics()
+    metrics.record_wait(0.001)
+    metrics.record_wait(0.003)
+    metrics.record_checkout()
+    metrics.record_checkout()
+    metrics.record_checkin(0.002)
+    metrics.record_checkin(0.004)
+    metrics.record_connect(0.010)
+
+    snapshot = metrics.snapshot()
+
+    assert snapshot["checkouts"] == 2
+    assert snapshot["checkout_wait_ms_avg"] == 2.0
+    assert snapshot["checkout_wait_ms_max"] == 3.0
+    assert snapshot["hold_ms_avg"] == 3.0
+    assert snapshot["hold_ms_max"] == 4.0
+    assert snapshot["connects"] == 1
+    assert snapshot["connect_ms_avg"] == 10.0
+
+
+def test_pool_stats_before_init():
+    assert SessionManager().pool_stats() == {"initialized": False}
+
+
+def test_pool_events_record_checkouts_and_connects():
+    manager = SessionManager()
+    engine = create_engine("sqlite://")
+    manager._instrument(SimpleNamespace(sync_engine=engine))  # type: ignore[arg-type]
+
+    for _ in range(2):
+        with engine.connect() as connection:
+            connection.execute(text("select 1"))
+
+    snapshot = manager.metrics.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert manager.metrics.checkins == 2
+    assert snapshot["connects"] == 1
+
+
+def test_timed_pool_records_checkout_waits_across_recreation():
+    metrics = PoolMetrics()
+    pool = TimedQueuePool(
+        lambda: sqlite3.connect(":memory:", check_same_thread=False), pool_size=1
+    )
+    pool.metrics = metrics
+
+    def checkout_twice():
+        for _ in range(2):
+            pool.connect().close()
+
+    asyncio.run(greenlet_spawn(checkout_twice))
+
+    assert metrics.waits == 2
+    assert pool.recreate().metrics is metrics
+
+
+def test_internal_endpoints_need_the_configured_token(monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "")
+    with pytest.raises(HTTPException) as disabled:
+        verify_internal_token("")
+    assert disabled.value.status_code == 404
+
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "secret")
+    with pytest.raises(HTTPException) as rejected:
+        verify_internal_token("wrong")
+    assert rejected.value.status_code == 401
+    verify_internal_token("secret")
@@ -0,0 +1,143 @@
+import asyncio
+import uuid
+from collections import namedtuple
+
+import zstandard
+from sqlalchemy.dialects import postgresql
+
+from core.settings import settings
+from services.document_text import DocumentTextStore, SectionWriter
+from utils.extractor import DocumentPage
+
+IndexRow = namedtuple("IndexRow", "position char_start char_end")
+
+
+def write_sections(pages, window=3):
+    writer = SectionWriter()
+    sections = []
+    for start in range(0, len(pages), window):
+        sections.extend(writer.add(pages[start : start + window]))
+    return sections + writer.finish()
+
+
+def make_pages(count: int) -> list[DocumentPage]:
+    return [
+        DocumentPage(n, "" if n % 5 == 0 else f"page {n} " + "text " * n)
+        for n in range(1, count + 1)
+    ]
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Serve the section index and section data queries from memory."""
+
+    def __init__(self, sections) -> None:
+        self.sections = {section.position: section for section in sections}
+        self.fetched: list[list[int]] = []
+
+    async def execute(self, statement):
+        if len(statement.selected_columns) == 3:
+            return FakeResult(
+                [
+                    IndexRow(s.position, s.char_start, s.char_end)
+                    for s in self.sections.values()
+                ]
+            )
+        params = statement.compile().params
+        positions = next(v for v in params.values() if isinstance(v, list))
+        self.fetched.append(sorted(positions))
+        return FakeResult([(p, self.sections[p].data) for p in positions])
+
+
+def test_sections_are_compressed_contiguous_and_page_aligned(monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_SECTION_CHARS", 200)
+    pages = make_pages(30)
+    document = "\n\n".join(page.text for page in pages if page.text)
+
+    sections = write_sections(pages)
+
+    decompressor = zstandard.ZstdDecompressor()
+    texts = [decompressor.decompress(s.data).decode() for s in sections]
+    assert "".join(texts) == document
+    assert [s.position for s in sections] == list(range(len(sections)))
+    assert sections[0].char_start == 0 and sections[-1].char_end == len(document)
+    for previous, section in zip(sections, sections[1:]):
+        assert previous.char_end == section.char_start
+    for section, text in zip(sections, texts):
+        assert text.lstrip("\n").startswith(f"page {section.page_number} ")
+
+
+def test_reads_decompress_only_the_sections_a_range_needs(monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_SECTION_CHARS", 200)
+    pages = make_pages(30)
+    document = "\n\n".join(page.text for page in pages if page.text)
+    sections = write_sections(pages)
+    db = FakeSession(sections)
+    store = DocumentTextStore()
+    document_id = uuid.uuid4()
+
+    start = sections[2].char_start + 5
+    end = sections[3].char_end - 5
+    text = asyncio.run(
+        store.read(db, document_id, start, end)  # type: ignore[arg-type]
+    )
+
+    assert text == document[start:end]
+    assert db.fetched == [[2, 3]]
+
+    # Cached sections are served without another data query.
+    again = asyncio.run(
+        store.read(db, document_id, start, end)  # type: ignore[arg-type]
+    )
+    assert again == text
+    assert db.fetched == [[2, 3]]
+
+    full = asyncio.run(store.read(db, document_id))  # type: ignore[arg-type]
+    assert full == document
+    assert db.fetched[-1] == [p for p in range(len(sections)) if p not in (2, 3)]
+
+
+def test_local_cache_is_bounded_and_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_TEXT_CACHE_MAX_CHARS", 10)
+    store = DocumentTextStore()
+    document_id = uuid.uuid4()
+
+    store._store_local((document_id, 0), "aaaa")
+    store._store_local((document_id, 1), "bbbb")
+    store.local.move_to_end((document_id, 0))
+    store._store_local((document_id, 2), "cccc")
+
+    assert list(store.local) == [(document_id, 0), (document_id, 2)]
+    assert store.local_chars == 8
+
+
+class NoReadyDocument:
+    """Answer the file lookup as if the file's document were not Ready."""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return self
+
+    def scalar_one_or_none(self):
+        return None
+
+
+def test_read_file_returns_nothing_until_the_document_is_ready():
+    db = NoReadyDocument()
+
+    text = asyncio.run(
+        DocumentTextStore().read_file(db, uuid.uuid4())  # type: ignore[arg-type]
+    )
+
+    assert text is None
+    assert "documents.status = " in db.statements[0]
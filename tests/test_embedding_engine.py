@@ -0,0 +1,45 @@
+import asyncio
+
+import numpy as np
+
+from core.executor import executors
+from core.settings import settings
+from services.embedding_engine import EmbeddingEngine
+
+
+class FakeModel:
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    def encode(self, texts, **kwargs):
+        self.batches.append(list(texts))
+        return np.array([[float(len(text))] for text in texts])
+
+
+def test_concurrent_callers_share_batches_and_get_their_own_rows(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_SIZE", 4)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_WAIT_MS", 50)
+    model = FakeModel()
+    engine = EmbeddingEngine()
+
+    async def run():
+        executors.init_executors()
+        engine.init_engine(model)  # type: ignore[arg-type]
+        try:
+            return await asyncio.gather(
+                engine.encode(["a"]),
+                engine.encode(["bb", "ccc"]),
+                engine.encode(["dddd", "eeeee", "ffffff"]),
+            )
+        finally:
+            await engine.close()
+            executors.close()
+
+    single, pair, triple = asyncio.run(run())
+
+    assert single.tolist() == [[1.0]]
+    assert pair.tolist() == [[2.0], [3.0]]
+    assert triple.tolist() == [[4.0], [5.0], [6.0]]
+    assert model.batches == [["a", "bb", "ccc"], ["dddd", "eeeee", "ffffff"]]
+    assert engine.metrics.batches == 2
+    assert engine.metrics.texts == 6
@@ -0,0 +1,41 @@
+import asyncio
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from schemas.exception import ServerBusyError
+from services.embedding_sidecar import SidecarClient, handle_connection
+
+
+def test_client_roundtrips_float32_frames_over_a_unix_socket():
+    async def encode(texts):
+        if texts == ["busy"]:
+            raise ServerBusyError("queue full")
+        return np.array([[len(t), 0.5] for t in texts], dtype=np.float32)
+
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "embed.sock")
+            server = await asyncio.start_unix_server(
+                lambda r, w: handle_connection(r, w, encode), path=path
+            )
+            client = SidecarClient(path, max_connections=2)
+            try:
+                results = await asyncio.gather(
+                    client.encode(["a", "héllo"]), client.encode(["xyz"])
+                )
+                with pytest.raises(ServerBusyError):
+                    await client.encode(["busy"])
+                return results, len(client.idle)
+            finally:
+                await client.close()
+                server.close()
+
+    (pair, single), idle = asyncio.run(run())
+
+    assert pair.dtype == np.float32
+    assert pair.tolist() == [[1.0, 0.5], [5.0, 0.5]]
+    assert single.tolist() == [[3.0, 0.5]]
+    assert idle == 2
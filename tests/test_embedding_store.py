@@ -0,0 +1,50 @@
+import struct
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+from services.chunker import Chunk
+from services.embedding_store import encode_embedding_rows
+
+
+def test_encode_embedding_rows_binary_layout():
+    document_id = uuid.uuid4()
+    vectors = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], dtype=np.float32)
+    created_at = datetime(2000, 1, 1, 0, 0, 1, tzinfo=timezone.utc)
+
+    chunks = [Chunk("a", 1, 0, 1), Chunk("bc", 2, 3, 5)]
+
+    stream = b"".join(encode_embedding_rows(document_id, chunks, vectors, created_at))
+
+    assert stream.startswith(b"PGCOPY\n\xff\r\n\x00")
+    assert stream.endswith(struct.pack("!h", -1))
+
+    offset = 19
+    for chunk, vector in zip(chunks, vectors):
+        (fields,) = struct.unpack_from("!h", stream, offset)
+        assert fields == 7
+        offset += 2
+
+        assert struct.unpack_from("!i", stream, offset)[0] == 16
+        assert stream[offset + 4 : offset + 20] == document_id.bytes
+        offset += 20
+
+        (length,) = struct.unpack_from("!i", stream, offset)
+        assert stream[offset + 4 : offset + 4 + length] == chunk.text.encode()
+        offset += 4 + length
+
+        source = struct.unpack_from("!iiiiii", stream, offset)
+        assert source == (4, chunk.page_number, 4, chunk.char_start, 4, chunk.char_end)
+        offset += 24
+
+        length, dim, _ = struct.unpack_from("!ihh", stream, offset)
+        assert (length, dim) == (4 + 4 * 3, 3)
+        decoded = np.frombuffer(stream, dtype=">f4", count=dim, offset=offset + 8)
+        assert np.array_equal(decoded, vector)
+        offset += 4 + length
+
+        assert struct.unpack_from("!iq", stream, offset) == (8, 1_000_000)
+        offset += 12
+
+    assert offset == len(stream) - 2
@@ -0,0 +1,95 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.dependencies import get_current_user_id
+from db import sessionmanager
+from main import app
+from models import DocumentStatus
+from schemas.exception import ServerBusyError
+from services.embedding_engine import embedding_engine
+from utils.limiter import limiter
+
+
+class FakeResult:
+    def __init__(self, value) -> None:
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """Answer every query with the same scalar."""
+
+    def __init__(self, scalar=None) -> None:
+        self.scalar = scalar
+        self.rolled_back = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        return FakeResult(self.scalar)
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+@pytest.fixture
+def client(request, monkeypatch):
+    """A client for the real app, with a fake session factory behind get_db.
+
+    Parametrize it indirectly to choose what the sessions' queries return.
+    """
+    sessions = []
+
+    def session_factory():
+        sessions.append(FakeSession(getattr(request, "param", None)))
+        return sessions[-1]
+
+    monkeypatch.setattr(sessionmanager, "session_factory", session_factory)
+    monkeypatch.setattr(limiter, "enabled", False)
+    app.dependency_overrides[get_current_user_id] = uuid.uuid4
+    yield TestClient(app), sessions
+    app.dependency_overrides.clear()
+
+
+def test_busy_executor_in_a_db_route_answers_503_with_retry_after(client, monkeypatch):
+    test_client, sessions = client
+
+    async def busy(texts):
+        raise ServerBusyError("Embedding queue is full")
+
+    monkeypatch.setattr(embedding_engine, "encode", busy)
+
+    response = test_client.post("/api/search", json={"query": "cells"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert sessions[0].rolled_back
+
+
+def test_http_errors_from_db_routes_keep_their_status(client):
+    test_client, sessions = client
+
+    response = test_client.post("/api/quizzes/generate", json={"file_id": "nope"})
+
+    assert response.status_code == 404
+    assert sessions[0].rolled_back
+
+
+@pytest.mark.parametrize("client", [DocumentStatus.Processing], indirect=True)
+def test_conflicts_from_db_routes_keep_their_status(client):
+    test_client, _ = client
+
+    response = test_client.post(
+        "/api/quizzes/generate", json={"file_id": str(uuid.uuid4())}
+    )
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "File is still being processed"
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+from core.settings import settings
+from utils.extractor import (
+    DocumentPage,
+    ExtractionReport,
+    PageKind,
+    _extract_pdf_page,
+)
+
+
+class FakePage:
+    def __init__(self, text="", images=(), drawings=(), tables=()):
+        self.text = text
+        self.images = list(images)
+        self.drawings = list(drawings)
+        self.tables = [SimpleNamespace(to_markdown=lambda t=t: t) for t in tables]
+        self.table_calls = 0
+
+    def get_text(self):
+        return self.text
+
+    def get_images(self):
+        return self.images
+
+    def get_cdrawings(self):
+        return self.drawings
+
+    def find_tables(self):
+        self.table_calls += 1
+        return SimpleNamespace(tables=self.tables)
+
+
+def grid(rows: int, cols: int) -> list[dict]:
+    lines = [("l", (0, y * 10), (cols * 10, y * 10)) for y in range(rows + 1)]
+    lines += [("l", (x * 10, 0), (x * 10, rows * 10)) for x in range(cols + 1)]
+    return [{"items": lines}]
+
+
+def test_pages_without_rules_skip_table_detection(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTION_TABLE_MIN_RULES", 4)
+    diagonal = [{"items": [("l", (0, 0), (10, 10))] * 8}]
+    page = FakePage(" body text ", drawings=diagonal)
+
+    assert _extract_pdf_page(page) == (PageKind.Text, "body text")
+    assert page.table_calls == 0
+
+
+def test_ruled_pages_get_markdown_tables(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTION_TABLE_MIN_RULES", 4)
+    page = FakePage("body", drawings=grid(2, 2), tables=["|a|b|"])
+
+    assert _extract_pdf_page(page) == (PageKind.Table, "body\n\n|a|b|")
+    assert page.table_calls == 1
+
+    no_table = FakePage("body", drawings=grid(2, 2))
+    assert _extract_pdf_page(no_table) == (PageKind.Text, "body")
+
+
+def test_pages_without_text_are_skipped_and_classified():
+    assert _extract_pdf_page(FakePage("  ")) == (PageKind.Blank, "")
+    assert _extract_pdf_page(FakePage(images=[(7,)])) == (PageKind.ImageOnly, "")
+
+
+def test_extraction_report_totals_per_kind():
+    report = ExtractionReport(slowest=2)
+    report.add(
+        [
+            DocumentPage(1, "a", PageKind.Text, 1.0),
+            DocumentPage(2, "b", PageKind.Table, 9.0),
+        ]
+    )
+    report.add([DocumentPage(3, "", PageKind.Blank, 0.5)])
+
+    summary = report.as_dict()
+
+    assert summary["pages"] == 3
+    assert summary["extract_ms"] == 10.5
+    assert summary["table_pages"] == 1
+    assert summary["table_ms"] == 9.0
+    assert summary["blank_pages"] == 1
+    assert summary["slowest_pages"] == [2, 1]
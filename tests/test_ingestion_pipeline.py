@@ -0,0 +1,104 @@
+import asyncio
+from contextlib import aclosing
+
+from core.settings import settings
+from services import ingestion_service
+from utils.extractor import DocumentPage
+
+
+def make_pages(count: int) -> list[DocumentPage]:
+    return [
+        DocumentPage(number, f"Page {number}. " + "lorem ipsum dolor " * 30)
+        for number in range(1, count + 1)
+    ]
+
+
+def stream(monkeypatch, pages: list[DocumentPage], file_type: str = "pdf"):
+    """Drain stream_pages over fake pages.
+
+    Returns the page numbers in the order they were yielded, the requested
+    page ranges, and the most ranges that were being extracted at once.
+    """
+    calls: list[tuple[int, int | None]] = []
+    active = [0, 0]  # in flight, peak
+
+    async def run_extraction(fn, path, *args):
+        if fn is ingestion_service.count_pdf_pages:
+            return len(pages)
+        start, stop = args
+        calls.append((start, stop))
+        active[0] += 1
+        active[1] = max(active)
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        return pages[start:stop]
+
+    monkeypatch.setattr(ingestion_service.executors, "run_extraction", run_extraction)
+
+    async def run():
+        numbers = []
+        async with aclosing(ingestion_service.stream_pages("doc", file_type)) as it:
+            async for window in it:
+                numbers.extend(page.number for page in window)
+                await asyncio.sleep(0.01)  # the caller embedding this window
+        return numbers
+
+    return asyncio.run(run()), calls, active[1]
+
+
+def test_small_pdfs_are_extracted_one_window_ahead(monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_PAGE_WINDOW", 4)
+    monkeypatch.setattr(settings, "EXTRACTION_SHARD_MIN_PAGES", 64)
+
+    numbers, calls, peak = stream(monkeypatch, make_pages(10))
+
+    assert numbers == list(range(1, 11))
+    assert calls == [(0, 4), (4, 8), (8, 10)]
+    assert peak == 1
+
+
+def test_large_pdfs_are_sharded_across_workers_and_merged_in_order(monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_PAGE_WINDOW", 2)
+    monkeypatch.setattr(settings, "EXTRACTION_SHARD_MIN_PAGES", 8)
+    monkeypatch.setattr(settings, "EXTRACTION_SHARD_WORKERS", 3)
+
+    numbers, calls, peak = stream(monkeypatch, make_pages(9))
+
+    assert numbers == list(range(1, 10))
+    assert calls == [(0, 2), (2, 4), (4, 6), (6, 8), (8, 9)]
+    assert peak == 3
+
+
+def test_office_documents_are_read_in_one_window(monkeypatch):
+    numbers, calls, _ = stream(monkeypatch, make_pages(3), file_type="pptx")
+
+    assert numbers == [1, 2, 3]
+    assert calls == [(0, None)]
+
+
+def test_running_jobs_keep_their_message_claimed(monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_VISIBILITY_TIMEOUT_SECONDS", 0.03)
+    claims = []
+
+    class FakeQueue:
+        async def keep_claimed(self, consumer, message_id):
+            claims.append((consumer, message_id))
+
+    worker = ingestion_service.IngestionWorker(FakeQueue(), "worker-1")  # type: ignore[arg-type]
+
+    async def slow_job(message_id, job_id):
+        await asyncio.sleep(0.1)  # three visibility timeouts
+
+    monkeypatch.setattr(worker, "_handle", slow_job)
+
+    async def run():
+        await worker.handle("1-0", "job")
+        claimed = len(claims)
+        await asyncio.sleep(0.05)
+        return claimed
+
+    claimed = asyncio.run(run())
+
+    assert claimed >= 3
+    assert set(claims) == {("worker-1", "1-0")}
+    assert len(claims) == claimed  # the heartbeat stops with the job
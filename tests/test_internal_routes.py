@@ -0,0 +1,19 @@
+from fastapi.testclient import TestClient
+
+from core.settings import settings
+from main import app
+from services.embedding_engine import embedding_engine
+from utils.limiter import limiter
+
+
+def test_embedding_stats_are_only_served_to_internal_callers(monkeypatch):
+    monkeypatch.setattr(limiter, "enabled", False)
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "secret")
+    monkeypatch.setattr(embedding_engine, "stats", lambda: {"batches": 3})
+    client = TestClient(app)
+
+    assert client.get("/health/embedding").status_code == 404
+    assert client.get("/internal/embedding").status_code == 401
+    response = client.get("/internal/embedding", headers={"X-Internal-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json() == {"batches": 3}
@@ -0,0 +1,40 @@
+import asyncio
+
+from core.settings import settings
+from services.llm_cache import LLMResponseCache
+
+
+def test_make_key_changes_with_content_params_and_version():
+    make_key = LLMResponseCache.make_key
+    key = make_key("quiz", "v1", "text", language="en", total=5)
+
+    assert key == make_key("quiz", "v1", "text", total=5, language="en")
+    assert key != make_key("quiz", "v2", "text", language="en", total=5)
+    assert key != make_key("quiz", "v1", "other", language="en", total=5)
+    assert key != make_key("quiz", "v1", "text", language="fr", total=5)
+
+
+def test_local_tier_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_LOCAL_MAX_BYTES", 20)
+    cache = LLMResponseCache()
+
+    cache.set_local("a", "x" * 6)
+    cache.set_local("b", "y" * 6)
+    assert cache.get_local("a") == "x" * 6
+    cache.set_local("c", "z" * 6)
+
+    assert cache.get_local("b") is None
+    assert cache.get_local("a") == "x" * 6
+    assert cache.local_bytes <= 20
+
+
+def test_get_and_set_without_redis():
+    cache = LLMResponseCache()
+
+    async def roundtrip():
+        assert await cache.get("k") is None
+        await cache.set("k", {"questions": [1]})
+        return await cache.get("k")
+
+    assert asyncio.run(roundtrip()) == {"questions": [1]}
+    assert cache.misses == 1
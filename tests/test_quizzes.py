@@ -0,0 +1,89 @@
+import pytest
+
+from utils.quizzes import (
+    allocate_questions,
+    merge_section_questions,
+    normalize_question,
+    split_sections,
+)
+
+
+def _single(question: str) -> dict:
+    return {
+        "type": "single_correct",
+        "question": question,
+        "options": ["a", "b", "c", "d"],
+        "correct_answers": ["a"],
+    }
+
+
+def _yes_no(question: str) -> dict:
+    return {
+        "type": "yes_no",
+        "question": question,
+        "options": ["Yes", "No"],
+        "correct_answers": ["Yes"],
+    }
+
+
+def test_split_sections_respects_headings_and_budget():
+    markdown = "# One\n" + "a" * 60 + "\n# Two\n" + "b" * 60 + "\n"
+
+    assert split_sections(markdown, token_budget=1000) == [markdown]
+    sections = split_sections(markdown, token_budget=20)
+    assert len(sections) == 2
+    assert sections[0].startswith("# One") and sections[1].startswith("# Two")
+
+
+def test_split_sections_never_exceeds_max_sections():
+    # Each block fills most of the budget, so packing alone leaves one per block.
+    markdown = "".join(f"# Part {i}\n" + "x" * (40 + i) + "\n" for i in range(20))
+
+    assert len(split_sections(markdown, token_budget=20)) == 20
+    sections = split_sections(markdown, token_budget=20, max_sections=8)
+    assert len(sections) == 8
+    assert "".join(sections) == markdown
+    assert all(section.startswith("# Part") for section in sections)
+
+
+def test_allocate_questions_sums_to_counts_before_oversampling():
+    plan = allocate_questions(
+        [3, 1], {"single_correct": 4, "multiple_correct": 0, "yes_no": 1}, 1.0
+    )
+
+    assert plan == [
+        {"single_correct": 3, "multiple_correct": 0, "yes_no": 1},
+        {"single_correct": 1, "multiple_correct": 0, "yes_no": 0},
+    ]
+
+
+def test_merge_section_questions_dedupes_and_rebalances():
+    sections = [
+        [_single("What is A?"), _single("What is B?"), _yes_no("Is C true?")],
+        [_single("what is a"), _single("What is D?"), {"type": "yes_no"}],
+    ]
+    counts = {"single_correct": 2, "multiple_correct": 0, "yes_no": 1}
+
+    merged = merge_section_questions(sections, counts)
+
+    assert [q["question"] for q in merged] == ["What is A?", "What is D?", "Is C true?"]
+    with pytest.raises(ValueError):
+        merge_section_questions(sections, {**counts, "yes_no": 2})
+
+
+def test_answers_are_matched_to_options_ignoring_case_and_whitespace():
+    question = {
+        **_single("Which planet is red?"),
+        "options": ["Mars ", "Venus", "Earth", "Jupiter"],
+        "correct_answers": ["  mars", "MARS"],
+    }
+
+    assert normalize_question(question)["options"][0] == "Mars"
+    assert normalize_question(question)["correct_answers"] == ["Mars"]
+
+    unmatched = {**_single("What is E?"), "correct_answers": ["e"]}
+    merged = merge_section_questions(
+        [[question, unmatched, _single("What is F?")]],
+        {"single_correct": 2, "multiple_correct": 0, "yes_no": 0},
+    )
+    assert [q["correct_answers"] for q in merged] == [["Mars"], ["a"]]
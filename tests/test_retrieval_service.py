@@ -0,0 +1,23 @@
+import numpy as np
+
+from services.retrieval_service import estimate_tokens, mmr_select, pack_to_budget
+
+
+def test_mmr_select_prefers_diverse_chunks():
+    query = np.array([1.0, 0.0], dtype=np.float32)
+    vectors = np.array(
+        [[1.0, 0.0], [0.99, 0.01], [0.6, 0.8]],
+        dtype=np.float32,
+    )
+
+    assert mmr_select(query, vectors, 2, lambda_mult=1.0) == [0, 1]
+    assert mmr_select(query, vectors, 2, lambda_mult=0.3) == [0, 2]
+    assert mmr_select(query, vectors[:0], 2, lambda_mult=0.5) == []
+
+
+def test_pack_to_budget_skips_chunks_that_do_not_fit():
+    chunks = ["a" * 40, "b" * 400, "c" * 40]
+    budget = estimate_tokens(chunks[0]) + estimate_tokens(chunks[2])
+
+    assert pack_to_budget(chunks, [0, 1, 2], budget) == [0, 2]
+    assert pack_to_budget(chunks, [1, 0, 2], 0) == []
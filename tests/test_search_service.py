@@ -0,0 +1,89 @@
+import asyncio
+import uuid
+from collections import namedtuple
+
+import numpy as np
+from sqlalchemy.dialects import postgresql
+
+from core.settings import settings
+from services.search_service import search_chunks
+
+Hit = namedtuple("Hit", "id filename chunks page_number char_start char_end distance")
+
+
+class FakeResult:
+    def __init__(self, value=None, rows=()):
+        self.value = value
+        self.rows = list(rows)
+
+    def scalar_one(self):
+        return self.value
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Answer the scope count, then return the given hits for the search."""
+
+    def __init__(self, scope_size: int, hits=()) -> None:
+        self.scope_size = scope_size
+        self.hits = hits
+        self.statements: list[str] = []
+
+    async def execute(self, statement):
+        sql = str(
+            statement.compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        self.statements.append(sql)
+        if "count(*)" in sql:
+            return FakeResult(self.scope_size)
+        if "set_config" in sql:
+            return FakeResult()
+        return FakeResult(rows=self.hits)
+
+
+def search(db, **kwargs):
+    query = np.zeros(384, dtype=np.float32)
+    return asyncio.run(search_chunks(db, uuid.uuid4(), query, **kwargs))
+
+
+def test_small_scopes_are_ranked_exactly_without_the_index(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_EXACT_MAX_ROWS", 100)
+    file_id = uuid.uuid4()
+    db = FakeSession(
+        scope_size=40,
+        hits=[Hit(file_id, "notes.pdf", "chunk", 3, 10, 20, 0.25)],
+    )
+
+    results = search(db, top_k=5)
+
+    count, query = db.statements
+    assert "LIMIT 101" in count
+    assert "WITH candidates AS MATERIALIZED" in query
+    assert "DISTINCT ON" in query
+    assert [(r.file_id, r.chunk, r.score, r.page_number) for r in results] == [
+        (str(file_id), "chunk", 0.75, 3)
+    ]
+
+
+def test_large_scopes_use_iterative_index_scans(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_EXACT_MAX_ROWS", 100)
+    db = FakeSession(scope_size=101)
+
+    search(db, top_k=50, ef_search=10)
+
+    count, ef_search, iterative_scan, query = db.statements
+    assert "set_config('hnsw.ef_search', '50', true)" in ef_search
+    assert "set_config('hnsw.iterative_scan', 'relaxed_order', true)" in iterative_scan
+    assert "MATERIALIZED" not in query
+    assert "DISTINCT ON" in query
+
+
+def test_users_without_chunks_in_scope_skip_the_search():
+    db = FakeSession(scope_size=0)
+
+    assert search(db, top_k=5, file_ids=[uuid.uuid4()]) == []
+    assert len(db.statements) == 1
@@ -0,0 +1,64 @@
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from jose import JWTError, jwt
+
+from core.security import (
+    JWT_BACKENDS,
+    VerifiedTokenCache,
+    token_cache,
+    validate_jwt_token,
+)
+from core.settings import settings
+
+
+def _token(secret: str, **claims) -> str:
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+@pytest.fixture
+def secret(monkeypatch):
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", "test-secret")
+    token_cache.clear()
+    yield "test-secret"
+    token_cache.clear()
+
+
+@pytest.mark.parametrize("backend", sorted(JWT_BACKENDS))
+def test_backends_agree(secret, backend):
+    decode = JWT_BACKENDS[backend]
+    now = int(time.time())
+    sub = str(uuid.uuid4())
+
+    assert decode(_token(secret, sub=sub, exp=now + 60))["sub"] == sub
+    with pytest.raises(JWTError):
+        decode(_token(secret, sub=sub, exp=now - 60))
+    with pytest.raises(JWTError):
+        decode(_token("other-secret", sub=sub, exp=now + 60))
+
+
+def test_validate_caches_verified_tokens(secret, monkeypatch):
+    sub = str(uuid.uuid4())
+    token = _token(secret, sub=sub, exp=int(time.time()) + 60)
+
+    assert validate_jwt_token(token) == sub
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", "rotated")
+    assert validate_jwt_token(token) == sub
+
+    token_cache.clear()
+    with pytest.raises(HTTPException):
+        validate_jwt_token(token)
+
+
+def test_token_cache_evicts_expired_and_oldest():
+    cache = VerifiedTokenCache(max_entries=2)
+    cache.put("expired", "a", time.time() - 1)
+    cache.put("b", "b", time.time() + 60)
+    cache.put("c", "c", time.time() + 60)
+
+    assert cache.get("expired") is None
+    cache.put("d", "d", time.time() + 60)
+    assert cache.get("b") is None
+    assert cache.get("c") == "c"
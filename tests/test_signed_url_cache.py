@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from core.settings import settings
+from services import signed_url_cache
+from services.signed_url_cache import SignedURLCache
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.redis.store[key] = value
+
+    async def execute(self):
+        return []
+
+
+def test_get_many_signs_misses_in_one_call_and_refreshes_ahead(monkeypatch):
+    calls = []
+
+    async def fake_sign(paths, expires_in):
+        calls.append(list(paths))
+        return {path: f"https://signed/{path}?v={len(calls)}" for path in paths}
+
+    monkeypatch.setattr(signed_url_cache, "create_signed_urls", fake_sign)
+    cache = SignedURLCache()
+    cache.init_cache(FakeRedis())  # type: ignore[arg-type]
+
+    async def run():
+        first = await cache.get_many(["a", "b", "a"])
+        cached = await cache.get_many(["a", "b"])
+        # Make the URLs look close to expiry to trigger a background refresh.
+        monkeypatch.setattr(
+            time,
+            "time",
+            lambda real=time.time: real()
+            + settings.SIGNED_URL_EXPIRES_SECONDS
+            - settings.SIGNED_URL_REFRESH_AHEAD_SECONDS
+            + 1,
+        )
+        stale = await cache.get_many(["a"])
+        await asyncio.gather(*cache.tasks)
+        return first, cached, stale
+
+    first, cached, stale = asyncio.run(run())
+    assert first == cached == {"a": "https://signed/a?v=1", "b": "https://signed/b?v=1"}
+    assert stale == {"a": "https://signed/a?v=1"}
+    assert calls == [["a", "b"], ["a"]]
+
+
+def test_get_many_leaves_out_paths_it_cannot_sign(monkeypatch):
+    async def failing_sign(paths, expires_in):
+        raise RuntimeError("storage unavailable")
+
+    monkeypatch.setattr(signed_url_cache, "create_signed_urls", failing_sign)
+    cache = SignedURLCache()
+    cache.init_cache(FakeRedis())  # type: ignore[arg-type]
+
+    assert asyncio.run(cache.get_many(["a"])) == {}
@@ -0,0 +1,7 @@
+from benchmarks.bench_import_time import HEAVY_MODULES, measure
+
+
+def test_importing_main_does_not_load_heavy_modules():
+    _, packages = measure("main")
+
+    assert sorted(set(packages) & set(HEAVY_MODULES)) == []
@@ -0,0 +1,133 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from core.constants import Storage
+from services import storage_reconciler
+from services.storage_reconciler import StorageReconciler, _is_older, diff_owner
+
+OLD = datetime(2025, 1, 1, tzinfo=timezone.utc)
+CUTOFF = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeResult:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+
+    def scalars(self):
+        return self.rows
+
+
+class FakeSession:
+    """Return the owner's files for the first query, then record statements."""
+
+    def __init__(self, files) -> None:
+        self.files = files
+        self.deleted: list[uuid.UUID] = []
+        self.committed = False
+
+    async def execute(self, statement):
+        if statement.is_select:
+            return FakeResult(self.files)
+        if statement.is_delete:
+            self.deleted.append(statement.whereclause.right.value)
+
+    async def commit(self):
+        self.committed = True
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.renewals: list[tuple[str, int]] = []
+
+    async def set(self, key, value, nx, ex):
+        return True
+
+    async def expire(self, key, ttl):
+        self.renewals.append((key, ttl))
+
+
+def _file(filename: str = "notes.pdf"):
+    file_id = uuid.uuid4()
+    return SimpleNamespace(
+        id=file_id,
+        filename=filename,
+        filepath=f"owner/{file_id}/{filename}",
+        uploaded_at=OLD,
+        content_type="application/pdf",
+        document_id=uuid.uuid4(),
+    )
+
+
+def _reconciler(monkeypatch, folders, existing=()):
+    async def list_storage_folder(bucket_name, prefix):
+        return [{"name": name, "id": None} for name in folders]
+
+    async def storage_object_exists(bucket_name, path):
+        return path in existing
+
+    async def release_document(db, document_id):
+        pass
+
+    monkeypatch.setattr(storage_reconciler, "list_storage_folder", list_storage_folder)
+    monkeypatch.setattr(
+        storage_reconciler, "storage_object_exists", storage_object_exists
+    )
+    monkeypatch.setattr(storage_reconciler, "release_document", release_document)
+    return StorageReconciler(FakeRedis())
+
+
+def test_diff_owner_splits_missing_and_orphaned():
+    missing, orphaned = diff_owner({"a", "b", "c"}, {"b", "c", "d"})
+
+    assert missing == {"a"}
+    assert orphaned == {"d"}
+
+
+def test_is_older_parses_storage_timestamps():
+    cutoff = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    assert _is_older("2025-12-31T23:59:59.000Z", cutoff)
+    assert not _is_older("2026-01-01T00:00:01+00:00", cutoff)
+    assert not _is_older(None, cutoff)
+
+
+def test_rows_are_deleted_only_once_their_object_is_confirmed_gone(monkeypatch):
+    listed, unlisted, gone = _file(), _file(), _file()
+    reconciler = _reconciler(
+        monkeypatch, folders=[str(listed.id)], existing={unlisted.filepath}
+    )
+    db = FakeSession([listed, unlisted, gone])
+
+    counts = asyncio.run(reconciler.reconcile_owner(db, str(uuid.uuid4()), CUTOFF))
+
+    assert counts["stale_rows"] == 1
+    assert db.deleted == [gone.id]
+
+
+def test_empty_listing_for_an_owner_with_files_deletes_nothing(monkeypatch):
+    reconciler = _reconciler(monkeypatch, folders=[])
+    db = FakeSession([_file(), _file()])
+
+    counts = asyncio.run(reconciler.reconcile_owner(db, str(uuid.uuid4()), CUTOFF))
+
+    assert counts == {"stale_rows": 0, "orphans": 0, "content_types": 0}
+    assert db.deleted == [] and not db.committed
+
+
+def test_lock_is_renewed_while_a_pass_runs(monkeypatch):
+    reconciler = _reconciler(monkeypatch, folders=[])
+    reconciler.interval = 0.03
+    stop_event = asyncio.Event()
+
+    async def slow_pass():
+        await asyncio.sleep(reconciler.interval * 2)
+        stop_event.set()
+        return {}
+
+    monkeypatch.setattr(reconciler, "reconcile", slow_pass)
+    asyncio.run(reconciler.run(stop_event))
+
+    assert reconciler.redis.renewals
+    assert set(reconciler.redis.renewals) == {(Storage.RECONCILE_LOCK_KEY, 0.03)}
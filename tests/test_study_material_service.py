@@ -0,0 +1,146 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from models import FlashCard, Quiz
+from services.study_material_service import (
+    decode_cursor,
+    encode_cursor,
+    list_flashcards,
+    quiz_question,
+    quiz_row,
+    save_quiz,
+)
+
+
+class SyncSession:
+    """Run async service queries on a sync SQLite session."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    async def execute(self, statement):
+        return self.session.execute(statement)
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.statements: list[tuple[str, object]] = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.statements.append((sql, params))
+
+
+def test_cursor_roundtrip_and_rejects_garbage():
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc)
+    row_id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_quiz_row_roundtrip():
+    question = {
+        "type": "multiple_correct",
+        "question": "Which are planets? (select all that apply)",
+        "options": ["Mars", "Sun", "Earth", "Moon"],
+        "correct_answers": ["Mars", "Earth"],
+    }
+    yes_no = {
+        "type": "yes_no",
+        "question": "Is the sun a star?",
+        "options": ["Yes", "No"],
+        "correct_answers": ["Yes"],
+    }
+
+    row = quiz_row(question)
+    assert row["correct_options"] == [1, 3]
+    assert quiz_question(Quiz(**row)) == question
+    assert quiz_row(yes_no)["option_3"] is None
+    assert quiz_question(Quiz(**quiz_row(yes_no))) == yes_no
+
+
+def test_save_quiz_upserts_the_generation_and_drops_stale_positions():
+    db = FakeSession()
+    question = {
+        "type": "yes_no",
+        "question": "Is the sun a star?",
+        "options": ["Yes", "No"],
+        "correct_answers": ["Yes"],
+    }
+
+    asyncio.run(save_quiz(db, uuid.uuid4(), uuid.uuid4(), [question] * 2, "gen"))
+
+    (upsert, rows), (delete, _) = db.statements
+    assert "ON CONFLICT (file_id, generation, position) DO UPDATE" in upsert
+    assert '"Option_1" = excluded."Option_1"' in upsert
+    assert [(row["generation"], row["position"]) for row in rows] == [
+        ("gen", 0),
+        ("gen", 1),
+    ]
+    assert delete.startswith("DELETE FROM quizzes")
+    assert "quizzes.position >= " in delete
+
+
+def test_a_saved_generation_is_listed_in_position_order_across_pages():
+    engine = create_engine("sqlite://")
+    FlashCard.__table__.create(engine)  # type: ignore[attr-defined]
+    user_id, file_id = uuid.uuid4(), uuid.uuid4()
+    saved_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def card(question, created_at, generation=None, position=None):
+        return FlashCard(
+            user_id=user_id,
+            file_id=file_id,
+            question=question,
+            answer="a",
+            generation=generation,
+            position=position,
+            created_at=created_at,
+        )
+
+    with Session(engine) as session:
+        session.add_all(card(f"new {n}", saved_at, "gen", n) for n in range(5))
+        session.add(card("legacy later", saved_at.replace(day=2)))
+        session.add(card("legacy earlier", saved_at.replace(year=2025)))
+        session.commit()
+
+        questions, cursor = [], None
+        while True:
+            page, cursor = asyncio.run(
+                list_flashcards(SyncSession(session), user_id, 2, cursor=cursor)
+            )
+            questions += [flashcard.question for flashcard in page]
+            if cursor is None:
+                break
+
+    assert questions == [
+        "legacy later",
+        *(f"new {n}" for n in range(5)),
+        "legacy earlier",
+    ]
+
+
+def test_save_quiz_skips_questions_it_cannot_store():
+    db = FakeSession()
+    valid = {
+        "type": "yes_no",
+        "question": "Is the sun a star?",
+        "options": ["Yes", "No"],
+        "correct_answers": ["Yes"],
+    }
+    unknown_answer = {**valid, "correct_answers": ["Maybe"]}
+
+    asyncio.run(
+        save_quiz(db, uuid.uuid4(), uuid.uuid4(), [unknown_answer, valid], "gen")
+    )
+
+    (_, rows), _ = db.statements
+    assert [row["correct_options"] for row in rows] == [[1]]
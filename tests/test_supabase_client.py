@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+import pytest
+
+from schemas.exception import SupabaseAPIError
+from utils.supabase_client import SupabaseHTTP
+
+
+def _client(handler) -> SupabaseHTTP:
+    http = SupabaseHTTP()
+    http.client = httpx.AsyncClient(
+        base_url="http://supabase.test", transport=httpx.MockTransport(handler)
+    )
+    http.semaphore = asyncio.Semaphore(2)
+    return http
+
+
+def test_request_sends_caller_token_per_call():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["Authorization"])
+        return httpx.Response(200, json={"id": "u1"})
+
+    async def run():
+        http = _client(handler)
+        try:
+            return await asyncio.gather(
+                http.request("PUT", "/auth/v1/user", bearer="token-a"),
+                http.request("PUT", "/auth/v1/user", bearer="token-b"),
+            )
+        finally:
+            await http.close()
+
+    assert asyncio.run(run()) == [{"id": "u1"}, {"id": "u1"}]
+    assert sorted(seen) == ["Bearer token-a", "Bearer token-b"]
+
+
+def test_error_responses_raise_with_status_and_message():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            422,
+            json={
+                "error_code": "user_already_exists",
+                "msg": "User already registered",
+            },
+        )
+
+    async def run():
+        http = _client(handler)
+        try:
+            await http.request("POST", "/auth/v1/signup", json={})
+        finally:
+            await http.close()
+
+    with pytest.raises(SupabaseAPIError) as exc_info:
+        asyncio.run(run())
+    assert exc_info.value.status_code == 422
+    assert exc_info.value.error_code == "user_already_exists"
+    assert "already registered" in str(exc_info.value)
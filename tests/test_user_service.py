@@ -0,0 +1,26 @@
+import asyncio
+import uuid
+
+from core.settings import settings
+from services.user_service import UserResolver
+
+
+def test_resolve_serves_cached_ids_without_a_session(monkeypatch):
+    monkeypatch.setattr(settings, "USER_CACHE_MAX_ENTRIES", 2)
+    resolver = UserResolver()
+    subs = [str(uuid.uuid4()) for _ in range(3)]
+    ids = [uuid.uuid4() for _ in range(3)]
+    for sub, user_id in zip(subs, ids):
+        resolver._set_local(sub, user_id)
+
+    assert asyncio.run(resolver.resolve(None, subs[2])) == ids[2]  # type: ignore[arg-type]
+    assert resolver._get_local(subs[0]) is None
+    assert resolver._get_local(subs[1]) == ids[1]
+
+
+def test_local_entries_expire(monkeypatch):
+    monkeypatch.setattr(settings, "USER_CACHE_TTL_SECONDS", 0)
+    resolver = UserResolver()
+    resolver._set_local("sub", uuid.uuid4())
+
+    assert resolver._get_local("sub") is None
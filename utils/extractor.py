@@ -1,14 +1,61 @@
-from docx import Document
-from langchain_community.document_loaders import PyMuPDFLoader
-from pptx import Presentation
+import time
+from collections import Counter, defaultdict
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, NamedTuple, Optional
 
+from core.settings import settings
 from schemas.exception import DocumentExtractionError
 from utils.helper import validate_file_extension
 from utils.logger import get_logger
 
+if TYPE_CHECKING:
+    import pymupdf
+
 logger = get_logger()
 
 
+class PageKind(str, Enum):
+    Text = "text"
+    Table = "table"  # went through table-to-markdown conversion
+    ImageOnly = "image_only"  # no text layer; skipped
+    Blank = "blank"
+
+
+class DocumentPage(NamedTuple):
+    """Text of one PDF page or PPTX slide; a DOCX is read as a single page"""
+
+    number: int  # 1-based
+    text: str
+    kind: PageKind = PageKind.Text
+    extract_ms: float = 0.0
+
+
+class ExtractionReport:
+    """Page counts and extraction time per page kind, plus the slowest pages"""
+
+    def __init__(self, slowest: int = 5) -> None:
+        self.pages: Counter[PageKind] = Counter()
+        self.ms: defaultdict[PageKind, float] = defaultdict(float)
+        self.slowest_count = slowest
+        self.slowest: list[tuple[float, int]] = []
+
+    def add(self, pages: Iterable[DocumentPage]) -> None:
+        for page in pages:
+            self.pages[page.kind] += 1
+            self.ms[page.kind] += page.extract_ms
+            self.slowest.append((page.extract_ms, page.number))
+        self.slowest = sorted(self.slowest, reverse=True)[: self.slowest_count]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "pages": sum(self.pages.values()),
+            "extract_ms": round(sum(self.ms.values()), 1),
+            **{f"{kind.value}_pages": count for kind, count in self.pages.items()},
+            **{f"{kind.value}_ms": round(ms, 1) for kind, ms in self.ms.items()},
+            "slowest_pages": [number for _, number in self.slowest],
+        }
+
+
 class DocumentExtractor:
     """Services for extracting text from various document formats"""
 
@@ -17,14 +64,25 @@ class DocumentExtractor:
         logger.info("DocumentExtractor initialized")
 
     def extract(self) -> str:
+        return "\n\n".join(page.text for page in self.iter_pages() if page.text)
+
+    def iter_pages(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[DocumentPage]:
+        """
+        Yield the pages in [start, stop) one at a time, blank ones included.
+
+        Only the requested pages are parsed, so a large document can be read
+        window by window without holding all of its text.
+        """
         file_ext = validate_file_extension(self.file_path)
         try:
             if file_ext == "pdf":
-                return self._extract_pdf(self.file_path)
+                yield from self._iter_pdf_pages(start, stop)
             elif file_ext == "docx":
-                return self._extract_docx(self.file_path)
+                yield from self._iter_docx_pages(start)
             elif file_ext == "pptx":
-                return self._extract_pptx(self.file_path)
+                yield from self._iter_pptx_pages(start, stop)
             else:
                 raise DocumentExtractionError(f"Unsupported file type: {file_ext}")
 
@@ -32,68 +90,117 @@ class DocumentExtractor:
             logger.error("Extraction failed: ", extra={"file_path": self.file_path})
             raise DocumentExtractionError(f"Failed to extract document: {e}")
 
-    def _extract_pdf(self, file_path: str) -> str:
+    def _iter_pdf_pages(
+        self, start: int, stop: Optional[int]
+    ) -> Iterator[DocumentPage]:
+        import pymupdf
+
         try:
-            loader = PyMuPDFLoader(file_path, mode="page", extract_tables="markdown")
-            documents = loader.load()
-            if not documents:
-                logger.warning("No content extracted from PDF")
-                return ""
-            full_text = "\n\n".join(
-                [
-                    doc.page_content.strip()
-                    for doc in documents
-                    if doc.page_content.strip()
-                ]
-            )
-            logger.info("PDF extraction successful", extra={"file_path": file_path})
-            return full_text
+            with pymupdf.open(self.file_path) as doc:
+                for page in doc.pages(start, stop):
+                    started = time.perf_counter()
+                    kind, text = _extract_pdf_page(page)
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    yield DocumentPage(page.number + 1, text, kind, elapsed_ms)
         except Exception as e:
             raise DocumentExtractionError(f"Error extracting PDF: {e}")
 
-    def _extract_docx(self, file_path: str) -> str:
+    def _iter_docx_pages(self, start: int) -> Iterator[DocumentPage]:
+        from docx import Document
+
+        if start > 0:
+            return
         try:
-            doc = Document(file_path)
+            doc = Document(self.file_path)
             paragraphs = [
                 para.text.strip() for para in doc.paragraphs if para.text.strip()
             ]
             if not paragraphs:
                 logger.warning("No content extracted from DOCX")
-                return ""
-            full_text = "\n\n".join(paragraphs)
-            logger.info("DOCX extraction successful", extra={"file_path": file_path})
-
-            return full_text
+            yield DocumentPage(1, "\n\n".join(paragraphs))
         except Exception as e:
             raise DocumentExtractionError(f"Error extracting DOCX: {e}")
 
-    def _extract_pptx(self, file_path: str) -> str:
+    def _iter_pptx_pages(
+        self, start: int, stop: Optional[int]
+    ) -> Iterator[DocumentPage]:
+        from pptx import Presentation
+
         try:
-            prs = Presentation(file_path)
-            text_items = []
-            slide_count = 0
-
-            for slide_num, slide in enumerate(prs.slides, 1):
-                slide_texts = []
-                for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        slide_texts.append(shape.text.strip())
-                if slide_texts:
-                    text_items.append(f"--- Slide {slide_num} ---")
-                    text_items.extend(slide_texts)
-                    slide_count += 1
-
-            if not text_items:
-                logger.warning(
-                    "No text content found in PPTX: ", extra={"file_path": file_path}
-                )
-                return ""
-
-            full_text = "\n".join(text_items)
-            logger.info(
-                "Successfully extracted : ",
-                extra={"file_path": file_path, "slides_extracted": slide_count},
-            )
-            return full_text
+            prs = Presentation(self.file_path)
+            slides = list(prs.slides)[start:stop]
+            for slide_num, slide in enumerate(slides, start + 1):
+                slide_texts = [
+                    shape.text.strip()
+                    for shape in slide.shapes
+                    if hasattr(shape, "text") and shape.text.strip()
+                ]
+                if not slide_texts:
+                    yield DocumentPage(slide_num, "", PageKind.Blank)
+                    continue
+                slide_texts.insert(0, f"--- Slide {slide_num} ---")
+                yield DocumentPage(slide_num, "\n".join(slide_texts))
         except Exception as e:
             raise DocumentExtractionError(f"Error extracting PPTX: {e}")
+
+
+def _count_rules(page: "pymupdf.Page") -> int:
+    """Count the axis-aligned lines and boxes drawn on a page."""
+    rules = 0
+    for path in page.get_cdrawings():
+        for item in path["items"]:
+            if item[0] == "re":
+                rules += 1
+            elif item[0] == "l":
+                (x0, y0), (x1, y1) = item[1], item[2]
+                if abs(x0 - x1) < 1 or abs(y0 - y1) < 1:
+                    rules += 1
+    return rules
+
+
+def _extract_pdf_page(page: "pymupdf.Page") -> tuple[PageKind, str]:
+    """
+    Extract one PDF page, running table detection only where it can pay off.
+
+    A cheap first pass reads the text layer. PyMuPDF only finds ruled tables,
+    so table-to-markdown conversion runs just on pages with enough ruled lines
+    and boxes; the rest keep their plain text. Pages without text are skipped
+    and classified as image-only or blank.
+    """
+    text = page.get_text().strip()
+    if not text:
+        if page.get_images() or page.get_cdrawings():
+            return PageKind.ImageOnly, ""
+        return PageKind.Blank, ""
+
+    if _count_rules(page) < settings.EXTRACTION_TABLE_MIN_RULES:
+        return PageKind.Text, text
+
+    tables = [table.to_markdown().strip() for table in page.find_tables().tables]
+    if not any(tables):
+        return PageKind.Text, text
+    # Tables are appended as markdown after the page text.
+    return PageKind.Table, "\n\n".join([text, *(table for table in tables if table)])
+
+
+def extract_document(file_path: str) -> str:
+    """Extract text from a document; picklable entry point for process pools."""
+    return DocumentExtractor(file_path).extract()
+
+
+def extract_pages(
+    file_path: str, start: int = 0, stop: Optional[int] = None
+) -> list[DocumentPage]:
+    """Extract the pages in [start, stop); picklable entry point for process pools."""
+    return list(DocumentExtractor(file_path).iter_pages(start, stop))
+
+
+def count_pdf_pages(file_path: str) -> int:
+    """Return a PDF's page count without parsing any page content."""
+    import pymupdf
+
+    try:
+        with pymupdf.open(file_path) as doc:
+            return doc.page_count
+    except Exception as e:
+        raise DocumentExtractionError(f"Error reading PDF: {e}")
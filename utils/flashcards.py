@@ -2,13 +2,19 @@
 import json
 import os
 import re
-from pathlib import Path
-from typing import Dict
+import uuid
+from typing import Dict, List, Optional
 
+import numpy as np
 from dotenv import load_dotenv
-from llama_index.llms.gemini import Gemini
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.constants import LLMCache
+from core.dependencies import get_llm
 from core.settings import settings
+from services.document_text import document_texts
+from services.llm_cache import content_hash, llm_cache
+from services.retrieval_service import select_context
 from utils.logger import get_logger
 
 load_dotenv()
@@ -16,51 +22,15 @@ load_dotenv()
 logger = get_logger()
 
 
-def generate_flashcards(file_id: str, num_cards: int = 5, language: str = "en") -> Dict:
-    """
-    Generate flashcards from Markdown content stored in output_<file_id>.md
-    Args:
-        file_id (str): Unique identifier for the Markdown file
-        num_cards (int): Number of flashcards to generate
-        language (str): Desired language for the flashcards.
-    Returns:
-        Dict: Dictionary containing flashcards or error message
-    """
-    try:
-        # Load Gemini API key
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-        if not gemini_api_key:
-            logger.error("GEMINI_API_KEY environment variable not set")
-            return {
-                "flashcards": [],
-                "error": "GEMINI_API_KEY environment variable not set",
-            }
-
-        # Initialize Gemini LLM
-        llm = Gemini(api_key=gemini_api_key)
-        logger.info("Gemini LLM initialized")
-
-        # Read Markdown file using file_id
-        markdown_path = Path(settings.OUTPUT_DIR) / f"{file_id}.md"
-        if not markdown_path.exists():
-            logger.error(
-                "Markdown file not found", extra={"markdown_path": markdown_path}
-            )
-            return {
-                "flashcards": [],
-                "error": f"Markdown file not found: {markdown_path}",
-            }
+class FlashcardParseError(ValueError):
+    """Raised when the LLM response cannot be turned into flashcards."""
 
-        with open(markdown_path, "r", encoding="utf-8") as f:
-            markdown_content = f.read()
-        logger.info("Markdown content loaded", extra={"markdown_path": markdown_path})
+    pass
 
-        if not markdown_content.strip():
-            logger.warning("Markdown content is empty")
-            return {"flashcards": [], "error": "No content in Markdown file"}
 
-        # Construct prompt with Markdown content, making language and number of cards dynamic
-        prompt = f"""
+def build_flashcard_prompt(content: str, num_cards: int, language: str) -> str:
+    """Build the flashcard prompt for the given document content."""
+    return f"""
         You are a flashcard generator. Using the following content extracted from a document, create exactly {num_cards} flashcards with concise question-answer pairs.
         The questions and answers should be strictly in {language}.
         Return the flashcards as a raw JSON array, ensuring valid JSON syntax, without wrapping it in code blocks (```json or ```) or adding any extra text, explanations, or comments.
@@ -83,63 +53,195 @@ def generate_flashcards(file_id: str, num_cards: int = 5, language: str = "en")
         []
 
         Content:
-        {markdown_content}
+        {content}
         """
 
-        # Query Gemini
-        response = llm.complete(prompt)
-        raw_response = response.text
-
-        cleaned_response = re.sub(
-            r"^```json\s*|\s*```$", "", raw_response, flags=re.IGNORECASE | re.DOTALL
-        ).strip()
-        logger.info(
-            "Cleaned response for JSON parsing",
+
+def parse_flashcards(raw_response: str) -> List[Dict[str, str]]:
+    """
+    Parse and validate the raw LLM response into question/answer pairs.
+    Args:
+        raw_response (str): Text returned by the LLM
+    Returns:
+        List[Dict[str, str]]: Flashcards that have both a question and an answer
+    Raises:
+        FlashcardParseError: If the response is not a JSON list of objects
+    """
+    cleaned_response = re.sub(
+        r"^```json\s*|\s*```$", "", raw_response, flags=re.IGNORECASE | re.DOTALL
+    ).strip()
+    logger.info(
+        "Cleaned response for JSON parsing",
+        extra={"cleaned_response": cleaned_response},
+    )
+
+    try:
+        flashcards = json.loads(cleaned_response)
+    except json.JSONDecodeError as e:
+        logger.error(
+            "Invalid JSON response after cleaning",
             extra={"cleaned_response": cleaned_response},
         )
+        raise FlashcardParseError(f"Failed to parse LLM response: {str(e)}") from e
+
+    if not isinstance(flashcards, list) or not all(
+        isinstance(card, dict) for card in flashcards
+    ):
+        logger.error("Invalid flashcard format: not a list of dictionaries")
+        raise FlashcardParseError("Invalid flashcard format")
+
+    # Validate that each flashcard has 'question' and 'answer'
+    validated_flashcards = []
+    for card in flashcards:
+        if "question" in card and "answer" in card:
+            validated_flashcards.append(
+                {"question": card["question"], "answer": card["answer"]}
+            )
+        else:
+            logger.warning("Skipping malformed flashcard", extra={"card": card})
 
-        # Attempt to parse JSON
-        try:
-            flashcards = json.loads(cleaned_response)
-            if not isinstance(flashcards, list) or not all(
-                isinstance(card, dict) for card in flashcards
-            ):
-                logger.error("Invalid flashcard format: not a list of dictionaries")
-                return {"flashcards": [], "error": "Invalid flashcard format"}
-
-            # Validate that each flashcard has 'question' and 'answer'
-            validated_flashcards = []
-            for card in flashcards:
-                if "question" in card and "answer" in card:
-                    validated_flashcards.append(
-                        {"question": card["question"], "answer": card["answer"]}
-                    )
-                else:
-                    logger.warning("Skipping malformed flashcard", extra={"card": card})
+    logger.info(
+        "Parsed and validated flashcards",
+        extra={"flashcards": validated_flashcards},
+    )
+    return validated_flashcards
 
-            logger.info(
-                "Parsed and validated flashcards",
-                extra={"flashcards": validated_flashcards},
-            )
 
-            # Save flashcards to JSON file (optional, but good for caching/debugging)
-            flashcards_path = (
-                Path(settings.OUTPUT_DIR) / f"flashcards_{file_id}_{language}.json"
-            )  # Include language in filename
-            with open(flashcards_path, "w", encoding="utf-8") as f:
-                json.dump(validated_flashcards, f, indent=2)
-            logger.info("Flashcards saved", extra={"flashcards_path": flashcards_path})
-
-            return {"flashcards": validated_flashcards}
-        except json.JSONDecodeError as e:
-            logger.error(
-                "Invalid JSON response after cleaning",
-                extra={"cleaned_response": cleaned_response},
-            )
+async def generate_flashcards(
+    db: AsyncSession, file_id: str, num_cards: int = 5, language: str = "en"
+) -> Dict:
+    """
+    Generate flashcards from the full extracted text stored for a file
+    Args:
+        db (AsyncSession): Database session
+        file_id (str): ID of the file whose document text is used
+        num_cards (int): Number of flashcards to generate
+        language (str): Desired language for the flashcards.
+    Returns:
+        Dict: Dictionary containing flashcards or error message
+    """
+    try:
+        # Load Gemini API key
+        gemini_api_key = os.getenv("GEMINI_API_KEY")
+        if not gemini_api_key:
+            logger.error("GEMINI_API_KEY environment variable not set")
+            return {
+                "flashcards": [],
+                "error": "GEMINI_API_KEY environment variable not set",
+            }
+
+        markdown_content = await document_texts.read_file(db, uuid.UUID(file_id))
+        if markdown_content is None:
+            logger.error("Document text not found", extra={"file_id": file_id})
             return {
                 "flashcards": [],
-                "error": f"Failed to parse LLM response: {str(e)}",
+                "error": f"No extracted text stored for file {file_id}",
             }
+        logger.info("Document text loaded", extra={"file_id": file_id})
+
+        if not markdown_content.strip():
+            logger.warning("Document text is empty")
+            return {"flashcards": [], "error": "No content in document"}
+
+        cache_key = llm_cache.make_key(
+            "flashcards",
+            LLMCache.FLASHCARD_PROMPT_VERSION,
+            markdown_content,
+            num_cards=num_cards,
+            language=language,
+        )
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Flashcards served from cache", extra={"file_id": file_id})
+            return {"flashcards": cached}
+
+        # Initialize Gemini LLM
+        from llama_index.llms.gemini import Gemini
+
+        llm = Gemini(api_key=gemini_api_key)
+        logger.info("Gemini LLM initialized")
+
+        # Query Gemini
+        prompt = build_flashcard_prompt(markdown_content, num_cards, language)
+        response = await llm.acomplete(prompt)
+
+        try:
+            validated_flashcards = parse_flashcards(response.text)
+        except FlashcardParseError as e:
+            return {"flashcards": [], "error": str(e)}
+
+        await llm_cache.set(cache_key, validated_flashcards)
+        return {"flashcards": validated_flashcards}
+
+    except Exception as e:
+        logger.error("Error generating flashcards", extra={"error": str(e)})
+        return {"flashcards": [], "error": f"Error generating flashcards: {str(e)}"}
+
+
+async def generate_flashcards_from_document(
+    db: AsyncSession,
+    document_id: uuid.UUID,
+    num_cards: int = 5,
+    language: str = "en",
+    query_vector: Optional[np.ndarray] = None,
+) -> Dict:
+    """
+    Generate flashcards from a bounded, retrieval-selected slice of a document.
+
+    Only the stored chunks picked by services.retrieval_service.select_context
+    are sent to the LLM, so the prompt stays within
+    FLASHCARD_CONTEXT_TOKEN_BUDGET however large the source file is.
+    Args:
+        db (AsyncSession): Database session
+        document_id (uuid.UUID): Document whose embeddings are used
+        num_cards (int): Number of flashcards to generate
+        language (str): Desired language for the flashcards.
+        query_vector (Optional[np.ndarray]): Optional topic embedding to focus on
+    Returns:
+        Dict: Dictionary containing flashcards or error message, and on success
+            a generation id that is the same whenever the output is cached
+    """
+    try:
+        context = await select_context(
+            db,
+            document_id,
+            token_budget=settings.FLASHCARD_CONTEXT_TOKEN_BUDGET,
+            query_vector=query_vector,
+        )
+        if not context.strip():
+            logger.warning(
+                "No embedded content for document",
+                extra={"document_id": str(document_id)},
+            )
+            return {"flashcards": [], "error": "No content available for document"}
+
+        cache_key = llm_cache.make_key(
+            "flashcards",
+            LLMCache.FLASHCARD_PROMPT_VERSION,
+            context,
+            num_cards=num_cards,
+            language=language,
+        )
+        generation = content_hash(cache_key)
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            logger.info(
+                "Flashcards served from cache",
+                extra={"document_id": str(document_id)},
+            )
+            return {"flashcards": cached, "generation": generation}
+
+        llm = get_llm()
+        prompt = build_flashcard_prompt(context, num_cards, language)
+        response = await llm.acomplete(prompt)
+
+        try:
+            flashcards = parse_flashcards(response.text)
+        except FlashcardParseError as e:
+            return {"flashcards": [], "error": str(e)}
+
+        await llm_cache.set(cache_key, flashcards)
+        return {"flashcards": flashcards, "generation": generation}
 
     except Exception as e:
         logger.error("Error generating flashcards", extra={"error": str(e)})
@@ -1,9 +1,16 @@
+import asyncio
+import hashlib
 import os
 import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Awaitable, Callable, TypeVar
+from typing import Iterator
+
+from fastapi import UploadFile
+from pydantic import BaseModel
 
 from models import FileType
+from schemas.exception import FileTooLargeError
 
 ALLOWED_FILE_EXTENSIONS = {
     FileType.Pdf.value,
@@ -11,8 +18,7 @@ ALLOWED_FILE_EXTENSIONS = {
     FileType.Pptx.value,
 }
 
-
-T = TypeVar("T")
+STREAM_CHUNK_SIZE = 1024 * 1024  # 1 MB
 
 
 def ensure_directory_exists(directory_path: str) -> None:
@@ -30,19 +36,46 @@ def validate_file_extension(file_name: str) -> FileType:
     return FileType(ext)
 
 
-async def with_temp_file(
-    contents: bytes,
-    suffix: str,
-    callback: Callable[[str], Awaitable[T]],
-) -> T:
-    tmp_path = None
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(contents)
-            tmp_path = tmp.name
+class SpooledUpload(BaseModel):
+    path: str
+    sha256: str
+    size: int
 
-        return await callback(tmp_path)
 
+@contextmanager
+def temporary_path(suffix: str) -> Iterator[str]:
+    """Yield the path of a new temporary file and remove it afterwards."""
+    fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        yield tmp_path
     finally:
-        if tmp_path and os.path.exists(tmp_path):
+        if os.path.exists(tmp_path):
             os.remove(tmp_path)
+
+
+async def spool_upload(
+    file: UploadFile, destination: str, max_bytes: int
+) -> SpooledUpload:
+    """
+    Copy an upload to disk in fixed-size chunks, hashing it on the way.
+
+    Args:
+        file (UploadFile): The incoming upload stream.
+        destination (str): Path of the file to write to.
+        max_bytes (int): Maximum accepted size of the upload.
+
+    Raises:
+        FileTooLargeError: If the stream grows past max_bytes.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    with open(destination, "wb") as spool:
+        while chunk := await file.read(STREAM_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise FileTooLargeError(f"File exceeds the {max_bytes} byte limit")
+            hasher.update(chunk)
+            await asyncio.to_thread(spool.write, chunk)
+
+    return SpooledUpload(path=destination, sha256=hasher.hexdigest(), size=size)
@@ -1,115 +1,117 @@
+import asyncio
 import json
 import logging
+import math
 import re
-from pathlib import Path
+import uuid
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.constants import LLMCache
 from core.dependencies import get_llm
 from core.settings import settings
+from services.document_text import document_texts
+from services.llm_cache import content_hash, llm_cache
+from services.retrieval_service import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
+QUESTION_TYPES = ("single_correct", "multiple_correct", "yes_no")
 
-def generate_quiz_from_index(
-    file_id: str,
+_HEADING_RE = re.compile(r"^#{1,6}\s", re.MULTILINE)
+
+
+def resolve_question_counts(
     total_questions: int,
     num_single_correct: int = -1,
     num_multiple_correct: int = -1,
     num_yes_no: int = -1,
-    language: str = "en",
-    quizzes_type: str = "mixed",
-) -> dict:
-    try:
-        llm = get_llm()
-        logger.info("Gemini LLM initialized")
-
-        markdown_path = Path(settings.OUTPUT_DIR) / f"{file_id}.md"
-        if not markdown_path.exists():
-            logger.error(
-                "Markdown file not found", extra={"markdown_path": markdown_path}
+) -> dict[str, int]:
+    """
+    Work out how many questions of each type to generate.
+
+    A count of -1 means "distribute automatically"; any remainder after the
+    explicit counts is spread evenly across those types.
+
+    Raises:
+        ValueError: If the requested counts cannot add up to total_questions.
+    """
+    question_counts = {
+        "single_correct": num_single_correct,
+        "multiple_correct": num_multiple_correct,
+        "yes_no": num_yes_no,
+    }
+
+    explicit_counts = {k: v for k, v in question_counts.items() if v >= 0}
+    sum_explicit_counts = sum(explicit_counts.values())
+
+    if sum_explicit_counts > total_questions:
+        raise ValueError("Sum of specified question types exceeds total_questions.")
+
+    remaining_questions = total_questions - sum_explicit_counts
+    auto_distribute_types = [k for k, v in question_counts.items() if v == -1]
+
+    if not explicit_counts:
+        auto_distribute_types = ["single_correct", "multiple_correct", "yes_no"]
+
+    if remaining_questions > 0 and auto_distribute_types:
+        num_auto_distribute_types = len(auto_distribute_types)
+        base_count = remaining_questions // num_auto_distribute_types
+        remainder = remaining_questions % num_auto_distribute_types
+
+        for i, q_type in enumerate(auto_distribute_types):
+            question_counts[q_type] = base_count + (1 if i < remainder else 0)
+    elif (
+        remaining_questions == 0
+        and not auto_distribute_types
+        and sum_explicit_counts < total_questions
+    ):
+        if len(explicit_counts) > 0:
+            first_explicit_type = list(explicit_counts.keys())[0]
+            question_counts[first_explicit_type] += (
+                total_questions - sum_explicit_counts
             )
-            return {
-                "questions": [],
-                "error": f"Markdown file not found: {markdown_path}",
-            }
+        else:
+            raise ValueError("Cannot fulfill total_questions with given constraints.")
 
-        with open(markdown_path, "r", encoding="utf-8") as f:
-            markdown_content = f.read()
-        logger.info("Markdown content loaded", extra={"markdown_path": markdown_path})
+    for k in question_counts:
+        if question_counts[k] == -1:
+            question_counts[k] = 0
 
-        if not markdown_content.strip():
-            logger.warning("Markdown content is empty")
-            return {"questions": [], "error": "No content in Markdown file"}
-
-        question_counts = {
-            "single_correct": num_single_correct,
-            "multiple_correct": num_multiple_correct,
-            "yes_no": num_yes_no,
-        }
-
-        explicit_counts = {k: v for k, v in question_counts.items() if v >= 0}
-        sum_explicit_counts = sum(explicit_counts.values())
-
-        if sum_explicit_counts > total_questions:
-            return {
-                "questions": [],
-                "error": "Sum of specified question types exceeds total_questions.",
-            }
+    return question_counts
 
-        remaining_questions = total_questions - sum_explicit_counts
-        auto_distribute_types = [k for k, v in question_counts.items() if v == -1]
-
-        if not explicit_counts:
-            auto_distribute_types = ["single_correct", "multiple_correct", "yes_no"]
-
-        if remaining_questions > 0 and auto_distribute_types:
-            num_auto_distribute_types = len(auto_distribute_types)
-            base_count = remaining_questions // num_auto_distribute_types
-            remainder = remaining_questions % num_auto_distribute_types
-
-            for i, q_type in enumerate(auto_distribute_types):
-                question_counts[q_type] = base_count + (1 if i < remainder else 0)
-        elif (
-            remaining_questions == 0
-            and not auto_distribute_types
-            and sum_explicit_counts < total_questions
-        ):
-            if len(explicit_counts) > 0:
-                first_explicit_type = list(explicit_counts.keys())[0]
-                question_counts[first_explicit_type] += (
-                    total_questions - sum_explicit_counts
-                )
-            else:
-                return {
-                    "questions": [],
-                    "error": "Cannot fulfill total_questions with given constraints.",
-                }
-
-        for k in question_counts:
-            if question_counts[k] == -1:
-                question_counts[k] = 0
 
-        question_distribution_instruction = []
-        if question_counts["single_correct"] > 0:
-            question_distribution_instruction.append(
-                f"- Exactly {question_counts['single_correct']} Single-Correct Multiple-Choice questions."
-            )
-        if question_counts["multiple_correct"] > 0:
-            question_distribution_instruction.append(
-                f"- Exactly {question_counts['multiple_correct']} Multiple-Correct Multiple-Choice questions."
-            )
-        if question_counts["yes_no"] > 0:
-            question_distribution_instruction.append(
-                f"- Exactly {question_counts['yes_no']} Yes/No questions."
-            )
-
-        if not question_distribution_instruction:
-            return {
-                "questions": [],
-                "error": "No question types selected for generation.",
-            }
-
-        question_distribution_str = "\n        ".join(question_distribution_instruction)
-        prompt = f"""
+def build_quiz_prompt(
+    content: str,
+    total_questions: int,
+    question_counts: dict[str, int],
+    language: str,
+) -> str:
+    """
+    Build the quiz prompt for the given content and per-type counts.
+
+    Raises:
+        ValueError: If no question type has a positive count.
+    """
+    question_distribution_instruction = []
+    if question_counts["single_correct"] > 0:
+        question_distribution_instruction.append(
+            f"- Exactly {question_counts['single_correct']} Single-Correct Multiple-Choice questions."
+        )
+    if question_counts["multiple_correct"] > 0:
+        question_distribution_instruction.append(
+            f"- Exactly {question_counts['multiple_correct']} Multiple-Correct Multiple-Choice questions."
+        )
+    if question_counts["yes_no"] > 0:
+        question_distribution_instruction.append(
+            f"- Exactly {question_counts['yes_no']} Yes/No questions."
+        )
+
+    if not question_distribution_instruction:
+        raise ValueError("No question types selected for generation.")
+
+    question_distribution_str = "\n        ".join(question_distribution_instruction)
+    return f"""
         You are an expert educational content creator and quiz generator. Your task is to construct a quiz based on the provided content from a PDF document.
 
         The quiz must contain exactly {total_questions} questions.
@@ -169,15 +171,132 @@ def generate_quiz_from_index(
         }}
 
         Content to use for quiz generation:
-        {markdown_content}
+        {content}
         """
 
-        response = llm.complete(prompt)
+
+def parse_quiz_response(raw_response: str) -> dict:
+    """
+    Strip code fences from an LLM response and decode the quiz JSON.
+
+    Raises:
+        json.JSONDecodeError: If the response is not valid JSON.
+    """
+    cleaned_response = re.sub(r"^```json\s*|\s*```$", "", raw_response).strip()
+    return json.loads(cleaned_response)
+
+
+def _answer_key(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def normalize_question(question: dict) -> dict:
+    """
+    Trim options and point each correct answer at the option it names, so an
+    answer that differs from its option only in case or whitespace still
+    matches it. Answers that match no option are left for validate_question
+    to reject.
+    """
+    options = question.get("options")
+    correct_answers = question.get("correct_answers")
+    if not isinstance(options, list) or not isinstance(correct_answers, list):
+        return question
+
+    options = [opt.strip() if isinstance(opt, str) else opt for opt in options]
+    by_key = {_answer_key(opt): opt for opt in options if isinstance(opt, str)}
+    answers: list = []
+    for answer in correct_answers:
+        if isinstance(answer, str):
+            answer = by_key.get(_answer_key(answer), answer)
+        if answer not in answers:
+            answers.append(answer)
+    return {**question, "options": options, "correct_answers": answers}
+
+
+def validate_question(question: dict, q_type: str) -> str | None:
+    """Return why a question is malformed for its type, or None if it is valid."""
+    options = question.get("options", [])
+    correct_answers = question.get("correct_answers", [])
+
+    if not isinstance(options, list) or not isinstance(correct_answers, list):
+        return "Invalid question: options and correct_answers must be lists"
+
+    if not all(isinstance(opt, str) and opt.strip() for opt in options):
+        return "Invalid question: options must be non-empty strings"
+
+    if len(options) != len({_answer_key(opt) for opt in options}):
+        return "Invalid question: options must be unique"
+
+    if not all(ca in options for ca in correct_answers):
+        return "Invalid question: correct_answers must be from options"
+
+    # Type-specific validation
+    if q_type == "single_correct":
+        if len(options) != 4 or len(correct_answers) != 1:
+            return "Invalid single_correct question format"
+    elif q_type == "multiple_correct":
+        if len(options) != 4 or len(correct_answers) < 2:
+            return "Invalid multiple_correct question format"
+    elif q_type == "yes_no":
+        if len(options) != 2 or len(correct_answers) != 1:
+            return "Invalid yes_no question format"
+    return None
+
+
+async def generate_quiz_from_index(
+    db: AsyncSession,
+    file_id: str,
+    total_questions: int,
+    num_single_correct: int = -1,
+    num_multiple_correct: int = -1,
+    num_yes_no: int = -1,
+    language: str = "en",
+    quizzes_type: str = "mixed",
+) -> dict:
+    try:
+        llm = get_llm()
+        logger.info("Gemini LLM initialized")
+
+        markdown_content = await document_texts.read_file(db, uuid.UUID(file_id))
+        if markdown_content is None:
+            logger.error("Document text not found", extra={"file_id": file_id})
+            return {
+                "questions": [],
+                "error": f"No extracted text stored for file {file_id}",
+            }
+        logger.info("Document text loaded", extra={"file_id": file_id})
+
+        if not markdown_content.strip():
+            logger.warning("Document text is empty")
+            return {"questions": [], "error": "No content in document"}
+
+        try:
+            question_counts = resolve_question_counts(
+                total_questions, num_single_correct, num_multiple_correct, num_yes_no
+            )
+            prompt = build_quiz_prompt(
+                markdown_content, total_questions, question_counts, language
+            )
+        except ValueError as e:
+            return {"questions": [], "error": str(e)}
+
+        cache_key = llm_cache.make_key(
+            "quiz",
+            LLMCache.QUIZ_PROMPT_VERSION,
+            markdown_content,
+            question_counts=question_counts,
+            language=language,
+        )
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Quiz served from cache", extra={"file_id": file_id})
+            return cached
+
+        response = await llm.acomplete(prompt)
         raw_response = response.text
-        cleaned_response = re.sub(r"^```json\s*|\s*```$", "", raw_response).strip()
 
         try:
-            quiz_data = json.loads(cleaned_response)
+            quiz_data = parse_quiz_response(raw_response)
             logger.info("Parsed quiz data", extra={"quiz_data": quiz_data})
 
             if not isinstance(quiz_data, dict) or "questions" not in quiz_data:
@@ -208,6 +327,10 @@ def generate_quiz_from_index(
                     "error": "Total questions generated does not match requested total",
                 }
 
+            quiz_data["questions"] = [
+                normalize_question(question) if isinstance(question, dict) else question
+                for question in quiz_data["questions"]
+            ]
             for question in quiz_data.get("questions", []):
                 if not isinstance(question, dict):
                     logger.error("Invalid question format")
@@ -221,7 +344,7 @@ def generate_quiz_from_index(
                     continue
 
                 q_type = q_type_raw.strip().lower()
-                if q_type not in ["single_correct", "multiple_correct", "yes_no"]:
+                if q_type not in QUESTION_TYPES:
                     logger.error(
                         "Invalid question type", extra={"question_type": q_type}
                     )
@@ -230,66 +353,12 @@ def generate_quiz_from_index(
                         "error": f"Invalid question type: {q_type}",
                     }
 
-                options = question.get("options", [])
-                correct_answers = question.get("correct_answers", [])
-
-                if not all(isinstance(opt, str) and opt.strip() for opt in options):
-                    logger.error("Invalid question: options must be non-empty strings")
-                    return {
-                        "questions": [],
-                        "error": "Invalid question: options must be non-empty strings",
-                    }
-
-                if len(options) != len(set(options)):
-                    logger.error("Invalid question: options must be unique")
-                    return {
-                        "questions": [],
-                        "error": "Invalid question: options must be unique",
-                    }
-
-                if not all(ca in options for ca in correct_answers):
-                    logger.error(
-                        "Invalid question: correct_answers must be from options"
-                    )
-                    return {
-                        "questions": [],
-                        "error": "Invalid question: correct_answers must be from options",
-                    }
-
-                # Type-specific validation
-                if q_type == "single_correct":
-                    if len(options) != 4 or len(correct_answers) != 1:
-                        logger.error(
-                            "Invalid single_correct question: must have 4 options and 1 correct answer, got 4 options and 1 correct answer"
-                        )
-                        return {
-                            "questions": [],
-                            "error": "Invalid single_correct question format",
-                        }
-                elif q_type == "multiple_correct":
-                    if len(options) != 4 or len(correct_answers) < 2:
-                        logger.error(
-                            "Invalid multiple_correct question: must have 4 options and 2 or more correct answers, got 4 options and 1 correct answer"
-                        )
-                        return {
-                            "questions": [],
-                            "error": "Invalid multiple_correct question format",
-                        }
-                elif q_type == "yes_no":
-                    if len(options) != 2 or len(correct_answers) != 1:
-                        logger.error(
-                            "Invalid yes_no question: must have 2 options and 1 correct answer, got options {options} and {len(correct_answers)} correct answers"
-                        )
-                        return {
-                            "questions": [],
-                            "error": "Invalid yes_no question format",
-                        }
-
-            quiz_path = Path(settings.OUTPUT_DIR) / f"quiz_{file_id}.json"
-            with open(quiz_path, "w", encoding="utf-8") as f:
-                json.dump(quiz_data, f, indent=2)
-            logger.info("Quiz saved", extra={"quiz_path": quiz_path})
+                error = validate_question(question, q_type)
+                if error:
+                    logger.error(error, extra={"question": question})
+                    return {"questions": [], "error": error}
 
+            await llm_cache.set(cache_key, quiz_data)
             return quiz_data
         except json.JSONDecodeError as e:
             logger.error("Invalid JSON response after cleaning: {cleaned_response}")
@@ -298,3 +367,273 @@ def generate_quiz_from_index(
     except Exception as e:
         logger.error("Error generating quiz", exc_info=e)
         return {"questions": [], "error": "Error generating quiz"}
+
+
+def split_sections(
+    markdown_content: str, token_budget: int, max_sections: int | None = None
+) -> list[str]:
+    """
+    Split markdown into sections of roughly token_budget tokens.
+
+    Headings start a new block; blocks are packed greedily, and any block that
+    alone exceeds the budget is cut on paragraph and then character boundaries.
+    Packing on heading boundaries can leave more sections than max_sections,
+    so the smallest neighbouring pair is then merged until it fits.
+    """
+    starts = [m.start() for m in _HEADING_RE.finditer(markdown_content)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    blocks = [
+        markdown_content[start:end]
+        for start, end in zip(starts, starts[1:] + [len(markdown_content)])
+    ]
+
+    max_chars = token_budget * 4
+    pieces: list[str] = []
+    for block in blocks:
+        if estimate_tokens(block) <= token_budget:
+            pieces.append(block)
+            continue
+        for paragraph in block.split("\n\n"):
+            for offset in range(0, len(paragraph), max_chars):
+                pieces.append(paragraph[offset : offset + max_chars] + "\n\n")
+
+    sections: list[str] = []
+    current = ""
+    for piece in pieces:
+        if current and estimate_tokens(current + piece) > token_budget:
+            sections.append(current)
+            current = ""
+        current += piece
+    if current:
+        sections.append(current)
+    sections = [section for section in sections if section.strip()]
+
+    while max_sections and len(sections) > max_sections:
+        i = min(
+            range(len(sections) - 1),
+            key=lambda i: len(sections[i]) + len(sections[i + 1]),
+        )
+        sections[i : i + 2] = [sections[i] + sections[i + 1]]
+    return sections
+
+
+def allocate_questions(
+    weights: list[int], question_counts: dict[str, int], oversample: float
+) -> list[dict[str, int]]:
+    """
+    Spread each type's count over sections in proportion to their weight.
+
+    Shares are split by largest remainder so they sum to the requested count,
+    then scaled up by oversample to leave headroom for deduplication and
+    rejected questions.
+    """
+    total_weight = sum(weights) or 1
+    plan: list[dict[str, int]] = [dict.fromkeys(QUESTION_TYPES, 0) for _ in weights]
+    for q_type, count in question_counts.items():
+        if count <= 0:
+            continue
+        raw = [count * weight / total_weight for weight in weights]
+        shares = [math.floor(value) for value in raw]
+        by_remainder = sorted(
+            range(len(weights)), key=lambda i: raw[i] - shares[i], reverse=True
+        )
+        for i in by_remainder[: count - sum(shares)]:
+            shares[i] += 1
+        for i, share in enumerate(shares):
+            if share:
+                plan[i][q_type] = math.ceil(share * oversample)
+    return plan
+
+
+def _question_key(question: str) -> str:
+    return re.sub(r"[\W_]+", " ", question).strip().lower()
+
+
+def merge_section_questions(
+    section_questions: list[list[dict]], question_counts: dict[str, int]
+) -> list[dict]:
+    """
+    Deduplicate and validate section results, then pick exactly the requested
+    number of questions per type, round-robin across sections for coverage.
+
+    Raises:
+        ValueError: If the sections did not yield enough valid questions.
+    """
+    seen: set[str] = set()
+    buckets: dict[str, list[list[dict]]] = {
+        q_type: [[] for _ in section_questions] for q_type in QUESTION_TYPES
+    }
+    for index, questions in enumerate(section_questions):
+        for question in questions:
+            if not isinstance(question, dict):
+                continue
+            question = normalize_question(question)
+            q_type_raw = question.get("type")
+            text = question.get("question")
+            if not isinstance(q_type_raw, str) or not isinstance(text, str):
+                continue
+            q_type = q_type_raw.strip().lower()
+            if q_type not in QUESTION_TYPES or validate_question(question, q_type):
+                continue
+            key = _question_key(text)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            buckets[q_type][index].append({**question, "type": q_type})
+
+    merged: list[dict] = []
+    for q_type in QUESTION_TYPES:
+        wanted = question_counts.get(q_type, 0)
+        picked: list[dict] = []
+        queues = [list(reversed(section)) for section in buckets[q_type]]
+        while len(picked) < wanted and any(queues):
+            for queue in queues:
+                if queue and len(picked) < wanted:
+                    picked.append(queue.pop())
+        if len(picked) < wanted:
+            raise ValueError(f"Generated {len(picked)} of {wanted} {q_type} questions")
+        merged.extend(picked)
+    return merged
+
+
+async def _generate_section(
+    llm,
+    semaphore: asyncio.Semaphore,
+    section: str,
+    section_counts: dict[str, int],
+    language: str,
+) -> list[dict]:
+    prompt = build_quiz_prompt(
+        section, sum(section_counts.values()), section_counts, language
+    )
+    async with semaphore:
+        try:
+            response = await asyncio.wait_for(
+                llm.acomplete(prompt), settings.QUIZ_SECTION_TIMEOUT_SECONDS
+            )
+            quiz_data = parse_quiz_response(response.text)
+        except Exception as e:
+            logger.warning("Quiz section failed", exc_info=e)
+            return []
+    if not isinstance(quiz_data, dict) or not isinstance(
+        quiz_data.get("questions"), list
+    ):
+        logger.warning("Invalid quiz structure from section")
+        return []
+    return quiz_data["questions"]
+
+
+async def generate_quiz_parallel(
+    db: AsyncSession,
+    file_id: str,
+    total_questions: int,
+    num_single_correct: int = -1,
+    num_multiple_correct: int = -1,
+    num_yes_no: int = -1,
+    language: str = "en",
+) -> dict:
+    """
+    Map-reduce variant of generate_quiz_from_index for large documents.
+
+    The markdown is split into sections, each section gets its own LLM call
+    (at most QUIZ_MAX_CONCURRENCY in flight), and the per-section questions
+    are merged, deduplicated and rebalanced to the same per-type counts the
+    single-call mode asks for. Wall-clock time follows the slowest section
+    instead of the whole document. A successful result also carries a
+    generation id that is the same whenever the quiz is cached.
+    """
+    try:
+        llm = get_llm()
+
+        markdown_content = await document_texts.read_file(db, uuid.UUID(file_id))
+        if markdown_content is None:
+            logger.error("Document text not found", extra={"file_id": file_id})
+            return {
+                "questions": [],
+                "error": f"No extracted text stored for file {file_id}",
+            }
+        logger.info("Document text loaded", extra={"file_id": file_id})
+
+        if not markdown_content.strip():
+            logger.warning("Document text is empty")
+            return {"questions": [], "error": "No content in document"}
+
+        try:
+            question_counts = resolve_question_counts(
+                total_questions, num_single_correct, num_multiple_correct, num_yes_no
+            )
+        except ValueError as e:
+            return {"questions": [], "error": str(e)}
+        if not any(question_counts.values()):
+            return {
+                "questions": [],
+                "error": "No question types selected for generation.",
+            }
+
+        cache_key = llm_cache.make_key(
+            "quiz",
+            LLMCache.QUIZ_PROMPT_VERSION,
+            markdown_content,
+            question_counts=question_counts,
+            language=language,
+            mode="parallel",
+            section_token_budget=settings.QUIZ_SECTION_TOKEN_BUDGET,
+            max_sections=settings.QUIZ_MAX_SECTIONS,
+        )
+        generation = content_hash(cache_key)
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Quiz served from cache", extra={"file_id": file_id})
+            return {**cached, "generation": generation}
+
+        # Never fan out past QUIZ_MAX_SECTIONS, however long the document is.
+        token_budget = max(
+            settings.QUIZ_SECTION_TOKEN_BUDGET,
+            estimate_tokens(markdown_content) // settings.QUIZ_MAX_SECTIONS + 1,
+        )
+        sections = split_sections(
+            markdown_content, token_budget, settings.QUIZ_MAX_SECTIONS
+        )
+        plan = allocate_questions(
+            [estimate_tokens(section) for section in sections],
+            question_counts,
+            settings.QUIZ_OVERSAMPLE_FACTOR,
+        )
+
+        semaphore = asyncio.Semaphore(settings.QUIZ_MAX_CONCURRENCY)
+        jobs = [
+            (section, section_counts)
+            for section, section_counts in zip(sections, plan)
+            if any(section_counts.values())
+        ]
+        section_questions = await asyncio.gather(
+            *(
+                _generate_section(llm, semaphore, section, section_counts, language)
+                for section, section_counts in jobs
+            )
+        )
+        logger.info(
+            "Quiz sections generated",
+            extra={
+                "sections": len(jobs),
+                "generated": sum(len(questions) for questions in section_questions),
+            },
+        )
+
+        try:
+            questions = merge_section_questions(section_questions, question_counts)
+        except ValueError as e:
+            logger.error("Not enough valid questions after merging", exc_info=e)
+            return {
+                "questions": [],
+                "error": "Total questions generated does not match requested total",
+            }
+
+        quiz_data = {"questions": questions}
+        await llm_cache.set(cache_key, quiz_data)
+        return {**quiz_data, "generation": generation}
+
+    except Exception as e:
+        logger.error("Error generating quiz", exc_info=e)
+        return {"questions": [], "error": "Error generating quiz"}
@@ -1,36 +1,210 @@
 import asyncio
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Optional, TypeVar
+from urllib.parse import quote
 
-from supabase import Client, create_client
+import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from core.settings import settings
+from schemas.exception import SupabaseAPIError
 
-_supabase_client: Client | None = None
+if TYPE_CHECKING:
+    from supabase import Client
 
+T = TypeVar("T")
 
-def get_supabase_client() -> Client:
+_supabase_client: Optional["Client"] = None
+
+
+def get_supabase_client() -> "Client":
     global _supabase_client
     if _supabase_client is None:
+        # Only the OAuth flow still needs supabase-py; import it on first use.
+        from supabase import create_client
+
         _supabase_client = create_client(
             settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY
         )
     return _supabase_client
 
 
-@retry(
-    wait=wait_exponential(multiplier=2, min=4, max=10),
+class SupabaseHTTP:
+    """Async client for the Supabase Auth and Storage REST APIs.
+
+    All calls share one pooled httpx connection pool, carry a per-call timeout
+    and are capped at SUPABASE_MAX_CONCURRENCY in flight. The client holds no
+    user session: requests made on behalf of a user pass their access token
+    explicitly, so concurrent requests never see each other's auth state.
+    """
+
+    def __init__(self) -> None:
+        self.client: Optional[httpx.AsyncClient] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+
+    def init_client(self) -> None:
+        self.client = httpx.AsyncClient(
+            base_url=settings.SUPABASE_URL,
+            headers={"apikey": settings.SUPABASE_SERVICE_KEY},
+            timeout=settings.SUPABASE_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.SUPABASE_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.SUPABASE_MAX_CONCURRENCY,
+            ),
+        )
+        self.semaphore = asyncio.Semaphore(settings.SUPABASE_MAX_CONCURRENCY)
+
+    async def close(self) -> None:
+        if self.client:
+            await self.client.aclose()
+        self.client = None
+        self.semaphore = None
+
+    def _ensure_client(self) -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        if not self.client or not self.semaphore:
+            self.init_client()
+        assert self.client and self.semaphore
+        return self.client, self.semaphore
+
+    @staticmethod
+    def _headers(
+        bearer: Optional[str], extra: Optional[dict[str, str]] = None
+    ) -> dict[str, str]:
+        headers = {"Authorization": f"Bearer {bearer or settings.SUPABASE_SERVICE_KEY}"}
+        if extra:
+            headers.update(extra)
+        return headers
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response) -> None:
+        if response.is_success:
+            return
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        message = response.text
+        error_code = None
+        if isinstance(body, dict):
+            message = (
+                body.get("msg")
+                or body.get("message")
+                or body.get("error_description")
+                or body.get("error")
+                or message
+            )
+            error_code = body.get("error_code") or body.get("code")
+        raise SupabaseAPIError(response.status_code, str(message), error_code)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        bearer: Optional[str] = None,
+        headers: Optional[dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Send a request and return the decoded JSON body (None when empty).
+
+        Raises:
+            SupabaseAPIError: If Supabase answers with a non-2xx status.
+            httpx.HTTPError: On timeouts and transport failures.
+        """
+        client, semaphore = self._ensure_client()
+        async with semaphore:
+            response = await client.request(
+                method,
+                path,
+                headers=self._headers(bearer, headers),
+                timeout=timeout or settings.SUPABASE_TIMEOUT_SECONDS,
+                **kwargs,
+            )
+        self._raise_for_status(response)
+        return response.json() if response.content else None
+
+    @asynccontextmanager
+    async def stream(
+        self, method: str, path: str, timeout: Optional[float] = None
+    ) -> AsyncIterator[httpx.Response]:
+        """Stream a response body; the concurrency slot is held until exit."""
+        client, semaphore = self._ensure_client()
+        async with semaphore:
+            async with client.stream(
+                method,
+                path,
+                headers=self._headers(None),
+                timeout=timeout or settings.SUPABASE_TIMEOUT_SECONDS,
+            ) as response:
+                if not response.is_success:
+                    await response.aread()
+                self._raise_for_status(response)
+                yield response
+
+    async def run_sync(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a call on the sync supabase client off the event loop, under
+        the same concurrency limit and timeout as the REST calls.
+        """
+        _, semaphore = self._ensure_client()
+        async with semaphore:
+            return await asyncio.wait_for(
+                asyncio.to_thread(func, *args), settings.SUPABASE_TIMEOUT_SECONDS
+            )
+
+
+supabase_http = SupabaseHTTP()
+
+
+def storage_object_path(bucket_name: str, path: str) -> str:
+    return f"/storage/v1/object/{bucket_name}/{quote(path)}"
+
+
+# Signing sits on the upload response path, so retries back off briefly
+# rather than adding tens of seconds to a request.
+_sign_retry = retry(
+    wait=wait_exponential(multiplier=0.2, min=0.2, max=1),
     stop=stop_after_attempt(3),
     reraise=True,
 )
-def _get_signed_url(path: str, expires_in: int = 3600) -> str:
-    supabase = get_supabase_client()
-    response = supabase.storage.from_(settings.SUPABASE_BUCKET).create_signed_url(
-        path=path, expires_in=expires_in
+
+
+def _signed_url(signed_path: str) -> str:
+    return f"{settings.SUPABASE_URL}/storage/v1{signed_path}"
+
+
+@_sign_retry
+async def get_signed_url(path: str, expires_in: int = 3600) -> str:
+    response = await supabase_http.request(
+        "POST",
+        f"/storage/v1/object/sign/{settings.SUPABASE_BUCKET}/{quote(path)}",
+        json={"expiresIn": expires_in},
     )
-    if "signedURL" not in response:
+    if not response or "signedURL" not in response:
         raise Exception("Signed URL not found in response")
-    return response["signedURL"]
+    return _signed_url(response["signedURL"])
 
 
-async def get_signed_url(path: str, expires_in: int = 3600) -> str:
-    return await asyncio.to_thread(_get_signed_url, path, expires_in)
+@_sign_retry
+async def create_signed_urls(
+    paths: list[str], expires_in: int = 3600
+) -> dict[str, str]:
+    """
+    Sign several storage paths in one request.
+
+    Returns:
+        dict[str, str]: Signed URL per path; paths Supabase could not sign,
+        e.g. missing objects, are left out.
+    """
+    if not paths:
+        return {}
+    response = await supabase_http.request(
+        "POST",
+        f"/storage/v1/object/sign/{settings.SUPABASE_BUCKET}",
+        json={"expiresIn": expires_in, "paths": paths},
+    )
+    return {
+        item["path"]: _signed_url(item["signedURL"])
+        for item in response or []
+        if item.get("signedURL") and not item.get("error")
+    }
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import signal
+import socket
+
+import redis.asyncio as aioredis
+
+from core.executor import executors
+from core.settings import settings
+from db import sessionmanager
+from services.embedding_engine import embedding_engine
+from services.embeding_service import load_embedding_model
+from services.ingestion_service import IngestionQueue, IngestionWorker
+from services.storage_reconciler import StorageReconciler
+from utils.logger import get_logger
+from utils.supabase_client import supabase_http
+
+logger = get_logger()
+
+
+async def main() -> None:
+    sessionmanager.init_db()
+    executors.init_executors()
+    supabase_http.init_client()
+    redis = await aioredis.from_url(settings.REDIS_URL)
+    if settings.EMBEDDING_SIDECAR_SOCKET:
+        await embedding_engine.connect(settings.EMBEDDING_SIDECAR_SOCKET)
+    else:
+        await embedding_engine.start(load_embedding_model)
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    worker = IngestionWorker(IngestionQueue(redis), consumer)
+    try:
+        await asyncio.gather(
+            worker.run(stop_event), StorageReconciler(redis).run(stop_event)
+        )
+    finally:
+        await embedding_engine.close()
+        await redis.close()
+        await supabase_http.close()
+        await sessionmanager.close()
+        executors.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())